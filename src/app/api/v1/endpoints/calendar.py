@@ -0,0 +1,95 @@
+import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from app import schemas
+from app.api.v1.endpoints.utils import get_cached_holiday_calendar
+from app.core.config import settings
+from app.dependencies.calendar import get_date_param, get_business_day_range_params, DateRangeParams
+from app.dependencies.redis import Redis, get_redis
+
+router = APIRouter()
+
+
+async def move_business_days(redis: Redis, date: datetime.date, n: int) -> datetime.date:
+    """
+    Move the date by n business days, forward if n is positive and backward otherwise.
+
+    Only the calendar of the year of the date is loaded at first, the calendars of the years the date is moved
+    across are loaded as they are reached. The years not in the database are never fetched from the open API,
+    they may not be published yet, only their weekends are not business days.
+    """
+    years = {date.year}
+
+    while True:
+        holiday_calendar = await get_cached_holiday_calendar(redis, years, fetch=False)
+        business_day = (
+            holiday_calendar.next_business_day(date, n) if n > 0 else holiday_calendar.previous_business_day(date, -n)
+        )
+        crossed = set(range(min(date.year, business_day.year), max(date.year, business_day.year) + 1))
+
+        if crossed <= years:
+            return business_day
+
+        years = years | crossed
+
+
+@router.get("/business-days/next", response_model=schemas.BusinessDay)
+async def get_next_business_day(
+        date: Annotated[datetime.date, Depends(get_date_param)],
+        redis: Annotated[Redis, Depends(get_redis)],
+        n: Annotated[int, Query(ge=1, le=settings.BUSINESS_DAY_MAX_OFFSET)] = 1,
+):
+    """
+    Get the n-th business day after the date, a business day is a weekday that is not a holiday.
+    """
+    return {"date": date, "n": n, "business_day": await move_business_days(redis, date, n)}
+
+
+@router.get("/business-days/prev", response_model=schemas.BusinessDay)
+async def get_previous_business_day(
+        date: Annotated[datetime.date, Depends(get_date_param)],
+        redis: Annotated[Redis, Depends(get_redis)],
+        n: Annotated[int, Query(ge=1, le=settings.BUSINESS_DAY_MAX_OFFSET)] = 1,
+):
+    """
+    Get the n-th business day before the date, e.g. `n=5` is 5 business days ago.
+    """
+    return {"date": date, "n": n, "business_day": await move_business_days(redis, date, -n)}
+
+
+@router.get("/business-days/count", response_model=schemas.BusinessDayCount)
+async def count_business_days(
+        params: Annotated[DateRangeParams, Depends(get_business_day_range_params)],
+        redis: Annotated[Redis, Depends(get_redis)],
+):
+    """
+    Count the business days from `start` to `end`, both inclusive.
+    """
+    holiday_calendar = await get_cached_holiday_calendar(redis, params.years, fetch=False)
+
+    return {
+        "start": params.start,
+        "end": params.end,
+        "total": holiday_calendar.count_business_days(params.start, params.end),
+    }
+
+
+@router.get("/business-days/range", response_model=schemas.BusinessDayRange)
+async def get_business_days(
+        params: Annotated[DateRangeParams, Depends(get_business_day_range_params)],
+        redis: Annotated[Redis, Depends(get_redis)],
+):
+    """
+    Get the business days from `start` to `end`, both inclusive.
+    """
+    holiday_calendar = await get_cached_holiday_calendar(redis, params.years, fetch=False)
+    business_days = holiday_calendar.get_business_days(params.start, params.end)
+
+    return {
+        "start": params.start,
+        "end": params.end,
+        "total": len(business_days),
+        "business_days": business_days,
+    }
@@ -1,39 +1,61 @@
-from typing import Annotated
+import asyncio
+from typing import Annotated, Union
 
 from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi.responses import JSONResponse
+from starlette import status
 from starlette.exceptions import HTTPException
+from starlette.requests import Request
 from structlog import get_logger
 from structlog.stdlib import BoundLogger
 
 from app import schemas
-from app.api.v1.endpoints.utils import get_cached_holidays
-from app.core.enums import FileTypes, WeekDay, DailyReportHttpErrors
+from app.api.v1.endpoints.utils import get_cached_holidays, get_cached_holiday_calendar
+from app.core.enums import WeekDay, DailyReportHttpErrors, NotificationTypes, ProductType
 from app.dependencies import daily_reports, special_holidays
-from app.dependencies.notifications import get_notification_manager
+from app.dependencies.calendar import DateRangeParams
+from app.dependencies.notifications import get_error_recorder
 from app.dependencies.redis import get_redis, Redis
 from app.middlewares.correlation import correlation_id
 from app.models.daily_reports import DailyReport
-from app.models.notifications import Notification
 from app.schemas import PaginatedDailyReport
+from app.utils.attachment_stores import AttachmentStore
+from app.utils.daily_report_backfill import DailyReportBackfill
+from app.utils.daily_report_extractors import DailyReportExtractor
+from app.utils.daily_report_jobs import DailyReportJobWorkers, DailyReportJobStore
+from app.utils.daily_report_writers import DailyReportWriter
 from app.utils.datetime import get_date
-from app.utils.email_processors import GmailProcessor, GmailDailyReportSearcher
-from app.utils.file_processors import DocumentProcessor
-from app.utils.notification_helper import NotificationManager
+from app.utils.error_recorders import ErrorRecorder
+from app.utils.holiday_calendars import HolidayCalendar
 
 router = APIRouter()
 logger: BoundLogger = get_logger()
 
 
-@router.get("", response_model=PaginatedDailyReport[schemas.DailyReport])
+@router.get(
+    "",
+    response_model=PaginatedDailyReport[schemas.DailyReport],
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.DailyReportJob}},
+)
 async def get_daily_reports(
-        background_tasks: BackgroundTasks,
+        request: Request,
         params: Annotated[daily_reports.CommonParams, Depends(daily_reports.get_common_params)],
         key: Annotated[str, Depends(special_holidays.cache_key)],
         redis: Annotated[Redis, Depends(get_redis)],
+        attachment_store: Annotated[AttachmentStore, Depends(daily_reports.get_attachment_store)],
+        job_workers: Annotated[DailyReportJobWorkers, Depends(daily_reports.get_job_workers)],
+        writer: Annotated[DailyReportWriter, Depends(daily_reports.get_daily_report_writer)],
+        error_recorder: Annotated[ErrorRecorder, Depends(get_error_recorder)],
         paging: schemas.PaginationParams = Depends(),
         sorting: schemas.SortingParams = Depends(),
-        notification_manager: NotificationManager = Depends(get_notification_manager)
+        notification_type: NotificationTypes = NotificationTypes.LINE
 ):
+    """
+    Get the daily reports, the daily report of a date is extracted from the email if `extract` is set.
+
+    If `async` is also set, the extraction is queued as a job and `202` is returned with the job,
+    the job can be polled from `/daily-reports/jobs/{id}` or its result is posted to `callback_url`.
+    """
     _list = await DailyReport.get_by_params(params, paging, sorting)
     cached_holidays = await get_cached_holidays(key, redis, params.date.year if params.date else get_date().year)
     weekday = None
@@ -48,39 +70,34 @@ async def get_daily_reports(
 
     # the result from the database is only 1 or 0, because the date is unique
     if params.extract and len(_list) <= 1:
-        date_of_holidays = [h.date for h in cached_holidays.holidays]
-        mail_processor = GmailProcessor(
-            DocumentProcessor(
-                params.date,
-                FileTypes.PDF,
-                product_type=params.product_type,
-                date_of_holidays=date_of_holidays
-            ),
-            GmailDailyReportSearcher
-        )
+        holiday_calendar = HolidayCalendar([cached_holidays.calendar])
+        extractor = DailyReportExtractor(params.date, params.product_type, holiday_calendar, redis, attachment_store)
+        daily_report = None
+
+        # If there is no daily report in the database, try to get it from the email,
+        # unless the date has no daily report or the daily report is known to be not published yet
+        if len(_list) == 0 and await extractor.should_extract():
+            if params.run_async:
+                return await submit_job(request, job_workers, extractor, holiday_calendar, params.callback_url)
 
-        # If there is no daily report in the database, try to get it from the email
-        if len(_list) == 0:
             try:
-                daily_report = await DailyReport.get_fulfilled_instance(mail_processor)
+                daily_report = await extractor.extract()
 
-                # Save the daily report to the database after the response is returned
+                # Save the daily report to the database in the next batch after the response is returned
                 if daily_report:
-                    background_tasks.add_task(daily_report.save)
+                    writer.write(daily_report)
             except Exception as e:
                 msg = str(DailyReportHttpErrors.FAILED)
                 await logger.aexception(msg)
-                notification = await Notification.create_from_exception(correlation_id.get(), msg)
-                notification_manager.send_notification(notification)
+                # the error is put in the outbox in the background, so the response is not delayed by it
+                error_recorder.record(correlation_id.get(), msg, notification_type)
 
                 raise HTTPException(status_code=500, detail=DailyReportHttpErrors.INTERNAL_SERVER_ERROR) from e
-        else:
-            daily_report = None
 
         response |= {
             "total": 1 if _list or daily_report else 0,
             "results": [daily_report] if len(_list) == 0 and daily_report else _list,
-            "prev_day_is_holiday": mail_processor.document_processor.reader.prev_day_is_holiday,
+            "prev_day_is_holiday": extractor.prev_day_is_holiday,
             "weekday": (WeekDay(params.date.isoweekday())),
         }
     else:
@@ -91,3 +108,86 @@ async def get_daily_reports(
         }
 
     return response
+
+
+async def submit_job(
+        request: Request,
+        job_workers: DailyReportJobWorkers,
+        extractor: DailyReportExtractor,
+        holiday_calendar: HolidayCalendar,
+        callback_url: Union[str, None] = None
+) -> JSONResponse:
+    try:
+        job = await job_workers.submit(
+            extractor.date,
+            extractor.product_type,
+            holiday_calendar,
+            prev_day_is_holiday=extractor.prev_day_is_holiday,
+            callback_url=callback_url,
+        )
+    except asyncio.QueueFull as e:
+        raise HTTPException(status_code=503, detail=DailyReportHttpErrors.TOO_MANY_JOBS) from e
+
+    return JSONResponse(
+        content=job.model_dump(mode="json"),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": str(request.url_for("get_daily_report_job", job_id=job.id))},
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.DailyReportJob)
+async def get_daily_report_job(job_id: str, redis: Annotated[Redis, Depends(get_redis)]):
+    if job := await DailyReportJobStore(redis).get(job_id):
+        return job
+
+    raise HTTPException(status_code=404, detail=DailyReportHttpErrors.JOB_NOT_FOUND)
+
+
+@router.post("/reprocess", response_model=schemas.ReprocessedDailyReports)
+async def reprocess_daily_reports(
+        params: Annotated[DateRangeParams, Depends(daily_reports.get_date_range_params)],
+        product_types: Annotated[list[ProductType], Depends(daily_reports.get_product_types_param)],
+        redis: Annotated[Redis, Depends(get_redis)],
+        attachment_store: Annotated[AttachmentStore, Depends(daily_reports.get_attachment_store)],
+):
+    """
+    Re-run the current reader over the attachments stored in the attachment store and
+    replace the daily reports in the database, no request is sent to the mail server.
+    """
+    # the calendars of the years after the current one are not fetched, they may not be published yet
+    holiday_calendar = await get_cached_holiday_calendar(redis, params.years)
+    reports = await DailyReport.reprocess(attachment_store, params.dates, product_types, holiday_calendar)
+    await DailyReport.bulk_upsert(reports)
+
+    return {
+        "total": len(reports),
+        "results": reports,
+    }
+
+
+@router.post("/backfill", response_model=schemas.DailyReportBackfill, status_code=status.HTTP_202_ACCEPTED)
+async def backfill_daily_reports(
+        background_tasks: BackgroundTasks,
+        params: Annotated[DateRangeParams, Depends(daily_reports.get_date_range_params)],
+        product_types: Annotated[list[ProductType], Depends(daily_reports.get_product_types_param)],
+        redis: Annotated[Redis, Depends(get_redis)],
+        attachment_store: Annotated[AttachmentStore, Depends(daily_reports.get_attachment_store)],
+):
+    """
+    Fill the missing daily reports of a range of dates after the response is returned,
+    the progress and the throughput are reported in the logs.
+    """
+    backfill = DailyReportBackfill(
+        params.dates,
+        product_types,
+        await get_cached_holiday_calendar(redis, params.years),
+        attachment_store=attachment_store,
+    )
+    background_tasks.add_task(backfill.run)
+
+    return {
+        "start": params.start,
+        "end": params.end,
+        "product_types": product_types,
+        "expected": sum(len(values) for values in backfill.expected_filenames().values()),
+    }
@@ -1,15 +1,35 @@
-from typing import Annotated, Any
+import hashlib
+from typing import Annotated, Any, Union
 
 from fastapi import APIRouter, Depends
 from starlette import status
 
 from app import schemas
-from app.dependencies.notifications import CommonParams, get_common_params, get_notification_in
+from app.core.config import settings
+from app.core.enums import RedisCacheKey
+from app.dependencies.notifications import (
+    CommonParams,
+    StatsParams,
+    NDJSON_MEDIA_TYPE,
+    get_common_params,
+    get_stats_params,
+    get_notification_in,
+    get_bulk_notifications_in,
+    get_error_recorder,
+    get_notification_dispatcher,
+)
+from app.dependencies.redis import Redis, get_redis
+from app.utils.cache_codecs import CacheCodec
+from app.utils.error_recorders import ErrorRecorder
+from app.utils.notification_dispatcher import NotificationDispatcher
 from app.models import Notification
 from app.schemas import Paginated
 
 router = APIRouter()
 
+# The codec of the cached stats, bump the version when the buckets change
+stats_codec = CacheCodec(list[dict[str, Any]], version=1)
+
 
 @router.get("", response_model=Paginated[schemas.Notification])
 async def get_notifications(
@@ -17,7 +37,10 @@ async def get_notifications(
         paging: schemas.PaginationParams = Depends(),
         sorting: schemas.SortingParams = Depends(),
 ) -> dict[str, Any]:
-    result = await Notification.get_by_params(params, paging, sorting)
+    if params.archived:
+        result = await Notification.get_archived_by_params(params, paging, sorting)
+    else:
+        result = await Notification.get_by_params(params, paging, sorting)
 
     return {
         "page": paging.page,
@@ -27,6 +50,93 @@ async def get_notifications(
     }
 
 
+@router.get("/stats", response_model=schemas.NotificationStats)
+async def get_notification_stats(
+        params: Annotated[CommonParams, Depends(get_common_params)],
+        stats_params: Annotated[StatsParams, Depends(get_stats_params)],
+        redis: Annotated[Redis, Depends(get_redis)],
+) -> dict[str, Any]:
+    """
+    Count the notifications, or the archived ones if `archived` is set, per time bucket, category, type and level,
+    the result is cached briefly and refreshed in the background.
+    """
+    digest = hashlib.sha1(
+        f"{params.date}:{params.category}:{params.type}:{params.level}:{params.archived}:"
+        f"{stats_params.start}:{stats_params.end}:{stats_params.granularity}".encode()
+    ).hexdigest()
+    result = await redis.get_with_auto_set(
+        RedisCacheKey.NOTIFICATION_STATS.value.format(digest=digest),
+        stats_codec,
+        Notification.get_archived_stats if params.archived else Notification.get_stats,
+        params,
+        stats_params,
+        ex=settings.NOTIFICATION_STATS_CACHE_TTL,
+        soft_ex=settings.NOTIFICATION_STATS_CACHE_SOFT_TTL,
+    )
+
+    return {
+        "granularity": stats_params.granularity,
+        "results": result,
+    }
+
+
+@router.get("/metrics", response_model=schemas.NotificationMetrics)
+async def get_notification_metrics(
+        dispatcher: Annotated[NotificationDispatcher, Depends(get_notification_dispatcher)],
+        error_recorder: Annotated[ErrorRecorder, Depends(get_error_recorder)],
+) -> dict[str, Any]:
+    """
+    The backlog, throughput and latency of the delivery of the notifications in this process.
+    """
+    return {
+        "channels": dispatcher.metrics(),
+        "outbox": await Notification.count_outbox(),
+        "errors": error_recorder.metrics(),
+    }
+
+
 @router.post("", response_model=schemas.Notification, status_code=status.HTTP_201_CREATED)
 async def create_notification(notification_in: Annotated[Notification, Depends(get_notification_in)]) -> Notification:
     return await Notification.create(notification_in)
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.NotificationBulk,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": schemas.NotificationCreate.model_json_schema()},
+                },
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {"type": "string", "description": "A notification in JSON per line."},
+                },
+            },
+        },
+    },
+)
+async def create_notifications(
+        notifications_in: Annotated[list[Union[Notification, str]], Depends(get_bulk_notifications_in)]
+) -> dict[str, Any]:
+    """
+    Create the notifications in bulk, the body is either a JSON array or NDJSON of the notifications.
+    The result of every notification is returned in the order of the body.
+    """
+    valid = [(i, n) for i, n in enumerate(notifications_in) if isinstance(n, Notification)]
+    errors = {i: n for i, n in enumerate(notifications_in) if isinstance(n, str)}
+
+    for position, error in (await Notification.bulk_insert([n for _, n in valid])).items():
+        errors[valid[position][0]] = error
+
+    results = [
+        {"index": i, "error": errors[i]} if i in errors else {"index": i, "id": str(n.id)}
+        for i, n in enumerate(notifications_in)
+    ]
+
+    return {
+        "inserted": len(notifications_in) - len(errors),
+        "failed": len(errors),
+        "results": results,
+    }
@@ -6,16 +6,17 @@ from starlette import status
 from starlette.exceptions import HTTPException
 
 from app import schemas
-from app.api.v1.endpoints.utils import get_cached_holidays
+from app.api.v1.endpoints.utils import get_cached_holidays, get_cached_holidays_of_years, refresh_cached_holidays
 from app.core.enums import SpecialHolidayHttpErrors
+from app.dependencies.calendar import DateRangeParams
 from app.dependencies.redis import Redis, get_redis
-from app.dependencies.special_holidays import cache_key
+from app.dependencies.special_holidays import cache_key, get_holiday_range_params
 from app.models.special_holidays import Holiday, SpecialHoliday
 
 router = APIRouter()
 
 
-@router.get("/holidays/{year}")
+@router.get("/holidays/{year}", response_model=schemas.Holidays)
 async def get_holidays_by_year(
         year: int,
         key: Annotated[str, Depends(cache_key)],
@@ -29,23 +30,49 @@ async def get_holidays_by_year(
     }
 
 
+@router.get("/holidays", response_model=schemas.Holidays)
+async def get_holidays_by_range(
+        params: Annotated[DateRangeParams, Depends(get_holiday_range_params)],
+        redis: Annotated[Redis, Depends(get_redis)],
+) -> dict[str, Any]:
+    """
+    Get the holidays from `from` to `to`, both inclusive, the holidays of all the years are loaded at once.
+    The years after the current one are not fetched from the open API, they have no holidays until they are
+    published and added.
+    """
+    documents = await get_cached_holidays_of_years(redis, params.years)
+    holidays = sorted(
+        (
+            holiday
+            for document in documents.values()
+            for holiday in document.holidays
+            if params.start <= holiday.date <= params.end
+        ),
+        key=lambda holiday: holiday.date
+    )
+
+    return {
+        "total": len(holidays),
+        "holidays": holidays
+    }
+
+
 @router.post("/holidays", response_model=schemas.Holiday, status_code=status.HTTP_201_CREATED)
 async def create_holiday(holiday_in: schemas.HolidayCreate, redis: Annotated[Redis, Depends(get_redis)]) -> Holiday:
     data = holiday_in.model_dump()
     holiday = Holiday(**data)
-    special_holiday = await SpecialHoliday.find_one(SpecialHoliday.year == holiday.date.year)
 
-    if special_holiday is None:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=SpecialHolidayHttpErrors.YEAR_NOT_EXIST)
-    if holiday in special_holiday.holidays:
+    if not await SpecialHoliday.add_holiday(holiday):
+        # only look up the reason when the holiday is not added
+        if await SpecialHoliday.find_one(SpecialHoliday.year == holiday.date.year) is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=SpecialHolidayHttpErrors.YEAR_NOT_EXIST
+            )
+
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=SpecialHolidayHttpErrors.HOLIDAY_ALREADY_EXISTS
         )
 
-    special_holiday.holidays.append(holiday)
-    await special_holiday.save()
-
-    # delete the cache for the year
-    await redis.delete(await cache_key(holiday.date.year))
+    await refresh_cached_holidays(await cache_key(holiday.date.year), redis, holiday.date.year)
 
     return holiday
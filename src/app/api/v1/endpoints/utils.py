@@ -1,9 +1,152 @@
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Iterable
+
+from beanie.odm.operators.find.comparison import In
+
+from app.core.config import settings
+from app.core.enums import RedisCacheKey, RedisChannel
+from app.dependencies.special_holidays import cache_key
 from app.models import SpecialHoliday
+from app.utils.cache_codecs import CacheCodec
+from app.utils.datetime import get_date
+from app.utils.holiday_calendars import HolidayCalendar
+from app.utils.local_caches import holiday_cache, MISSING
+
+
+# The codec of the cached holidays, bump the version when `SpecialHoliday` changes
+holiday_codec = CacheCodec(SpecialHoliday, version=1)
 
 
 async def get_cached_holidays(key, redis, year) -> SpecialHoliday:
-    return await redis.get_with_auto_set(
+    # the holidays rarely change, so they are cached in the process in front of Redis
+    if (cached := holiday_cache.get(key)) is not MISSING:
+        return cached
+
+    return await reload_cached_holidays(key, redis, year)
+
+
+async def reload_cached_holidays(key, redis, year) -> SpecialHoliday:
+    """
+    Load the holidays of the year from Redis, or from the database on a miss, into the in-process cache
+    even if it still holds them, so the entry of the in-process cache is renewed before it expires.
+    """
+    holidays = await redis.get_with_auto_set(
         key,
+        holiday_codec,
         SpecialHoliday.get_document_by_year,
-        year
+        year,
+        redis,
+        ex=settings.HOLIDAY_CACHE_TTL,
+        soft_ex=settings.HOLIDAY_CACHE_SOFT_TTL,
     )
+    holiday_cache.set(key, holidays)
+
+    return holidays
+
+
+async def refresh_cached_holidays(key, redis, year):
+    """
+    Write the holidays of the year through both cache tiers after they are changed, so the readers never find
+    the cache cold. The refresh is serialized by a lock, so a refresh reading an older document cannot overwrite
+    a newer one, the key is deleted instead if the lock is not acquired.
+    """
+    async with redis.lock(
+            RedisCacheKey.TAIWAN_CALENDAR_CACHE_LOCK.value.format(year=year),
+            timeout=settings.HOLIDAY_CACHE_LOCK_TIMEOUT,
+            blocking_timeout=settings.HOLIDAY_CACHE_LOCK_TIMEOUT,
+    ) as acquired:
+        if acquired:
+            holidays = await SpecialHoliday.find_one(SpecialHoliday.year == year)
+            await redis.set_with_codec(key, holiday_codec, holidays, ex=settings.HOLIDAY_CACHE_TTL)
+            holiday_cache.set(key, holidays)
+        else:
+            await redis.delete(key)
+            holiday_cache.delete(key)
+
+    # the local caches of the other workers are invalidated, they read the refreshed holidays from Redis
+    await redis.publish(RedisChannel.HOLIDAY_INVALIDATION, key)
+
+
+async def get_cached_holidays_of_years(
+        redis, years: Iterable[int], fetch: bool = True
+) -> dict[int, SpecialHoliday]:
+    """
+    Get the holidays of the years in batches, the years missing in the process are read from Redis in a single
+    round trip, the ones missing in Redis are read from the database with a single query, and the ones not in the
+    database are fetched from the open API concurrently unless `fetch` is not set. The years after the current one
+    are never fetched, they may not be published yet, and the empty calendar fetched for them would be kept for good.
+
+    The stale holidays in Redis are refreshed in the background like `reload_cached_holidays`. The missing ones
+    are only cached under the lock of `refresh_cached_holidays`, so the holidays read before a holiday is created
+    cannot overwrite the refreshed ones, the years locked by another worker are not cached.
+
+    :return: The holidays keyed on the year, the years not in the database are left out unless they are fetched.
+    """
+    keys = {year: await cache_key(year) for year in sorted(set(years))}
+    result = {}
+
+    for year, key in keys.items():
+        if (cached := holiday_cache.get(key)) is not MISSING:
+            result[year] = cached
+
+    if missing := [year for year in keys if year not in result]:
+        cached_documents = await redis.mget_with_refresh(
+            {keys[year]: (year, redis) for year in missing},
+            holiday_codec,
+            SpecialHoliday.get_document_by_year,
+            ex=settings.HOLIDAY_CACHE_TTL,
+            soft_ex=settings.HOLIDAY_CACHE_SOFT_TTL,
+        )
+
+        for year, cached in zip(missing, cached_documents):
+            if cached is not MISSING:
+                result[year] = cached
+                holiday_cache.set(keys[year], cached)
+
+    if missing := [year for year in keys if year not in result]:
+        async with AsyncExitStack() as stack:
+            locked = set()
+
+            for year in missing:
+                lock = redis.lock(
+                    RedisCacheKey.TAIWAN_CALENDAR_CACHE_LOCK.value.format(year=year),
+                    timeout=settings.HOLIDAY_CACHE_LOCK_TIMEOUT,
+                    blocking_timeout=0,
+                )
+
+                if await stack.enter_async_context(lock):
+                    locked.add(year)
+
+            loaded = {
+                document.year: document
+                for document in await SpecialHoliday.find(In(SpecialHoliday.year, missing)).to_list()
+            }
+            fetched = await asyncio.gather(*(
+                SpecialHoliday.get_document_by_year(year, redis)
+                for year in missing
+                if fetch and year not in loaded and year <= get_date().year
+            ))
+            loaded |= {document.year: document for document in fetched}
+
+            if cached_years := [year for year in loaded if year in locked]:
+                await redis.mset_with_codec(
+                    {keys[year]: loaded[year] for year in cached_years},
+                    holiday_codec,
+                    ex=settings.HOLIDAY_CACHE_TTL
+                )
+
+        for year, document in loaded.items():
+            result[year] = document
+
+            if year in locked:
+                holiday_cache.set(keys[year], document)
+
+    return result
+
+
+async def get_cached_holiday_calendar(redis, years: Iterable[int], fetch: bool = True) -> HolidayCalendar:
+    # the calendar of a year is built once per cached document, so it is not rebuilt on every request
+    documents = await get_cached_holidays_of_years(redis, years, fetch)
+
+    return HolidayCalendar([document.calendar for document in documents.values()])
@@ -1,6 +1,7 @@
+from datetime import time
 from typing import List, Annotated
 
-from pydantic import UrlConstraints
+from pydantic import UrlConstraints, model_validator
 from pydantic_core import MultiHostUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -44,14 +45,153 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URI: str
+    # The cached values larger than the threshold(in bytes) are compressed with zstd if it is installed, 0 to disable it
+    CACHE_COMPRESS_THRESHOLD: int = 1024
+    # The seconds a stale cached value is locked by the worker refreshing it in the background
+    CACHE_REFRESH_LOCK_TIMEOUT: int = 30
 
     # LINE Notify tokens
     SYSTEM_NOTIFY_TOKEN: str = ""
     SERVICE_NOTIFY_TOKEN: str = ""
 
+    # The HTTP client of the notifications, the timeouts are in seconds
+    NOTIFY_CONNECT_TIMEOUT: float = 3.0
+    NOTIFY_READ_TIMEOUT: float = 10.0
+    NOTIFY_POOL_TIMEOUT: float = 5.0
+    NOTIFY_MAX_CONNECTIONS: int = 10
+    NOTIFY_MAX_KEEPALIVE_CONNECTIONS: int = 5
+
+    # The outbox of the notifications
+    NOTIFICATION_DISPATCH_BATCH_SIZE: int = 20
+    # The seconds to wait before polling the outbox again when it is empty
+    NOTIFICATION_DISPATCH_INTERVAL: float = 2.0
+    # The seconds a claimed notification is leased to a dispatcher
+    NOTIFICATION_LEASE: int = 60
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    # The backoff(in seconds) of the retries is doubled after every attempt
+    NOTIFICATION_RETRY_BACKOFF: int = 5
+    NOTIFICATION_RETRY_MAX_BACKOFF: int = 60 * 10
+    # The workers of the channels, the rates(per second) follow the quotas of the providers,
+    # LINE Notify allows 1000 requests per hour and Gmail about 2 messages per second
+    NOTIFICATION_LINE_CONCURRENCY: int = 4
+    NOTIFICATION_LINE_RATE: float = 1000 / 3600
+    NOTIFICATION_LINE_BURST: int = 10
+    NOTIFICATION_EMAIL_CONCURRENCY: int = 2
+    NOTIFICATION_EMAIL_RATE: float = 2.0
+    NOTIFICATION_EMAIL_BURST: int = 5
+    # The seconds to wait for the claimed notifications to be sent on shutdown
+    NOTIFICATION_DRAIN_TIMEOUT: float = 10.0
+
+    # The repeated notifications in the window(in seconds) are collapsed into a single alert and a summary,
+    # the window slides with every occurrence but a summary is sent at least once per max window
+    NOTIFICATION_COALESCE_WINDOW: int = 60 * 5
+    NOTIFICATION_COALESCE_MAX_WINDOW: int = 60 * 60
+
+    # The retention of the notifications, the records of the low levels expire after the TTL(in seconds)
+    # and the others are moved to the monthly archive collections after the days
+    NOTIFICATION_TTL_LEVELS: str = "DEBUG,INFO"
+    NOTIFICATION_TTL: int = 60 * 60 * 24 * 30
+    NOTIFICATION_ARCHIVE_AFTER_DAYS: int = 90
+    NOTIFICATION_ARCHIVE_BATCH_SIZE: int = 1000
+    NOTIFICATION_ARCHIVE_INTERVAL: int = 60 * 60
+    # The block compressor of the archive collections, empty to use the default of the server
+    NOTIFICATION_ARCHIVE_COMPRESSOR: str = "zstd"
+    # The maximum number of notifications of a bulk request
+    NOTIFICATION_BULK_MAX_ITEMS: int = 10000
+    # The cached statistics of the notifications are refreshed in the background after the soft TTL(in seconds)
+    # and expire after the TTL(in seconds)
+    NOTIFICATION_STATS_CACHE_TTL: int = 30
+    NOTIFICATION_STATS_CACHE_SOFT_TTL: int = 10
+
+    # The errors of the requests are buffered in memory and put in the outbox in batches,
+    # the oldest errors are dropped when the buffer is full
+    ERROR_RECORDER_CAPACITY: int = 10000
+    ERROR_RECORDER_BATCH_SIZE: int = 500
+    ERROR_RECORDER_FLUSH_INTERVAL: float = 1.0
+
+    # The circuit breakers of the notification channels, a channel is opened after the consecutive failures
+    # and is probed again after the recovery timeout(in seconds)
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT: float = 30.0
+    CIRCUIT_BREAKER_PROBE_INTERVAL: float = 10.0
+
     # Email recipients
     SYSTEM_RECIPIENTS: str = ""
     SERVICE_RECIPIENTS: str = ""
+    # The maximum number of recipients of a single email
+    GMAIL_MAX_RECIPIENTS: int = 100
+
+    # The open APIs, the timeout is in seconds and the backoff(in seconds) is doubled after every retry
+    OPEN_API_TIMEOUT: float = 10.0
+    OPEN_API_MAX_RETRIES: int = 3
+    OPEN_API_RETRY_BACKOFF: float = 0.5
+    # The seconds the calendar of a year is locked by the worker fetching it
+    TAIWAN_CALENDAR_LOCK_TIMEOUT: int = 60
+    # The seconds the cache of a year is locked by the worker refreshing it after a holiday is created
+    HOLIDAY_CACHE_LOCK_TIMEOUT: int = 5
+    # The maximum number of the years of a range of the holidays
+    HOLIDAY_RANGE_MAX_YEARS: int = 5
+
+    # The special holidays of the years cached in the process, in front of the cache in Redis
+    HOLIDAY_LOCAL_CACHE_SIZE: int = 16
+    HOLIDAY_LOCAL_CACHE_TTL: int = 60 * 5
+    # The special holidays cached in Redis are refreshed in the background after the soft TTL(in seconds)
+    # and expire after the TTL(in seconds), so the changes made in the database directly are picked up
+    HOLIDAY_CACHE_TTL: int = 60 * 60 * 24 * 7
+    HOLIDAY_CACHE_SOFT_TTL: int = 60 * 60
+
+    # The caches are warmed up at the startup in the budget(in seconds) and the holidays are refreshed
+    # every interval(in seconds), it should be shorter than the TTL of the in-process cache
+    WARMUP_BUDGET: float = 5.0
+    WARMUP_INTERVAL: float = 60 * 4
+    # The number of the latest days of the daily reports to be read at the startup, 0 to disable it
+    WARMUP_DAILY_REPORT_DAYS: int = 0
+    # The maximum number of the days of a range of the business day calendar
+    BUSINESS_DAY_MAX_RANGE_DAYS: int = 366 * 5
+    # The maximum number of the business days a date is moved by the business day calendar
+    BUSINESS_DAY_MAX_OFFSET: int = 1000
+    # The years of the dates accepted by the business day calendar
+    CALENDAR_MIN_YEAR: int = 1912
+    CALENDAR_MAX_YEAR: int = 2100
+
+    # Daily reports
+    ATTACHMENT_STORE_DIR: str = "attachments"
+    BACKFILL_CONCURRENCY: int = 4
+    BACKFILL_BATCH_SIZE: int = 50
+    # The maximum number of the days of a range of the daily reports to be backfilled or reprocessed
+    DAILY_REPORT_MAX_RANGE_DAYS: int = 366
+
+    # The time(in Taipei) after which the daily report of a date is expected to be received
+    DAILY_REPORT_PUBLISH_TIME: time = time(15, 0)
+    # The TTL(in seconds) of a report that should be published but has not been received yet
+    DAILY_REPORT_NOT_FOUND_TTL: int = 60
+    DAILY_REPORT_NOT_FOUND_MAX_TTL: int = 60 * 60 * 24
+    # The extracted daily reports are buffered and upserted in batches every interval(in seconds)
+    DAILY_REPORT_WRITER_BATCH_SIZE: int = 100
+    DAILY_REPORT_WRITER_FLUSH_INTERVAL: float = 1.0
+
+    # The extraction jobs of the daily reports
+    DAILY_REPORT_JOB_WORKERS: int = 2
+    DAILY_REPORT_JOB_QUEUE_SIZE: int = 100
+    # The TTL(in seconds) of the state of a job
+    DAILY_REPORT_JOB_TTL: int = 60 * 60
+    DAILY_REPORT_JOB_CALLBACK_TIMEOUT: int = 10
+    # The finished jobs are only posted to the callback URLs of the schemes and the hosts allowed(comma-separated),
+    # a callback URL is never accepted if no host is allowed
+    DAILY_REPORT_JOB_CALLBACK_SCHEMES: str = "https"
+    DAILY_REPORT_JOB_CALLBACK_HOSTS: str = ""
+
+    @model_validator(mode="after")
+    def check_cache_soft_ttls(self) -> "Settings":
+        # a cached value is refreshed in the background before it expires
+        for ttl, soft_ttl in (
+                ("HOLIDAY_CACHE_TTL", "HOLIDAY_CACHE_SOFT_TTL"),
+                ("NOTIFICATION_STATS_CACHE_TTL", "NOTIFICATION_STATS_CACHE_SOFT_TTL"),
+        ):
+            if not 0 < getattr(self, soft_ttl) < getattr(self, ttl):
+                raise ValueError(f"{soft_ttl} must be positive and shorter than {ttl}.")
+
+        return self
 
 
 settings = Settings()
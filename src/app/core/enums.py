@@ -83,6 +83,18 @@ class OpenApis(BaseEnum):
 
 class RedisCacheKey(BaseEnum):
     TAIWAN_CALENDAR = "taiwan_calendar_{year}"
+    TAIWAN_CALENDAR_LOCK = "taiwan_calendar_lock_{year}"
+    TAIWAN_CALENDAR_CACHE_LOCK = "taiwan_calendar_cache_lock_{year}"
+    DAILY_REPORT_NOT_FOUND = "daily_report_not_found_{date}_{product_type}"
+    DAILY_REPORT_JOB = "daily_report_job_{id}"
+    NOTIFICATION_COALESCE = "notification_coalesce_{digest}"
+    NOTIFICATION_COALESCE_INDEX = "notification_coalesce_index"
+    NOTIFICATION_STATS = "notification_stats_{digest}"
+    CACHE_REFRESH_LOCK = "cache_refresh_lock_{key}"
+
+
+class RedisChannel(BaseEnum):
+    HOLIDAY_INVALIDATION = "holiday_invalidation"
 
 
 class WeekDay(IntEnum):
@@ -100,6 +112,13 @@ class NotificationCategories(BaseEnum):
     SERVICE = "service"
 
 
+class NotificationStatus(BaseEnum):
+    PENDING = "pending"
+    SENDING = "sending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+
+
 class NotificationTypes(BaseEnum):
     EMAIL = "email"
     LINE = "line"
@@ -107,23 +126,64 @@ class NotificationTypes(BaseEnum):
 
 class LineApis(BaseEnum):
     NOTIFY = "https://notify-api.line.me/api/notify"
+    STATUS = "https://notify-api.line.me/api/status"
 
 
 class LineNotifyErrorMessages(BaseEnum):
     SEND_MESSAGE_FAILED = "Failed to send LINE notification"
     ERROR_OCCURRED = "An error occurred while sending LINE notification"
+    CIRCUIT_OPEN = "LINE notification is unavailable"
+
+
+class CircuitState(BaseEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
 
 
 class SpecialHolidayHttpErrors(BaseEnum):
     YEAR_NOT_EXIST = "The year does not exist."
     HOLIDAY_ALREADY_EXISTS = "The holiday already exists."
+    INVALID_DATE_RANGE = "from must not be later than to."
+    DATE_RANGE_TOO_LONG = "The date range is too long."
+
+
+class CalendarHttpErrors(BaseEnum):
+    INVALID_DATE_RANGE = "start must not be later than end."
+    DATE_RANGE_TOO_LONG = "The date range is too long."
+    YEAR_OUT_OF_RANGE = "The year of the date is not supported."
 
 
 class DailyReportHttpErrors(BaseEnum):
     PRODUCT_TYPE_PARAM_IS_REQUIRED = "product_type is required when extract is set."
     DATE_PARAM_IS_REQUIRED = "date is required when extract is set."
+    INVALID_DATE_RANGE = "start must not be later than end."
+    DATE_RANGE_TOO_LONG = "The date range is too long."
     FAILED = "Failed to get the daily report from the email."
     INTERNAL_SERVER_ERROR = "Internal server error."
+    JOB_NOT_FOUND = "The job does not exist or has expired."
+    TOO_MANY_JOBS = "Too many extraction jobs, please try again later."
+    CALLBACK_URL_NOT_ALLOWED = "The scheme or the host of callback_url is not allowed."
+
+
+class NotificationHttpErrors(BaseEnum):
+    INVALID_BULK_BODY = "The body must be a JSON array or NDJSON of notifications."
+    TOO_MANY_NOTIFICATIONS = "Too many notifications in a single request."
+    INVALID_DATE_RANGE = "start must not be later than end."
+
+
+class StatsGranularity(BaseEnum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
+
+
+class JobStatus(BaseEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
 
 
 class ChromeOptionFlag(BaseEnum):
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+from typing import Union
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.models import DailyReport
+from app.models.daily_reports import UNIQUE_KEYS, UNIQUE_INDEX_NAME
+
+logger: BoundLogger = get_logger()
+
+
+async def remove_duplicate_daily_reports(database: AsyncIOMotorDatabase, dry_run: bool = False) -> int:
+    """
+    The daily reports used to be saved without a unique index, the duplicates must be removed
+    before the unique index can be created. The most recently written document of each daily report is kept.
+
+    :return: The number of the duplicate documents, they are only counted if `dry_run` is set.
+    """
+    collection = database[DailyReport.Settings.name]
+
+    if UNIQUE_INDEX_NAME in await collection.index_information():
+        return 0
+
+    duplicates = collection.aggregate([
+        {"$sort": {"updated_at": -1, "_id": -1}},
+        {"$group": {"_id": {key: f"${key}" for key in UNIQUE_KEYS}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}},
+    ])
+    ids = [_id async for duplicate in duplicates for _id in duplicate["ids"][1:]]
+
+    if ids and not dry_run:
+        await collection.delete_many({"_id": {"$in": ids}})
+        await logger.awarning("Removed the duplicate daily reports", count=len(ids))
+
+    return len(ids)
+
+
+# The one-off migrations, they are run before deploying the version depending on them
+MIGRATIONS = {
+    "remove-duplicate-daily-reports": remove_duplicate_daily_reports,
+}
+
+
+async def main(argv: Union[list[str], None] = None) -> int:
+    """
+    Run a one-off migration from the command line, e.g.
+    `python -m app.db.migrations remove-duplicate-daily-reports --dry-run`
+    """
+    from app.core.logging import configure_logging
+
+    parser = argparse.ArgumentParser(description="Run a one-off migration of the database.")
+    parser.add_argument("migration", choices=MIGRATIONS, help="The name of the migration.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the documents to be changed.")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    # Beanie is not initialized, it would fail to create the indexes the migration is run for
+    client = AsyncIOMotorClient(str(settings.MONGODB_URI))
+
+    try:
+        count = await MIGRATIONS[args.migration](client[settings.MONGODB_DB_NAME], dry_run=args.dry_run)
+        await logger.ainfo("Finished the migration", migration=args.migration, count=count, dry_run=args.dry_run)
+
+        return count
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
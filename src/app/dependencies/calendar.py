@@ -0,0 +1,83 @@
+import datetime
+from typing import Awaitable, Callable, Union
+
+from fastapi import HTTPException, Query
+
+from app.core.config import settings
+from app.core.enums import BaseEnum, CalendarHttpErrors
+from app.utils.datetime import datetime_formatter
+
+
+class DateRangeParams:
+    def __init__(self, start: datetime.date, end: datetime.date):
+        self.start = start
+        self.end = end
+
+    @property
+    def years(self) -> range:
+        return range(self.start.year, self.end.year + 1)
+
+    @property
+    def dates(self) -> list[datetime.date]:
+        return [self.start + datetime.timedelta(days=i) for i in range((self.end - self.start).days + 1)]
+
+
+def validate_year(date: datetime.date) -> datetime.date:
+    if not settings.CALENDAR_MIN_YEAR <= date.year <= settings.CALENDAR_MAX_YEAR:
+        raise HTTPException(status_code=400, detail=CalendarHttpErrors.YEAR_OUT_OF_RANGE)
+
+    return date
+
+
+async def get_date_param(date: str) -> datetime.date:
+    try:
+        return validate_year(datetime_formatter(date))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+def create_date_range_dependency(
+        errors: type[BaseEnum],
+        is_too_long: Callable[[datetime.date, datetime.date], bool],
+        validate: Union[Callable[[datetime.date], datetime.date], None] = None,
+        start_alias: str = "start",
+        end_alias: str = "end"
+) -> Callable[..., Awaitable[DateRangeParams]]:
+    """
+    Create the dependency of a range of dates, both inclusive.
+
+    :param errors: The enum of the errors, it must have `INVALID_DATE_RANGE` and `DATE_RANGE_TOO_LONG`.
+    :param is_too_long: Whether the range from the start to the end exceeds the limit.
+    :param validate: Validate each of the dates, e.g. the year bounds.
+    :param start_alias: The name of the query parameter of the start.
+    :param end_alias: The name of the query parameter of the end.
+    """
+
+    async def get_date_range_params(
+            start: str = Query(..., alias=start_alias),
+            end: str = Query(..., alias=end_alias)
+    ) -> DateRangeParams:
+        try:
+            cleaned_start = datetime_formatter(start)
+            cleaned_end = datetime_formatter(end)
+
+            if validate is not None:
+                cleaned_start, cleaned_end = validate(cleaned_start), validate(cleaned_end)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+        if cleaned_start > cleaned_end:
+            raise HTTPException(status_code=400, detail=errors.INVALID_DATE_RANGE)
+        if is_too_long(cleaned_start, cleaned_end):
+            raise HTTPException(status_code=400, detail=errors.DATE_RANGE_TOO_LONG)
+
+        return DateRangeParams(cleaned_start, cleaned_end)
+
+    return get_date_range_params
+
+
+get_business_day_range_params = create_date_range_dependency(
+    CalendarHttpErrors,
+    lambda start, end: (end - start).days >= settings.BUSINESS_DAY_MAX_RANGE_DAYS,
+    validate=validate_year,
+)
@@ -1,11 +1,21 @@
 import datetime
-from typing import Union, Literal
+from typing import Union, Literal, TYPE_CHECKING
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Query
+from pydantic import HttpUrl
+from starlette.datastructures import CommaSeparatedStrings
+from starlette.requests import Request
 
+from app.core.config import settings
 from app.core.enums import Category, ProductType, SupplyType, DailyReportHttpErrors
+from app.dependencies.calendar import create_date_range_dependency, validate_year
+from app.utils.attachment_stores import AttachmentStore, LocalAttachmentStore
 from app.utils.datetime import datetime_formatter
 
+if TYPE_CHECKING:
+    from app.utils.daily_report_jobs import DailyReportJobWorkers
+    from app.utils.daily_report_writers import DailyReportWriter
+
 
 class CommonParams:
     def __init__(
@@ -13,13 +23,17 @@ class CommonParams:
             supply_type: Union[SupplyType, None] = None,
             category: Union[Category, None] = None,
             product_type: Union[ProductType, None] = None,
-            extract: bool = False
+            extract: bool = False,
+            run_async: bool = False,
+            callback_url: Union[str, None] = None
     ):
         self.date = date
         self.supply_type = supply_type
         self.category = category
         self.product_type = product_type
         self.extract = extract
+        self.run_async = run_async
+        self.callback_url = callback_url
 
 
 async def get_common_params(
@@ -27,7 +41,9 @@ async def get_common_params(
         supply_type: Union[SupplyType, None] = None,
         category: Union[Category, None] = None,
         product_type: Union[Literal[ProductType.CROPS, ProductType.SEAFOOD], None] = None,
-        extract: bool = False
+        extract: bool = False,
+        run_async: bool = Query(False, alias="async"),
+        callback_url: Union[HttpUrl, None] = None
 ) -> CommonParams:
     try:
         cleaned_date = datetime_formatter(date) if date else None
@@ -40,4 +56,48 @@ async def get_common_params(
         if date is None:
             raise HTTPException(status_code=400, detail=DailyReportHttpErrors.DATE_PARAM_IS_REQUIRED)
 
-    return CommonParams(cleaned_date, supply_type, category, product_type, extract)
+    # the service never posts to the hosts not allowed, e.g. the ones in the internal network
+    if callback_url is not None and (
+            callback_url.scheme not in CommaSeparatedStrings(settings.DAILY_REPORT_JOB_CALLBACK_SCHEMES)
+            or callback_url.host not in CommaSeparatedStrings(settings.DAILY_REPORT_JOB_CALLBACK_HOSTS)
+    ):
+        raise HTTPException(status_code=400, detail=DailyReportHttpErrors.CALLBACK_URL_NOT_ALLOWED)
+
+    return CommonParams(
+        cleaned_date,
+        supply_type,
+        category,
+        product_type,
+        extract,
+        run_async,
+        str(callback_url) if callback_url else None
+    )
+
+
+# The product types of the daily reports sent by the AFA
+DAILY_REPORT_PRODUCT_TYPES = [ProductType.CROPS, ProductType.SEAFOOD]
+
+
+get_date_range_params = create_date_range_dependency(
+    DailyReportHttpErrors,
+    lambda start, end: (end - start).days >= settings.DAILY_REPORT_MAX_RANGE_DAYS,
+    validate=validate_year,
+)
+
+
+async def get_product_types_param(
+        product_type: list[Literal[ProductType.CROPS, ProductType.SEAFOOD]] = Query([])
+) -> list[ProductType]:
+    return product_type or DAILY_REPORT_PRODUCT_TYPES
+
+
+async def get_attachment_store() -> AttachmentStore:
+    return LocalAttachmentStore(settings.ATTACHMENT_STORE_DIR)
+
+
+async def get_job_workers(request: Request) -> "DailyReportJobWorkers":
+    return request.app.state.daily_report_jobs
+
+
+async def get_daily_report_writer(request: Request) -> "DailyReportWriter":
+    return request.app.state.daily_report_writer
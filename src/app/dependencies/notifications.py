@@ -1,21 +1,22 @@
 import datetime
 from typing import Union, Any
 
-from fastapi import HTTPException
+import orjson
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from starlette import status
 
 from app import schemas
+from app.core.config import settings
 from app.core.enums import (
     NotificationTypes,
-    LogLevel, NotificationCategories,
+    LogLevel, NotificationCategories, NotificationHttpErrors, StatsGranularity,
 )
 from app.middlewares.correlation import correlation_id
 from app.models import Notification
 from app.utils.datetime import datetime_formatter
-from app.utils.notification_helper import (
-    NotificationManager,
-    LineNotificationStrategy,
-    EmailNotificationStrategy,
-)
+from app.utils.error_recorders import ErrorRecorder
+from app.utils.notification_dispatcher import NotificationDispatcher
 
 
 class CommonParams:
@@ -24,34 +25,66 @@ class CommonParams:
             date: Union[datetime.date, None] = None,
             category: Union[NotificationCategories, None] = None,
             type: Union[NotificationTypes, None] = None,
-            level: Union[LogLevel, None] = None
+            level: Union[LogLevel, None] = None,
+            archived: bool = False
     ):
         self.date = date
         self.category = category
         self.type = type
         self.level = level
+        self.archived = archived
 
 
 async def get_common_params(
         date: Union[str, None] = None,
         category: Union[NotificationCategories, None] = None,
         type: Union[NotificationTypes, None] = None,
-        level: Union[LogLevel, None] = None
+        level: Union[LogLevel, None] = None,
+        archived: bool = False
 ) -> CommonParams:
     try:
         cleaned_date = datetime_formatter(date) if date else None
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
-    return CommonParams(cleaned_date, category, type, level)
+    return CommonParams(cleaned_date, category, type, level, archived)
+
+
+class StatsParams:
+    def __init__(
+            self,
+            start: Union[datetime.date, None] = None,
+            end: Union[datetime.date, None] = None,
+            granularity: StatsGranularity = StatsGranularity.DAY
+    ):
+        self.start = start
+        self.end = end
+        self.granularity = granularity
+
+
+async def get_stats_params(
+        start: Union[str, None] = None,
+        end: Union[str, None] = None,
+        granularity: StatsGranularity = StatsGranularity.DAY
+) -> StatsParams:
+    try:
+        cleaned_start = datetime_formatter(start) if start else None
+        cleaned_end = datetime_formatter(end) if end else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if cleaned_start and cleaned_end and cleaned_start > cleaned_end:
+        raise HTTPException(status_code=400, detail=NotificationHttpErrors.INVALID_DATE_RANGE)
+
+    return StatsParams(cleaned_start, cleaned_end, granularity)
+
 
+async def get_error_recorder(request: Request) -> ErrorRecorder:
+    return request.app.state.error_recorder
 
-async def get_notification_manager(notification_type: Union[NotificationTypes, None] = None) -> NotificationManager:
-    if notification_type and notification_type is NotificationTypes.EMAIL:
-        return NotificationManager(EmailNotificationStrategy())
 
-    # The default notification type is LINE
-    return NotificationManager(LineNotificationStrategy())
+async def get_notification_dispatcher(request: Request) -> NotificationDispatcher:
+    return request.app.state.notification_dispatcher
 
 
 async def get_notification_in(notification_in: schemas.NotificationCreate) -> Notification:
@@ -59,3 +92,52 @@ async def get_notification_in(notification_in: schemas.NotificationCreate) -> No
     dump["correlation_id"] = correlation_id.get()
 
     return Notification(**dump)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def format_validation_error(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+
+
+async def get_bulk_notifications_in(request: Request) -> list[Union[Notification, str]]:
+    """
+    Parse the body of a bulk request, it is either a JSON array or NDJSON with a notification per line.
+    Every item is validated on its own, an invalid item is replaced by its error so the others can still be inserted.
+    """
+    body = await request.body()
+
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        items = [line for line in body.splitlines() if line.strip()]
+    else:
+        try:
+            items = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=NotificationHttpErrors.INVALID_BULK_BODY) from e
+
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail=NotificationHttpErrors.INVALID_BULK_BODY)
+
+    if len(items) > settings.NOTIFICATION_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=NotificationHttpErrors.TOO_MANY_NOTIFICATIONS
+        )
+
+    cid = correlation_id.get()
+    notifications = []
+
+    for item in items:
+        try:
+            notification_in = (
+                schemas.NotificationCreate.model_validate_json(item)
+                if isinstance(item, bytes)
+                else schemas.NotificationCreate.model_validate(item)
+            )
+        except ValidationError as e:
+            notifications.append(format_validation_error(e))
+            continue
+
+        notifications.append(Notification(**notification_in.model_dump(), correlation_id=cid))
+
+    return notifications
@@ -1,34 +1,251 @@
-import pickle
-from typing import Callable, ParamSpec, Awaitable, Any
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Callable, ParamSpec, Awaitable, Any, Union, AsyncIterator
+from uuid import uuid4
 
 from fastapi import Depends
 from redis import asyncio as aioredis
+from redis.exceptions import RedisError
 from starlette.requests import Request
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.core.enums import RedisCacheKey
+from app.utils.cache_codecs import CacheCodec, MISSING
 
 P = ParamSpec("P")
 
+# Delete the key only if it still holds the value, e.g. the token of the holder of a lock
+COMPARE_AND_DELETE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+# Logger
+logger: BoundLogger = get_logger()
+
 
 class Redis:
+    # The refreshes of the stale values, a reference is kept so that the tasks are not garbage collected
+    # before they are done
+    _tasks: set[asyncio.Task] = set()
+
     def __init__(self, conn: aioredis.Redis):
         self.connection = conn
 
-    async def get_with_auto_set(self, key: str, func: Callable[..., Awaitable[Any]], *args):
-        data = await self.connection.get(key)
+    async def get_with_auto_set(
+            self,
+            key: str,
+            codec: CacheCodec,
+            func: Callable[..., Awaitable[Any]],
+            *args,
+            ex: Union[int, None] = None,
+            soft_ex: Union[int, None] = None
+    ):
+        """
+        Get the cached value, it is computed by `func` and cached if it is missing or of another schema version.
 
-        if data is None:
-            data = await func(*args)
-            await self.connection.set(key, pickle.dumps(data))
+        The value expires after `ex` seconds. If `soft_ex` is also given, the value becomes stale `soft_ex` seconds
+        after it is cached, a stale value is still returned and a single worker refreshes it in the background,
+        so only the callers after the hard expiry wait for `func`. A value cached without an expiry is stale as well.
+        """
+        if soft_ex is not None:
+            self._check_soft_ex(ex, soft_ex)
+
+        if soft_ex is None:
+            payload, ttl = await self.connection.get(key), None
         else:
-            data = pickle.loads(data)
+            pipeline = self.connection.pipeline(transaction=False)
+            pipeline.get(key)
+            pipeline.pttl(key)
+            payload, ttl = await pipeline.execute()
+
+        data = MISSING if payload is None else codec.decode(payload)
+
+        if data is MISSING:
+            data = await func(*args)
+            await self.set_with_codec(key, codec, data, ex=ex)
+        elif ttl is not None and self._is_stale(ttl, ex, soft_ex):
+            await self._refresh_in_background(key, codec, func, *args, ex=ex)
 
         return data
 
+    async def mget_with_refresh(
+            self,
+            keys: dict[str, tuple],
+            codec: CacheCodec,
+            func: Callable[..., Awaitable[Any]],
+            *,
+            ex: int,
+            soft_ex: int
+    ) -> list[Any]:
+        """
+        Get the cached values of the keys in a single round trip, a stale value is returned and refreshed
+        in the background like `get_with_auto_set`, by `func` called with the arguments of its key.
+        The missing values are left to the caller, so they can be loaded in batches.
+
+        :param keys: The keys with the arguments of `func` to refresh each of them.
+        :return: The cached values in the order of the keys, `MISSING` for a missing or outdated value.
+        """
+        self._check_soft_ex(ex, soft_ex)
+        pipeline = self.connection.pipeline(transaction=False)
+
+        for key in keys:
+            pipeline.get(key)
+            pipeline.pttl(key)
+
+        replies = await pipeline.execute()
+        result = []
+
+        for (key, args), payload, ttl in zip(keys.items(), replies[::2], replies[1::2]):
+            data = MISSING if payload is None else codec.decode(payload)
+
+            if data is not MISSING and self._is_stale(ttl, ex, soft_ex):
+                await self._refresh_in_background(key, codec, func, *args, ex=ex)
+
+            result.append(data)
+
+        return result
+
+    @staticmethod
+    def _check_soft_ex(ex: Union[int, None], soft_ex: int):
+        if ex is None or not 0 < soft_ex < ex:
+            raise ValueError("soft_ex must be positive and shorter than ex.")
+
+    @staticmethod
+    def _is_stale(ttl: int, ex: int, soft_ex: int) -> bool:
+        return ttl == -1 or 0 <= ttl <= (ex - soft_ex) * 1000
+
+    async def _refresh_in_background(
+            self,
+            key: str,
+            codec: CacheCodec,
+            func: Callable[..., Awaitable[Any]],
+            *args,
+            ex: int
+    ):
+        """
+        Refresh the stale value after the response is returned, the refresh is single-flight across the workers.
+        """
+        lock = RedisCacheKey.CACHE_REFRESH_LOCK.value.format(key=key)
+        token = uuid4().hex
+
+        if not await self.connection.set(lock, token, nx=True, ex=settings.CACHE_REFRESH_LOCK_TIMEOUT):
+            return
+
+        # the connection of the request is released after the response, the refresh borrows one from the pool,
+        # and `func` is given the detached client in place of this one
+        redis = self.detached()
+        args = tuple(redis if arg is self else arg for arg in args)
+
+        async def refresh():
+            try:
+                await redis.set_with_codec(key, codec, await func(*args), ex=ex)
+            except Exception as e:
+                # the stale value is served until the next refresh or its expiry
+                await logger.awarning("Failed to refresh the cached value", key=key, error=str(e))
+            finally:
+                # the lock may have expired and been taken by another worker
+                await redis.compare_and_delete(lock, token)
+
+        task = asyncio.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @classmethod
+    async def stop_refreshes(cls):
+        """
+        Cancel the refreshes in the background before the pool is closed, their locks expire by themselves.
+        """
+        for task in cls._tasks:
+            task.cancel()
+
+        await asyncio.gather(*cls._tasks, return_exceptions=True)
+
+    def detached(self) -> "Redis":
+        """
+        :return: The client borrowing the connections from the pool of this connection per command.
+        """
+        return Redis(aioredis.Redis(connection_pool=self.connection.connection_pool))
+
+    async def set_with_codec(self, key: str, codec: CacheCodec, data: Any, ex: Union[int, None] = None):
+        await self.connection.set(key, codec.encode(data), ex=ex)
+
+    async def mset_with_codec(self, mapping: dict[str, Any], codec: CacheCodec, ex: Union[int, None] = None):
+        """
+        Cache the values of the keys in a single round trip.
+        """
+        pipeline = self.connection.pipeline(transaction=False)
+
+        for key, data in mapping.items():
+            pipeline.set(key, codec.encode(data), ex=ex)
+
+        await pipeline.execute()
+
     async def get(self, key: str):
         return await self.connection.get(key)
 
+    async def set(self, key: str, value: Any, ex: Union[int, None] = None):
+        await self.connection.set(key, value, ex=ex)
+
+    async def exists(self, key: str) -> bool:
+        return bool(await self.connection.exists(key))
+
     async def delete(self, key: str):
         await self.connection.delete(key)
 
+    async def compare_and_delete(self, key: str, value: str) -> bool:
+        """
+        Delete the key atomically if it holds the value.
+        """
+        return bool(await self.connection.eval(COMPARE_AND_DELETE, 1, key, value))
+
+    @asynccontextmanager
+    async def lock(self, name: str, timeout: float, blocking_timeout: float) -> AsyncIterator[bool]:
+        """
+        Hold a distributed lock, the lock is released after `timeout` seconds even if the holder is gone.
+
+        :return: False if the lock is not acquired in `blocking_timeout` seconds or Redis is unavailable.
+        """
+        lock = self.connection.lock(name, timeout=timeout, blocking_timeout=blocking_timeout)
+
+        try:
+            acquired = await lock.acquire()
+        except RedisError:
+            acquired = False
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except RedisError:
+                    # the lock has expired or Redis is unavailable, it is released by its timeout
+                    pass
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.connection.publish(channel, message)
+
+    async def transaction(self, *commands: tuple) -> list:
+        """
+        Execute the commands atomically in a MULTI/EXEC block, e.g. `transaction(("hgetall", key), ("delete", key))`.
+
+        :return: The results of the commands.
+        """
+        pipeline = self.connection.pipeline(transaction=True)
+
+        for name, *args in commands:
+            getattr(pipeline, name)(*args)
+
+        return await pipeline.execute()
+
+    async def zadd(self, key: str, mapping: dict[str, float]):
+        await self.connection.zadd(key, mapping)
+
+    async def zrangebyscore(self, key: str, min_score: float, max_score: float) -> list[bytes]:
+        return await self.connection.zrangebyscore(key, min_score, max_score)
+
+    async def zrem(self, key: str, *members: str) -> int:
+        return await self.connection.zrem(key, *members)
+
 
 async def get_connection(request: Request):
     pool: aioredis.Redis = request.app.state.redis_pool
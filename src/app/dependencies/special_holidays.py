@@ -1,6 +1,8 @@
 from typing import Union
 
-from app.core.enums import RedisCacheKey
+from app.core.config import settings
+from app.core.enums import RedisCacheKey, SpecialHolidayHttpErrors
+from app.dependencies.calendar import create_date_range_dependency
 from app.utils.datetime import get_date, datetime_formatter
 
 
@@ -8,3 +10,11 @@ async def cache_key(year: int = get_date().year, date: Union[str, None] = None)
     extracted_year = datetime_formatter(date).year if date else year
 
     return RedisCacheKey.TAIWAN_CALENDAR.value.format(year=extracted_year)
+
+
+get_holiday_range_params = create_date_range_dependency(
+    SpecialHolidayHttpErrors,
+    lambda start, end: end.year - start.year >= settings.HOLIDAY_RANGE_MAX_YEARS,
+    start_alias="from",
+    end_alias="to",
+)
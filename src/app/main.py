@@ -12,9 +12,22 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app import api
 from app.core.config import settings
+from app.core.enums import NotificationTypes
 from app.core.logging import configure_logging
 from app.db import init_db
+from app.dependencies.daily_reports import get_attachment_store
+from app.dependencies.redis import Redis
 from app.schemas.error import APIValidationError, CommonHTTPError
+from app.utils.cache_warmers import CacheWarmer
+from app.utils.circuit_breakers import CircuitBreakerProber
+from app.utils.daily_report_jobs import DailyReportJobWorkers
+from app.utils.daily_report_writers import DailyReportWriter
+from app.utils.error_recorders import ErrorRecorder
+from app.utils.local_caches import CacheInvalidationListener
+from app.utils.notification_archivers import NotificationArchiver
+from app.utils.notification_coalescers import NotificationCoalescer
+from app.utils.notification_dispatcher import NotificationDispatcher
+from app.utils.notification_helper import close_http_client, probe_line_notify
 
 
 @asynccontextmanager
@@ -22,9 +35,41 @@ async def lifespan(application: FastAPI):
     configure_logging()
     await init_db.init()
     application.state.redis_pool = await aioredis.from_url(settings.REDIS_URI)
+    application.state.holiday_cache_listener = CacheInvalidationListener(application.state.redis_pool)
+    application.state.holiday_cache_listener.start()
+    application.state.cache_warmer = CacheWarmer(Redis(application.state.redis_pool))
+    await application.state.cache_warmer.warmup()
+    application.state.cache_warmer.start()
+    application.state.daily_report_jobs = DailyReportJobWorkers(
+        Redis(application.state.redis_pool), await get_attachment_store()
+    )
+    application.state.daily_report_jobs.start()
+    application.state.daily_report_writer = DailyReportWriter()
+    application.state.daily_report_writer.start()
+    application.state.notification_dispatcher = NotificationDispatcher(
+        NotificationCoalescer(Redis(application.state.redis_pool))
+    )
+    application.state.notification_dispatcher.start()
+    application.state.error_recorder = ErrorRecorder(NotificationCoalescer(Redis(application.state.redis_pool)))
+    application.state.error_recorder.start()
+    application.state.circuit_breaker_prober = CircuitBreakerProber({NotificationTypes.LINE: probe_line_notify})
+    application.state.circuit_breaker_prober.start()
+    application.state.notification_archiver = NotificationArchiver()
+    application.state.notification_archiver.start()
 
     yield
 
+    await application.state.daily_report_jobs.stop()
+    await application.state.daily_report_writer.stop()
+    await application.state.error_recorder.stop()
+    await application.state.notification_dispatcher.stop()
+    await application.state.circuit_breaker_prober.stop()
+    await application.state.notification_archiver.stop()
+    await application.state.holiday_cache_listener.stop()
+    await application.state.cache_warmer.stop()
+    await Redis.stop_refreshes()
+    await close_http_client()
+
 
 tags_metadata = [
     {
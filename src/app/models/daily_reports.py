@@ -1,16 +1,34 @@
+import asyncio
 from datetime import datetime, date
 from typing import Optional
 
 from beanie import Document, Indexed, WriteRules
 from beanie.odm.documents import DocType
-from pydantic import BaseModel
+from beanie.odm.utils.encoder import Encoder
+from pydantic import BaseModel, Field
+from pymongo import IndexModel, ASCENDING, UpdateOne, WriteConcern
 from pymongo.client_session import ClientSession
 
 from app.core.enums import Category, SupplyType, ProductType
 from app.dependencies.daily_reports import CommonParams
+from app.utils.attachment_stores import AttachmentStore
 from app.utils.datetime import datetime_formatter
-from app.utils.email_processors import GmailProcessor
-from app.utils.file_processors import FruitDailyReportPDFReader
+from app.utils.email_processors import GmailProcessor, GmailDailyReportSearcher
+from app.utils.file_processors import FruitDailyReportPDFReader, DocumentProcessor
+from app.utils.holiday_calendars import HolidayCalendar
+from app.utils.report_calendars import get_expected_filenames
+
+
+# A daily report is identified by these fields, there is a unique index on them
+UNIQUE_KEYS = ("date", "category", "supply_type", "product_type")
+UNIQUE_INDEX_NAME = "daily_report_unique"
+
+# The daily reports can be extracted again from the email, so the writes are not journaled
+WRITE_CONCERN = WriteConcern(w=1, j=False)
+
+
+def truncate_to_milliseconds(value: datetime) -> datetime:
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
 
 
 class Product(BaseModel):
@@ -25,18 +43,57 @@ class DailyReport(Document):
     supply_type: SupplyType
     product_type: ProductType
     products: list[Product]
-    created_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
 
     class Settings:
         name = "daily_reports"
-        indexes = ["date", "category", "supply_type", "product_type"]
+        indexes = [
+            "date",
+            "category",
+            "supply_type",
+            "product_type",
+            IndexModel([(key, ASCENDING) for key in UNIQUE_KEYS], name=UNIQUE_INDEX_NAME, unique=True),
+        ]
 
     async def save(self: DocType, session: Optional[ClientSession] = None,
                    link_rule: WriteRules = WriteRules.DO_NOTHING, ignore_revision: bool = False, **kwargs) -> DocType:
         self.updated_at = datetime.now()
         return await super().save(session, link_rule, ignore_revision, **kwargs)
 
+    @classmethod
+    def get_write_collection(cls):
+        collection = cls.get_motor_collection()
+
+        return collection.database.get_collection(collection.name, write_concern=WRITE_CONCERN)
+
+    def _upsert_query(self) -> tuple[dict, dict]:
+        """
+        :return: The filter and the update document of the upsert of the daily report.
+        """
+        # the dates in BSON have millisecond precision, keep the instance equal to the stored document
+        self.created_at = truncate_to_milliseconds(self.created_at)
+        self.updated_at = truncate_to_milliseconds(datetime.now())
+        encoded = Encoder().encode(self.model_dump(include={*UNIQUE_KEYS, "products", "created_at", "updated_at"}))
+        keys = {key: encoded[key] for key in UNIQUE_KEYS}
+
+        return keys, {
+            "$set": {"products": encoded["products"], "updated_at": encoded["updated_at"]},
+            "$setOnInsert": keys | {"created_at": encoded["created_at"]},
+        }
+
+    async def upsert(self):
+        """
+        Insert the daily report or replace the products of the existing one,
+        saving the same daily report concurrently never creates a duplicate.
+        """
+        result = await self.get_write_collection().update_one(
+            *self._upsert_query(), upsert=True
+        )
+
+        if result.upserted_id is not None:
+            self.id = result.upserted_id
+
     @classmethod
     async def get_by_params(cls, params: CommonParams, paging, sorting):
         result = cls.find_all()
@@ -64,8 +121,11 @@ class DailyReport(Document):
         if not (result := mail_processor.process(doc_processor.reader.filename)):
             return
 
-        reader: FruitDailyReportPDFReader = doc_processor.reader
-        cols = doc_processor.reader.selected_columns
+        return cls.from_processed_result(doc_processor.reader, result)
+
+    @classmethod
+    def from_processed_result(cls, reader: FruitDailyReportPDFReader, result: list):
+        cols = reader.selected_columns
         products = []
 
         for d in result[0]:
@@ -88,3 +148,55 @@ class DailyReport(Document):
             product_type=reader.product_type,
             products=products
         )
+
+    @classmethod
+    async def reprocess(
+            cls,
+            attachment_store: AttachmentStore,
+            dates: list[date],
+            product_types: list[ProductType],
+            holiday_calendar: HolidayCalendar
+    ) -> list["DailyReport"]:
+        """
+        Re-run the current reader over the stored attachments expected on the dates, no request is sent to the mail
+        server. The newest attachment of each filename is processed once per date expecting it, e.g. Monday expects
+        the file of Saturday, whichever date it was stored with.
+        """
+        reports = []
+
+        for filename, values in get_expected_filenames(dates, product_types, holiday_calendar).items():
+            if not (attachments := await asyncio.to_thread(attachment_store.find, keyword=filename)):
+                continue
+
+            for report_date, product_type in values:
+                mail_processor = GmailProcessor(
+                    DocumentProcessor(
+                        report_date,
+                        attachments[0].file_type,
+                        product_type=product_type,
+                        holiday_calendar=holiday_calendar
+                    ),
+                    GmailDailyReportSearcher,
+                    attachment_store
+                )
+
+                # parsing the document is CPU bound, run it in a thread to keep the event loop responsive
+                if result := await asyncio.to_thread(mail_processor.process_stored, attachments[:1]):
+                    reports.append(cls.from_processed_result(mail_processor.document_processor.reader, result))
+
+        return reports
+
+    @classmethod
+    async def bulk_upsert(cls, reports: list["DailyReport"]):
+        """
+        Insert or replace the products of the daily reports in a single bulk write.
+        """
+        if not reports:
+            return
+
+        result = await cls.get_write_collection().bulk_write(
+            [UpdateOne(*report._upsert_query(), upsert=True) for report in reports], ordered=False
+        )
+
+        for i, _id in result.upserted_ids.items():
+            reports[i].id = _id
@@ -1,42 +1,172 @@
 import datetime as dt
-from datetime import datetime
+import heapq
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Optional, Union
 from uuid import UUID
 
-from beanie import Document
+from beanie import Document, PydanticObjectId, before_event, Insert
+from beanie.odm.operators.update.general import Set
+from beanie.odm.queries.find import FindMany
+from pydantic import Field
+from pymongo import ReturnDocument, IndexModel, ASCENDING
+from pymongo.errors import BulkWriteError
+from starlette.datastructures import CommaSeparatedStrings
 
-from app.core.enums import NotificationCategories, NotificationTypes, LogLevel
+from app.core.config import settings
+from app.core.enums import NotificationCategories, NotificationTypes, LogLevel, NotificationStatus, StatsGranularity
 from app.utils.datetime import get_date
 
+# The notifications are moved to the archive collection of their month, e.g. notifications_archive_202410
+ARCHIVE_COLLECTION_PREFIX = "notifications_archive_"
+ARCHIVE_INDEXES = [
+    IndexModel([("date", ASCENDING)]),
+    IndexModel([("category", ASCENDING)]),
+    IndexModel([("level", ASCENDING)]),
+]
+
+
+def get_archive_collection_name(date: dt.date) -> str:
+    return f"{ARCHIVE_COLLECTION_PREFIX}{date:%Y%m}"
+
 
 class Notification(Document):
-    date: dt.date = get_date()
+    date: dt.date = Field(default_factory=get_date)
     correlation_id: UUID
     category: NotificationCategories
     type: NotificationTypes
     level: LogLevel
     message: str
-    created_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    # The state in the outbox, a notification without a status is only a record and is never sent
+    status: Optional[NotificationStatus] = None
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    locked_until: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    # The time the record of a low level is removed by the TTL index
+    expire_at: Optional[datetime] = None
 
     class Settings:
         name = "notifications"
-        indexes = ["date", "category", "type", "level"]
+        indexes = [
+            "date",
+            "category",
+            "type",
+            "level",
+            IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="notification_outbox"),
+            IndexModel(
+                [("type", ASCENDING), ("status", ASCENDING), ("next_attempt_at", ASCENDING)],
+                name="notification_channel_outbox",
+            ),
+            IndexModel([("expire_at", ASCENDING)], name="notification_ttl", expireAfterSeconds=0),
+        ]
+
+    @before_event(Insert)
+    def set_expire_at(self):
+        # a notification in the outbox never expires before it is sent
+        if self.status is None and self.level in CommaSeparatedStrings(settings.NOTIFICATION_TTL_LEVELS):
+            self.expire_at = self.created_at + timedelta(seconds=settings.NOTIFICATION_TTL)
+
+    @classmethod
+    def from_exception(
+            cls, correlation_id: str, message: str, t: NotificationTypes = NotificationTypes.LINE
+    ) -> "Notification":
+        return cls(
+            correlation_id=correlation_id,
+            category=NotificationCategories.SYSTEM,
+            type=t,
+            level=LogLevel.ERROR,
+            message=message,
+            status=NotificationStatus.PENDING,
+            next_attempt_at=datetime.now(),
+        )
 
     @classmethod
     async def create_from_exception(
             cls, correlation_id: str, message: str, t: NotificationTypes = NotificationTypes.LINE
     ):
-        return await cls.insert_one(
-            cls(
-                correlation_id=correlation_id,
-                category=NotificationCategories.SYSTEM,
-                type=t,
-                level=LogLevel.ERROR,
-                message=message,
-            )
+        """
+        Create a system notification of an error, the notification is put in the outbox to be sent by the dispatcher.
+        """
+        return await cls.insert_one(cls.from_exception(correlation_id, message, t))
+
+    @classmethod
+    async def bulk_insert(cls, notifications: list["Notification"]) -> dict[int, str]:
+        """
+        Insert the notifications unordered, so a failed insert does not stop the others.
+        The ids are generated beforehand to be returned to the caller.
+
+        :return: The errors of the failed inserts keyed on the positions of the notifications.
+        """
+        for notification in notifications:
+            notification.id = notification.id or PydanticObjectId()
+            # the events are not triggered by insert_many
+            notification.set_expire_at()
+
+        try:
+            await cls.insert_many(notifications, ordered=False)
+        except BulkWriteError as e:
+            return {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+
+        return {}
+
+    @classmethod
+    async def claim(cls, lease: int, t: Union[NotificationTypes, None] = None) -> Union["Notification", None]:
+        """
+        Atomically claim a notification of the outbox. A notification is claimable if it is pending and due,
+        or if the lease of the dispatcher that claimed it has expired, e.g. the dispatcher was restarted.
+
+        :param lease: The seconds the notification is leased to the caller.
+        :param t: Only claim the notifications of the type.
+        :return: The claimed notification, `None` if the outbox is empty.
+        """
+        now = datetime.now()
+        query = {
+            "$or": [
+                {"status": NotificationStatus.PENDING, "next_attempt_at": {"$lte": now}},
+                {"status": NotificationStatus.SENDING, "locked_until": {"$lt": now}},
+            ]
+        }
+
+        if t is not None:
+            query["type"] = t
+
+        document = await cls.get_motor_collection().find_one_and_update(
+            query,
+            {
+                "$set": {"status": NotificationStatus.SENDING, "locked_until": now + timedelta(seconds=lease)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
         )
 
+        return cls.model_validate(document) if document else None
+
     @classmethod
-    async def get_by_params(cls, params, paging, sorting):
+    async def count_outbox(cls) -> dict[NotificationStatus, int]:
+        return {
+            status: await cls.find(cls.status == status).count()
+            for status in (NotificationStatus.PENDING, NotificationStatus.SENDING, NotificationStatus.FAILED)
+        }
+
+    async def release(self, **fields):
+        """
+        Update the state of a claimed notification, nothing is updated if the notification has been claimed again
+        by another dispatcher after the lease expired.
+        """
+        await Notification.find_one(
+            Notification.id == self.id,
+            Notification.attempts == self.attempts,
+        ).update(Set(fields | {"locked_until": None}))
+
+    @classmethod
+    def find_by_params(cls, params) -> FindMany["Notification"]:
         result = cls.find_all()
 
         if params.date:
@@ -48,10 +178,116 @@ class Notification(Document):
         if params.level:
             result = result.find(cls.level == params.level)
 
+        return result
+
+    @classmethod
+    async def get_by_params(cls, params, paging, sorting):
         return await (
-            result
+            cls.find_by_params(params)
             .skip(paging.skip)
             .limit(paging.limit)
             .sort(sorting.sort)
             .to_list()
         )
+
+    @classmethod
+    async def get_archive_collection_names(cls, params) -> list[str]:
+        """
+        :return: The archive collection of the month if the date is given, all the archive collections otherwise.
+        """
+        if params.date:
+            return [get_archive_collection_name(params.date)]
+
+        database = cls.get_motor_collection().database
+
+        return await database.list_collection_names(filter={"name": {"$regex": f"^{ARCHIVE_COLLECTION_PREFIX}"}})
+
+    @classmethod
+    async def get_archived_by_params(cls, params, paging, sorting) -> list["Notification"]:
+        """
+        Query the archive collections, only the collection of the month is queried if the date is given.
+        Every collection returns the documents up to the end of the page, and they are merged in order.
+        """
+        database = cls.get_motor_collection().database
+        names = await cls.get_archive_collection_names(params)
+        query = cls.find_by_params(params).get_filter_query()
+        field = sorting.sort.lstrip("+-")
+        direction = -1 if sorting.sort.startswith("-") else 1
+        pages = [
+            await database[name].find(query).sort(field, direction).limit(paging.skip + paging.limit).to_list(None)
+            for name in names
+        ]
+        # null is sorted before any value as MongoDB does
+        documents = heapq.merge(
+            *pages, key=lambda d: (d.get(field) is not None, d.get(field)), reverse=direction == -1
+        )
+
+        return [cls.model_validate(d) for d in islice(documents, paging.skip, paging.skip + paging.limit)]
+
+    @classmethod
+    def stats_pipeline(cls, params, stats_params) -> list[dict]:
+        query = cls.find_by_params(params)
+
+        if stats_params.start:
+            query = query.find(cls.date >= stats_params.start)
+        if stats_params.end:
+            query = query.find(cls.date <= stats_params.end)
+
+        # the date is already truncated to the day, only the larger buckets need $dateTrunc
+        if stats_params.granularity is StatsGranularity.DAY:
+            bucket = "$date"
+        else:
+            bucket = {"$dateTrunc": {"date": "$date", "unit": stats_params.granularity.value}}
+
+            if stats_params.granularity is StatsGranularity.WEEK:
+                bucket["$dateTrunc"]["startOfWeek"] = "monday"
+
+        return [
+            {"$match": query.get_filter_query()},
+            {
+                "$group": {
+                    "_id": {"bucket": bucket, "category": "$category", "type": "$type", "level": "$level"},
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$sort": {"_id.bucket": 1, "_id.category": 1, "_id.type": 1, "_id.level": 1}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "bucket": "$_id.bucket",
+                    "category": "$_id.category",
+                    "type": "$_id.type",
+                    "level": "$_id.level",
+                    "count": 1,
+                }
+            },
+        ]
+
+    @classmethod
+    async def get_stats(cls, params, stats_params) -> list[dict]:
+        """
+        Count the notifications per time bucket, category, type and level in the database.
+        """
+        return await cls.get_motor_collection().aggregate(cls.stats_pipeline(params, stats_params)).to_list(None)
+
+    @classmethod
+    async def get_archived_stats(cls, params, stats_params) -> list[dict]:
+        """
+        Count the archived notifications per time bucket, category, type and level, only the archive collections
+        of the months in the range are aggregated, and the counts of a bucket spanning several months are summed.
+        """
+        database = cls.get_motor_collection().database
+        pipeline = cls.stats_pipeline(params, stats_params)
+        first = get_archive_collection_name(stats_params.start) if stats_params.start else ""
+        last = get_archive_collection_name(stats_params.end) if stats_params.end else None
+        counts = Counter()
+
+        for name in await cls.get_archive_collection_names(params):
+            if first <= name and (last is None or name <= last):
+                async for result in database[name].aggregate(pipeline):
+                    counts[result["bucket"], result["category"], result["type"], result["level"]] += result["count"]
+
+        return [
+            {"bucket": bucket, "category": category, "type": type_, "level": level, "count": count}
+            for (bucket, category, type_, level), count in sorted(counts.items())
+        ]
@@ -1,13 +1,30 @@
+import asyncio
+from collections import defaultdict
+from contextlib import nullcontext
 from datetime import date
-from typing import Union
+from typing import Union, TYPE_CHECKING
 
 from beanie import Document, Indexed
-from pydantic import field_validator, Field, BaseModel, ConfigDict
+from beanie.odm.utils.encoder import Encoder
+from pydantic import field_validator, Field, BaseModel, ConfigDict, PrivateAttr
+from structlog import get_logger, BoundLogger
 
+from app.core.config import settings
+from app.core.enums import RedisCacheKey
 from app.models.utils import clean_value
 from app.utils.datetime import datetime_formatter
+from app.utils.holiday_calendars import YearCalendar
 from app.utils.open_apis import TaiwanCalendarApi
 
+if TYPE_CHECKING:
+    from app.dependencies.redis import Redis
+
+# Logger
+logger: BoundLogger = get_logger()
+
+# Only a single fetch of the calendar of a year runs in the process, the others wait for it
+_year_locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
 
 class HolidayInfo(BaseModel):
     name: str
@@ -33,22 +50,73 @@ class Holiday(BaseModel):
 class SpecialHoliday(Document):
     year: Indexed(int)
     holidays: list[Holiday]
+    _calendar: Union[YearCalendar, None] = PrivateAttr(None)
 
     class Settings:
         name = "special_holidays"
 
+    @property
+    def calendar(self) -> YearCalendar:
+        """
+        The bitsets of the holidays of the year, it is built once per document,
+        so a document cached in the process is only built once until it expires.
+        """
+        if self._calendar is None:
+            self._calendar = YearCalendar(self.year, (h.date for h in self.holidays))
+
+        return self._calendar
+
     @classmethod
     async def create_holidays(cls, l: list[dict]) -> list[Holiday]:
         return [Holiday(date=d["date"], info=HolidayInfo(**d["info"])) for d in l]
 
     @classmethod
-    async def get_document_by_year(cls, year: int):
-        document = cls.find_one(cls.year == year)
+    async def get_document_by_year(cls, year: int, redis: Union["Redis", None] = None):
+        """
+        Get the holidays of the year, the calendar is fetched from the open API if the year is not in the database.
+        The fetch is single-flight, the callers of the same year in the process and, if `redis` is given,
+        in the other workers wait for the one fetching it and read the result from the database.
+        """
+        if (document := await cls.find_one(cls.year == year)) is not None:
+            return document
+
+        async with _year_locks[year]:
+            # the year may have been fetched while waiting for the lock
+            if (document := await cls.find_one(cls.year == year)) is not None:
+                return document
+
+            lock = nullcontext(True) if redis is None else redis.lock(
+                RedisCacheKey.TAIWAN_CALENDAR_LOCK.value.format(year=year),
+                timeout=settings.TAIWAN_CALENDAR_LOCK_TIMEOUT,
+                blocking_timeout=settings.TAIWAN_CALENDAR_LOCK_TIMEOUT,
+            )
+
+            async with lock as acquired:
+                if (document := await cls.find_one(cls.year == year)) is not None:
+                    return document
+                if not acquired:
+                    # never fail the request because of the lock
+                    await logger.awarning("Fetching the calendar without the lock", year=year)
+
+                return await cls.fetch(year)
 
-        if await document is None:
-            l = await TaiwanCalendarApi(year).get_cleaned_list()
-            await cls.insert(cls(year=year, holidays=await cls.create_holidays(l)))
+    @classmethod
+    async def add_holiday(cls, holiday: Holiday) -> bool:
+        """
+        Add the holiday to its year in a single conditional update, so the concurrent additions are not lost.
+
+        :return: False if the year does not exist or the holiday already exists.
+        """
+        encoded = Encoder().encode(holiday)
+        result = await cls.get_motor_collection().update_one(
+            {"year": holiday.date.year, "holidays": {"$ne": encoded}},
+            {"$push": {"holidays": encoded}},
+        )
 
-            document = cls.find_one(cls.year == year)
+        return result.modified_count == 1
+
+    @classmethod
+    async def fetch(cls, year: int):
+        l = await TaiwanCalendarApi(year).get_cleaned_list()
 
-        return await document
+        return await cls.insert(cls(year=year, holidays=await cls.create_holidays(l)))
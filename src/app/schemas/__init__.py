@@ -2,11 +2,22 @@ from typing import Union
 
 from pydantic import ConfigDict
 
-from .daily_reports import DailyReport
-from .notifications import Notification, NotificationCreate
+from .calendar import BusinessDay, BusinessDayCount, BusinessDayRange
+from .daily_reports import DailyReport, ReprocessedDailyReports, DailyReportBackfill, DailyReportJob
+from .notifications import (
+    Notification,
+    NotificationCreate,
+    NotificationBulk,
+    NotificationBulkResult,
+    NotificationStats,
+    NotificationStatsBucket,
+    NotificationMetrics,
+    ChannelMetrics,
+    ErrorRecorderMetrics,
+)
 from .pagination import Paginated, PaginationParams
 from .sorting import SortingParams
-from .special_holidays import HolidayCreate, Holiday
+from .special_holidays import HolidayCreate, Holiday, Holidays
 from ..core.enums import WeekDay
 
 
@@ -0,0 +1,19 @@
+import datetime
+
+from pydantic import BaseModel
+
+
+class BusinessDay(BaseModel):
+    date: datetime.date
+    n: int
+    business_day: datetime.date
+
+
+class BusinessDayCount(BaseModel):
+    start: datetime.date
+    end: datetime.date
+    total: int
+
+
+class BusinessDayRange(BusinessDayCount):
+    business_days: list[datetime.date]
@@ -1,8 +1,9 @@
 import datetime
+from typing import Union
 
 from pydantic import BaseModel, ConfigDict
 
-from app.core.enums import Category, SupplyType, ProductType
+from app.core.enums import Category, SupplyType, ProductType, JobStatus, WeekDay
 from app.models.daily_reports import Product
 
 
@@ -13,3 +14,31 @@ class DailyReport(BaseModel):
     product_type: ProductType
     products: list[Product]
     model_config = ConfigDict(from_attributes=True)
+
+
+class ReprocessedDailyReports(BaseModel):
+    total: int
+    results: list[DailyReport]
+
+
+class DailyReportBackfill(BaseModel):
+    start: datetime.date
+    end: datetime.date
+    product_types: list[ProductType]
+    expected: int
+
+
+class DailyReportJob(BaseModel):
+    id: str
+    status: JobStatus
+    date: datetime.date
+    product_type: ProductType
+    callback_url: Union[str, None] = None
+    correlation_id: Union[str, None] = None
+    prev_day_is_holiday: Union[bool, None] = None
+    weekday: Union[WeekDay, None] = None
+    total: int = 0
+    results: list[DailyReport] = []
+    error: Union[str, None] = None
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
@@ -1,9 +1,10 @@
 import datetime
+from typing import Union
 from uuid import UUID
 
 from pydantic import BaseModel
 
-from app.core.enums import NotificationCategories, NotificationTypes, LogLevel
+from app.core.enums import NotificationCategories, NotificationTypes, LogLevel, NotificationStatus, StatsGranularity
 
 
 class Notification(BaseModel):
@@ -14,6 +15,9 @@ class Notification(BaseModel):
     level: LogLevel
     message: str
     created_at: datetime.datetime
+    status: Union[NotificationStatus, None] = None
+    attempts: int = 0
+    delivered_at: Union[datetime.datetime, None] = None
 
 
 class NotificationCreate(BaseModel):
@@ -22,3 +26,53 @@ class NotificationCreate(BaseModel):
     type: NotificationTypes
     level: LogLevel
     message: str
+
+
+class NotificationBulkResult(BaseModel):
+    index: int
+    id: Union[str, None] = None
+    error: Union[str, None] = None
+
+
+class NotificationBulk(BaseModel):
+    inserted: int
+    failed: int
+    results: list[NotificationBulkResult]
+
+
+class NotificationStatsBucket(BaseModel):
+    bucket: datetime.date
+    category: NotificationCategories
+    type: NotificationTypes
+    level: LogLevel
+    count: int
+
+
+class NotificationStats(BaseModel):
+    granularity: StatsGranularity
+    results: list[NotificationStatsBucket]
+
+
+class ChannelMetrics(BaseModel):
+    concurrency: int
+    rate: float
+    backlog: int
+    in_flight: int
+    sent: int
+    skipped: int
+    avg_wait_seconds: float
+    max_wait_seconds: float
+    avg_send_seconds: float
+
+
+class ErrorRecorderMetrics(BaseModel):
+    buffered: int
+    recorded: int
+    dropped: int
+    flushed: int
+
+
+class NotificationMetrics(BaseModel):
+    channels: dict[NotificationTypes, ChannelMetrics]
+    outbox: dict[NotificationStatus, int]
+    errors: ErrorRecorderMetrics
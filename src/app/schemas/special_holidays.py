@@ -12,3 +12,8 @@ class Holiday(BaseModel):
 
 class HolidayCreate(Holiday):
     pass
+
+
+class Holidays(BaseModel):
+    total: int
+    holidays: list[Holiday]
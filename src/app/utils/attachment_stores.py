@@ -0,0 +1,222 @@
+import datetime
+import gzip
+import hashlib
+import os
+import sqlite3
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import closing
+from os.path import join as path_join, exists
+from typing import Union
+
+from pydantic import BaseModel
+from structlog import get_logger, BoundLogger
+
+from app.core.enums import FileTypes, ProductType
+
+# Logger
+logger: BoundLogger = get_logger()
+
+# Directory and file names
+OBJECTS_DIR_NAME = 'objects'
+INDEX_FILE_NAME = 'index.sqlite3'
+OBJECT_SUFFIX = '.gz'
+
+
+class StoredAttachment(BaseModel):
+    """
+    The index entry of a raw attachment persisted in an `AttachmentStore`.
+    """
+
+    message_id: str
+    keyword: str
+    date: Union[datetime.date, None] = None
+    product_type: Union[ProductType, None] = None
+    file_type: FileTypes
+    digest: str
+    size: int
+    created_at: datetime.datetime
+
+
+class AttachmentStore(ABC):
+    """
+    `AttachmentStore` is an abstract class that defines the interface for persisting raw email attachments,
+    so that they can be processed again without downloading them from the mail server.
+    """
+
+    @abstractmethod
+    def put(
+            self,
+            message_id: str,
+            keyword: str,
+            data: bytes,
+            file_type: FileTypes,
+            date: Union[datetime.date, None] = None,
+            product_type: Union[ProductType, None] = None
+    ) -> StoredAttachment:
+        pass
+
+    @abstractmethod
+    def read(self, attachment: StoredAttachment) -> bytes:
+        pass
+
+    @abstractmethod
+    def get(self, message_id: str) -> Union[StoredAttachment, None]:
+        pass
+
+    @abstractmethod
+    def find(
+            self,
+            keyword: Union[str, None] = None,
+            start: Union[datetime.date, None] = None,
+            end: Union[datetime.date, None] = None,
+            product_type: Union[ProductType, None] = None
+    ) -> list[StoredAttachment]:
+        pass
+
+
+class LocalAttachmentStore(AttachmentStore):
+    """
+    A content-addressed attachment store on the local file system.
+
+    The attachments are gzip-compressed and saved under their SHA-256 digest, so identical files are stored once.
+    A SQLite index maps the Gmail message id, the search keyword and the date of the report to the digest.
+    """
+
+    COLUMNS = ('message_id', 'keyword', 'date', 'product_type', 'file_type', 'digest', 'size', 'created_at')
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.objects_dir = path_join(root_dir, OBJECTS_DIR_NAME)
+        self.index_file = path_join(root_dir, INDEX_FILE_NAME)
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # the directories and the index are created lazily, a store that is never written to leaves no trace
+        if not self._initialized:
+            os.makedirs(self.objects_dir, exist_ok=True)
+
+            with closing(sqlite3.connect(self.index_file)) as conn, conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS attachments ('
+                    'message_id TEXT PRIMARY KEY, keyword TEXT NOT NULL, date TEXT, product_type TEXT, '
+                    'file_type TEXT NOT NULL, digest TEXT NOT NULL, size INTEGER NOT NULL, created_at TEXT NOT NULL)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS ix_attachments_keyword ON attachments (keyword)')
+                conn.execute('CREATE INDEX IF NOT EXISTS ix_attachments_date ON attachments (date)')
+
+            self._initialized = True
+
+        return sqlite3.connect(self.index_file)
+
+    def _object_path(self, digest: str) -> str:
+        return path_join(self.objects_dir, digest[:2], f'{digest}{OBJECT_SUFFIX}')
+
+    def _to_attachment(self, row: tuple) -> StoredAttachment:
+        return StoredAttachment(**dict(zip(self.COLUMNS, row)))
+
+    def put(
+            self,
+            message_id: str,
+            keyword: str,
+            data: bytes,
+            file_type: FileTypes,
+            date: Union[datetime.date, None] = None,
+            product_type: Union[ProductType, None] = None
+    ) -> StoredAttachment:
+        """
+        Persist the raw bytes of an attachment and index it by the message id, keyword and date.
+
+        :return: The index entry of the stored attachment.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        attachment = StoredAttachment(
+            message_id=message_id,
+            keyword=keyword,
+            date=date,
+            product_type=product_type,
+            file_type=file_type,
+            digest=digest,
+            size=len(data),
+            created_at=datetime.datetime.now(),
+        )
+
+        with closing(self._connect()) as conn, conn:
+            path = self._object_path(digest)
+
+            if not exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                # write to a temporary file first, so a crash never leaves a truncated object behind
+                with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as temp_file:
+                    temp_file.write(gzip.compress(data))
+                os.replace(temp_file.name, path)
+
+            conn.execute(
+                f'INSERT OR REPLACE INTO attachments ({", ".join(self.COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    attachment.message_id,
+                    attachment.keyword,
+                    attachment.date.isoformat() if attachment.date else None,
+                    str(attachment.product_type) if attachment.product_type else None,
+                    str(attachment.file_type),
+                    attachment.digest,
+                    attachment.size,
+                    attachment.created_at.isoformat(),
+                )
+            )
+
+        return attachment
+
+    def read(self, attachment: StoredAttachment) -> bytes:
+        with open(self._object_path(attachment.digest), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def get(self, message_id: str) -> Union[StoredAttachment, None]:
+        if not exists(self.index_file):
+            return None
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f'SELECT {", ".join(self.COLUMNS)} FROM attachments WHERE message_id = ?', (message_id,)
+            ).fetchone()
+
+        return self._to_attachment(row) if row else None
+
+    def find(
+            self,
+            keyword: Union[str, None] = None,
+            start: Union[datetime.date, None] = None,
+            end: Union[datetime.date, None] = None,
+            product_type: Union[ProductType, None] = None
+    ) -> list[StoredAttachment]:
+        """
+        Find the stored attachments, the newest attachment comes first.
+        """
+        if not exists(self.index_file):
+            return []
+
+        conditions, params = [], []
+
+        if keyword is not None:
+            conditions.append('keyword = ?')
+            params.append(keyword)
+        if start is not None:
+            conditions.append('date >= ?')
+            params.append(start.isoformat())
+        if end is not None:
+            conditions.append('date <= ?')
+            params.append(end.isoformat())
+        if product_type is not None:
+            conditions.append('product_type = ?')
+            params.append(str(product_type))
+
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f'SELECT {", ".join(self.COLUMNS)} FROM attachments {where} ORDER BY created_at DESC, rowid DESC',
+                params
+            ).fetchall()
+
+        return [self._to_attachment(row) for row in rows]
@@ -0,0 +1,84 @@
+import struct
+from typing import Any
+
+from pydantic import TypeAdapter
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.utils.local_caches import MISSING
+
+try:
+    import zstandard
+except ImportError:
+    # the payloads are stored uncompressed without it
+    zstandard = None
+
+# Logger
+logger: BoundLogger = get_logger()
+
+# The header of a payload: the magic byte, the schema version and the compression of the body.
+# A pickle starts with 0x80, so the entries cached before the codec are misses as well.
+HEADER = struct.Struct(">BHB")
+MAGIC = 0xCA
+UNCOMPRESSED = 0
+ZSTD = 1
+
+
+class CacheCodec:
+    """
+    `CacheCodec` serializes the cached values to compact JSON by their type instead of pickling them, so a cached
+    entry does not depend on the layout of the classes and loading it does not run arbitrary code.
+
+    The payload is prefixed with the schema `version`, bump it when the cached type changes, the entries of the
+    other versions are treated as misses. The bodies larger than `compress_threshold` bytes are compressed with
+    zstd if it is installed.
+    """
+
+    def __init__(
+            self,
+            t: Any,
+            version: int = 1,
+            compress_threshold: int = settings.CACHE_COMPRESS_THRESHOLD
+    ):
+        self.adapter = TypeAdapter(t)
+        self.version = version
+        self.compress_threshold = compress_threshold
+
+    def encode(self, data: Any) -> bytes:
+        body = self.adapter.dump_json(data)
+        compression = UNCOMPRESSED
+
+        if zstandard is not None and 0 < self.compress_threshold < len(body):
+            body = zstandard.compress(body)
+            compression = ZSTD
+
+        return HEADER.pack(MAGIC, self.version, compression) + body
+
+    def decode(self, payload: bytes) -> Any:
+        """
+        :return: The cached value, `MISSING` if the payload is of another version or cannot be decoded.
+        """
+        if len(payload) < HEADER.size:
+            return MISSING
+
+        magic, version, compression = HEADER.unpack_from(payload)
+
+        if magic != MAGIC or version != self.version:
+            return MISSING
+
+        body = payload[HEADER.size:]
+
+        try:
+            if compression == ZSTD:
+                if zstandard is None:
+                    return MISSING
+
+                body = zstandard.decompress(body)
+            elif compression != UNCOMPRESSED:
+                return MISSING
+
+            return self.adapter.validate_json(body)
+        except Exception as e:
+            logger.warning("Failed to decode the cached value", error=str(e))
+            return MISSING
+
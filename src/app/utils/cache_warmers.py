@@ -0,0 +1,102 @@
+import asyncio
+import datetime
+from typing import Union
+
+from structlog import get_logger, BoundLogger
+
+from app.api.v1.endpoints.utils import reload_cached_holidays
+from app.core.config import settings
+from app.dependencies.redis import Redis
+from app.dependencies.special_holidays import cache_key
+from app.models import DailyReport, SpecialHoliday
+from app.utils.datetime import get_date
+from app.utils.report_calendars import get_report_calendar
+from app.utils.workers import PeriodicWorker
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+class CacheWarmer(PeriodicWorker):
+    """
+    `CacheWarmer` preloads the caches at the startup, so the first requests after a deploy or a restart of Redis
+    do not pay for the misses. The caches of the holidays are refreshed periodically afterwards, before the
+    in-process cache expires.
+
+    The startup waits for the warmup at most `budget` seconds, a slower warmup goes on in the background.
+    """
+
+    error_message = "Failed to refresh the caches"
+    # the caches are warmed up by the startup
+    wait_first = True
+
+    def __init__(
+            self,
+            redis: Redis,
+            budget: float = settings.WARMUP_BUDGET,
+            interval: float = settings.WARMUP_INTERVAL,
+            daily_report_days: int = settings.WARMUP_DAILY_REPORT_DAYS
+    ):
+        super().__init__(interval)
+        self.redis = redis
+        self.budget = budget
+        self.daily_report_days = daily_report_days
+        self._warmup_task: Union[asyncio.Task, None] = None
+
+    async def on_stop(self):
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+            self._warmup_task = None
+
+    async def warm_holidays(self, today: Union[datetime.date, None] = None):
+        """
+        Load the holidays of the previous, the current and the next year. The calendar of the next year is only
+        loaded if it is in the database, it may not be published yet.
+        """
+        year = (today or get_date()).year
+
+        for y in (year - 1, year, year + 1):
+            try:
+                if y > year and not await SpecialHoliday.find_one(SpecialHoliday.year == y):
+                    continue
+
+                # the in-process cache is renewed even if it holds the year, so the requests never miss it,
+                # the bitsets of the calendar and its report calendar are built before the first request as well
+                get_report_calendar((await reload_cached_holidays(await cache_key(y), self.redis, y)).calendar)
+            except Exception:
+                await logger.aexception("Failed to warm up the holidays", year=y)
+
+    async def warm_daily_reports(self, today: Union[datetime.date, None] = None):
+        """
+        Read the daily reports of the latest days, so they are in the cache of MongoDB.
+        """
+        if self.daily_report_days <= 0:
+            return
+
+        start = (today or get_date()) - datetime.timedelta(days=self.daily_report_days)
+
+        try:
+            await DailyReport.find(DailyReport.date >= start).to_list()
+        except Exception:
+            await logger.aexception("Failed to warm up the daily reports")
+
+    async def warmup(self) -> bool:
+        """
+        :return: False if the warmup is not finished in the budget, it goes on in the background.
+        """
+        self._warmup_task = asyncio.create_task(self._warm())
+        done, _ = await asyncio.wait({self._warmup_task}, timeout=self.budget)
+
+        if not done:
+            await logger.awarning("The warmup is not finished in the budget", budget=self.budget)
+
+        return bool(done)
+
+    async def _warm(self):
+        await asyncio.gather(self.warm_holidays(), self.warm_daily_reports())
+
+    async def run_once(self) -> bool:
+        await self.warm_holidays()
+
+        return False
@@ -0,0 +1,139 @@
+import time
+from typing import Callable, Awaitable
+
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.core.enums import CircuitState
+from app.utils.workers import PeriodicWorker
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker of an unreliable channel.
+
+    - closed: the requests are allowed, the breaker is opened after `failure_threshold` consecutive failures.
+    - open: the requests are rejected until `recovery_timeout` seconds have passed.
+    - half-open: a single trial request is allowed, the breaker is closed if it succeeds and opened again otherwise.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int = settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout: float = settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.failures = 0
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state is CircuitState.OPEN and self.clock() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+
+        return self._state
+
+    def allow_request(self) -> bool:
+        match self.state:
+            case CircuitState.CLOSED:
+                return True
+            case CircuitState.HALF_OPEN if not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+        return False
+
+    def record_success(self):
+        if self._state is not CircuitState.CLOSED:
+            logger.info("Circuit breaker closed", name=self.name)
+
+        self.failures = 0
+        self._state = CircuitState.CLOSED
+        self._trial_in_flight = False
+
+    def release(self):
+        """
+        Release the trial of the request that neither succeeded nor failed on the channel, e.g. a client error,
+        the state and the failures are kept and another trial is allowed.
+        """
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+
+        if self.state is CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.open()
+
+    def open(self):
+        if self._state is not CircuitState.OPEN:
+            logger.warning("Circuit breaker opened", name=self.name, failures=self.failures)
+
+        self._state = CircuitState.OPEN
+        self._opened_at = self.clock()
+        self._trial_in_flight = False
+
+
+# The circuit breakers are shared by all the requests of the process
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    if name not in _circuit_breakers:
+        _circuit_breakers[name] = CircuitBreaker(name)
+
+    return _circuit_breakers[name]
+
+
+def reset_circuit_breakers():
+    _circuit_breakers.clear()
+
+
+class CircuitBreakerProber(PeriodicWorker):
+    """
+    Probes the channels of the open circuit breakers in the background, so a channel that has recovered is closed
+    without sacrificing a real request to the trial.
+    """
+
+    error_message = "Failed to probe the channels"
+
+    def __init__(
+            self,
+            probes: dict[str, Callable[[], Awaitable[bool]]],
+            interval: float = settings.CIRCUIT_BREAKER_PROBE_INTERVAL
+    ):
+        super().__init__(interval)
+        self.probes = probes
+
+    async def probe(self):
+        for name, probe in self.probes.items():
+            breaker = get_circuit_breaker(name)
+
+            if breaker.state is not CircuitState.HALF_OPEN or not breaker.allow_request():
+                continue
+
+            try:
+                healthy = await probe()
+            except Exception:
+                await logger.aexception("Failed to probe the channel", name=name)
+                healthy = False
+
+            if healthy:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+    async def run_once(self) -> bool:
+        await self.probe()
+
+        return False
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import datetime
+import time
+from typing import Union
+
+from beanie.odm.operators.find.comparison import In
+from pydantic import BaseModel
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.core.enums import FileTypes, ProductType
+from app.models.daily_reports import DailyReport
+from app.utils.attachment_stores import AttachmentStore
+from app.utils.email_processors import GmailProcessor, GmailDailyReportSearcher
+from app.utils.file_processors import DocumentProcessor
+from app.utils.holiday_calendars import HolidayCalendar
+from app.utils.report_calendars import get_expected_filenames
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+class BackfillSummary(BaseModel):
+    expected: int = 0
+    existing: int = 0
+    not_found: int = 0
+    failed: int = 0
+    saved: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.saved / self.elapsed if self.elapsed else 0.0
+
+
+class DailyReportBackfill:
+    """
+    `DailyReportBackfill` fills the missing daily reports of a range of dates.
+
+    The expected filenames are calculated up front, the emails of all the filenames are searched with combined
+    Gmail queries, then the attachments are downloaded and parsed with bounded parallelism and the daily reports
+    are saved with bulk writes.
+    """
+
+    def __init__(
+            self,
+            dates: list[datetime.date],
+            product_types: list[ProductType],
+            holiday_calendar: HolidayCalendar,
+            attachment_store: Union[AttachmentStore, None] = None,
+            concurrency: int = settings.BACKFILL_CONCURRENCY,
+            batch_size: int = settings.BACKFILL_BATCH_SIZE
+    ):
+        self.dates = dates
+        self.product_types = product_types
+        self.holiday_calendar = holiday_calendar
+        self.attachment_store = attachment_store
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.summary = BackfillSummary()
+        self._missing: dict[str, list[tuple[datetime.date, ProductType]]] = {}
+
+    def expected_filenames(self) -> dict[str, list[tuple[datetime.date, ProductType]]]:
+        """
+        :return: The dates and the product types of the daily reports keyed by the filename.
+        """
+        return get_expected_filenames(self.dates, self.product_types, self.holiday_calendar)
+
+    def _get_mail_processor(self, date: datetime.date, product_type: ProductType) -> GmailProcessor:
+        # every task has its own processor, because the Gmail service object is not thread-safe
+        return GmailProcessor(
+            DocumentProcessor(date, FileTypes.PDF, product_type=product_type, holiday_calendar=self.holiday_calendar),
+            GmailDailyReportSearcher,
+            self.attachment_store
+        )
+
+    async def _get_missing_filenames(self) -> dict[str, list[tuple[datetime.date, ProductType]]]:
+        filenames = self.expected_filenames()
+        existing = {
+            (report.date, report.product_type)
+            for report in await DailyReport.find(
+                DailyReport.date >= min(self.dates),
+                DailyReport.date <= max(self.dates),
+                In(DailyReport.product_type, self.product_types),
+            ).to_list()
+        }
+        missing = {
+            filename: [value for value in values if value not in existing] for filename, values in filenames.items()
+        }
+        self.summary.expected = sum(len(values) for values in filenames.values())
+        self.summary.existing = self.summary.expected - sum(len(values) for values in missing.values())
+
+        return {filename: values for filename, values in missing.items() if values}
+
+    def _locate(self, filenames: list[str]) -> dict[str, Union[dict, None]]:
+        """
+        Locate the attachments of the filenames, an attachment is either in the attachment store or in an email.
+        The filenames that are not in the store are searched with combined OR queries.
+
+        :return: The email of each located filename, `None` if the attachment is in the store.
+        """
+        stored = {
+            filename
+            for filename in filenames
+            if self.attachment_store is not None and self.attachment_store.find(keyword=filename)
+        }
+        located: dict[str, Union[dict, None]] = dict.fromkeys(stored)
+
+        if searched := [filename for filename in filenames if filename not in stored]:
+            searcher = self._get_mail_processor(*self._missing[searched[0]][0]).searcher
+
+            for filename, email in searcher.search_many(searched, FileTypes.PDF).items():
+                if email.get('has_file'):
+                    located[filename] = email
+
+        return located
+
+    async def _extract(
+            self,
+            semaphore: asyncio.Semaphore,
+            filename: str,
+            date: datetime.date,
+            product_type: ProductType,
+            email: Union[dict, None]
+    ) -> Union[DailyReport, None]:
+        async with semaphore:
+            mail_processor = self._get_mail_processor(date, product_type)
+
+            if email is not None:
+                result = await asyncio.to_thread(mail_processor.process_email, email['id'], filename)
+            else:
+                result = await asyncio.to_thread(
+                    lambda: mail_processor.process_stored(self.attachment_store.find(keyword=filename))
+                )
+
+        return DailyReport.from_processed_result(mail_processor.document_processor.reader, result) if result else None
+
+    async def run(self) -> BackfillSummary:
+        started_at = time.perf_counter()
+        self._missing = await self._get_missing_filenames()
+        located = await asyncio.to_thread(self._locate, list(self._missing))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # the daily report of every date is extracted with its own reader, the columns depend on the date
+        tasks = [
+            asyncio.create_task(self._extract(semaphore, filename, date, product_type, email))
+            for filename, email in located.items()
+            for date, product_type in self._missing[filename]
+        ]
+        self.summary.not_found = sum(len(values) for values in self._missing.values()) - len(tasks)
+        reports = []
+
+        await logger.ainfo("Backfill started", expected=self.summary.expected, located=len(tasks))
+
+        for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+            try:
+                if report := await task:
+                    reports.append(report)
+            except Exception:
+                self.summary.failed += 1
+                await logger.aexception("Failed to extract the daily report")
+
+            if len(reports) >= self.batch_size:
+                await self._save(reports)
+
+            await logger.ainfo(
+                "Backfill progress",
+                done=done,
+                total=len(tasks),
+                saved=self.summary.saved + len(reports),
+                throughput=round(done / (time.perf_counter() - started_at), 2),
+            )
+
+        await self._save(reports)
+        self.summary.elapsed = time.perf_counter() - started_at
+        await logger.ainfo("Backfill finished", **self.summary.model_dump(), throughput=self.summary.throughput)
+
+        return self.summary
+
+    async def _save(self, reports: list[DailyReport]):
+        await DailyReport.bulk_upsert(reports)
+        self.summary.saved += len(reports)
+        reports.clear()
+
+
+async def main(argv: Union[list[str], None] = None) -> BackfillSummary:
+    """
+    Backfill the daily reports from the command line, e.g.
+    `python -m app.utils.daily_report_backfill 2024-10-01 2024-10-31 --product-type 作物`
+    """
+    from redis import asyncio as aioredis
+
+    from app.api.v1.endpoints.utils import get_cached_holiday_calendar
+    from app.core.logging import configure_logging
+    from app.db import init_db
+    from app.dependencies.daily_reports import get_date_range_params, get_product_types_param, get_attachment_store
+    from app.dependencies.redis import Redis
+
+    parser = argparse.ArgumentParser(description="Backfill the daily reports of a range of dates.")
+    parser.add_argument("start", help="The first date of the range.")
+    parser.add_argument("end", help="The last date of the range.")
+    parser.add_argument(
+        "--product-type",
+        action="append",
+        default=[],
+        type=ProductType,
+        help="The product type of the daily reports, all the product types if not set.",
+    )
+    parser.add_argument("--concurrency", type=int, default=settings.BACKFILL_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    await init_db.init()
+    params = await get_date_range_params(args.start, args.end)
+    redis = Redis(aioredis.from_url(settings.REDIS_URI))
+
+    try:
+        backfill = DailyReportBackfill(
+            params.dates,
+            await get_product_types_param(args.product_type),
+            await get_cached_holiday_calendar(redis, params.years),
+            attachment_store=await get_attachment_store(),
+            concurrency=args.concurrency,
+        )
+
+        return await backfill.run()
+    finally:
+        await redis.connection.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
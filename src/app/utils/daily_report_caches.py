@@ -0,0 +1,50 @@
+import datetime
+from typing import Union
+
+from app.core.config import settings
+from app.core.enums import ProductType, RedisCacheKey
+from app.dependencies.redis import Redis
+from app.utils.datetime import TAIPEI_TIMEZONE, get_datetime_in_taipei
+
+
+class DailyReportNotFoundCache:
+    """
+    A negative cache of the daily reports that are not published yet or do not exist,
+    so the repeated polls of such a report do not search the mail server again.
+
+    The expiry follows the expected publication time of the report:
+    - a report that is not published yet is cached until its publication time.
+    - a report that should be published already is cached for a short TTL,
+      unless its date is long past and the report is not going to come anymore.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def key(date: datetime.date, product_type: ProductType) -> str:
+        return RedisCacheKey.DAILY_REPORT_NOT_FOUND.value.format(date=date.isoformat(), product_type=product_type)
+
+    @staticmethod
+    def ttl(date: datetime.date, now: Union[datetime.datetime, None] = None) -> int:
+        """
+        :param date: The date of the daily report.
+        :param now: The current time, it must be timezone-aware.
+        :return: The TTL(in seconds) of the negative cache entry.
+        """
+        now = now or get_datetime_in_taipei()
+        published_at = datetime.datetime.combine(date, settings.DAILY_REPORT_PUBLISH_TIME, tzinfo=TAIPEI_TIMEZONE)
+        seconds = (published_at - now).total_seconds()
+
+        if seconds > 0:
+            return min(int(seconds), settings.DAILY_REPORT_NOT_FOUND_MAX_TTL)
+        if -seconds > settings.DAILY_REPORT_NOT_FOUND_MAX_TTL:
+            return settings.DAILY_REPORT_NOT_FOUND_MAX_TTL
+
+        return settings.DAILY_REPORT_NOT_FOUND_TTL
+
+    async def exists(self, date: datetime.date, product_type: ProductType) -> bool:
+        return await self.redis.exists(self.key(date, product_type))
+
+    async def set(self, date: datetime.date, product_type: ProductType, filename: str):
+        await self.redis.set(self.key(date, product_type), filename, ex=max(self.ttl(date), 1))
@@ -0,0 +1,66 @@
+import datetime
+from typing import Union
+
+from app.core.enums import FileTypes, ProductType
+from app.dependencies.redis import Redis
+from app.models.daily_reports import DailyReport
+from app.utils.attachment_stores import AttachmentStore
+from app.utils.daily_report_caches import DailyReportNotFoundCache
+from app.utils.email_processors import GmailProcessor, GmailDailyReportSearcher
+from app.utils.file_processors import DocumentProcessor
+from app.utils.holiday_calendars import HolidayCalendar
+
+
+class DailyReportExtractor:
+    """
+    `DailyReportExtractor` gets the daily report of a date from the email,
+    it is shared by the synchronous extraction of the endpoint and the extraction jobs.
+    """
+
+    def __init__(
+            self,
+            date: datetime.date,
+            product_type: ProductType,
+            holiday_calendar: HolidayCalendar,
+            redis: Redis,
+            attachment_store: Union[AttachmentStore, None] = None
+    ):
+        self.date = date
+        self.product_type = product_type
+        self.document_processor = DocumentProcessor(
+            date,
+            FileTypes.PDF,
+            product_type=product_type,
+            holiday_calendar=holiday_calendar
+        )
+        self.not_found_cache = DailyReportNotFoundCache(redis)
+        self.attachment_store = attachment_store
+
+    @property
+    def filename(self) -> Union[str, None]:
+        return self.document_processor.reader.filename
+
+    @property
+    def prev_day_is_holiday(self) -> bool:
+        return self.document_processor.reader.prev_day_is_holiday
+
+    async def should_extract(self) -> bool:
+        """
+        The date has no daily report or the daily report is known to be not published yet,
+        there is no need to search the mail server.
+        """
+        return bool(self.filename) and not await self.not_found_cache.exists(self.date, self.product_type)
+
+    async def extract(self) -> Union[DailyReport, None]:
+        """
+        Get the daily report from the email, the daily report is not saved to the database.
+
+        :return: The daily report, `None` if the email of the daily report is not received yet.
+        """
+        mail_processor = GmailProcessor(self.document_processor, GmailDailyReportSearcher, self.attachment_store)
+        daily_report = await DailyReport.get_fulfilled_instance(mail_processor)
+
+        if daily_report is None:
+            await self.not_found_cache.set(self.date, self.product_type, self.filename)
+
+        return daily_report
@@ -0,0 +1,187 @@
+import asyncio
+import datetime
+from typing import Union
+from uuid import uuid4
+
+from structlog import get_logger, BoundLogger
+
+from app import schemas
+from app.core.config import settings
+from app.core.enums import JobStatus, ProductType, RedisCacheKey, DailyReportHttpErrors, WeekDay
+from app.dependencies.redis import Redis
+from app.middlewares.correlation import correlation_id
+from app.utils.attachment_stores import AttachmentStore
+from app.utils.daily_report_extractors import DailyReportExtractor
+from app.utils.holiday_calendars import HolidayCalendar
+from app.utils.notification_coalescers import NotificationCoalescer
+from app.utils.notification_helper import get_http_client
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+class DailyReportJobStore:
+    """
+    The state of the extraction jobs is kept in Redis, so it can be polled from any instance of the service.
+    The state expires after `DAILY_REPORT_JOB_TTL` seconds.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def key(job_id: str) -> str:
+        return RedisCacheKey.DAILY_REPORT_JOB.value.format(id=job_id)
+
+    async def get(self, job_id: str) -> Union[schemas.DailyReportJob, None]:
+        data = await self.redis.get(self.key(job_id))
+
+        return schemas.DailyReportJob.model_validate_json(data) if data else None
+
+    async def save(self, job: schemas.DailyReportJob):
+        await self.redis.set(self.key(job.id), job.model_dump_json(), ex=settings.DAILY_REPORT_JOB_TTL)
+
+    async def update(self, job: schemas.DailyReportJob, **kwargs) -> schemas.DailyReportJob:
+        job = job.model_copy(update=kwargs | {"updated_at": datetime.datetime.now()})
+        await self.save(job)
+
+        return job
+
+
+class DailyReportJobWorkers:
+    """
+    A pool of asyncio workers that run the extraction jobs of the daily reports in the background.
+
+    The pool is started and stopped with the application, the jobs are queued in the process and
+    a job of the same date and product type is not queued twice while it is pending or running.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            attachment_store: Union[AttachmentStore, None] = None,
+            size: int = settings.DAILY_REPORT_JOB_WORKERS,
+            queue_size: int = settings.DAILY_REPORT_JOB_QUEUE_SIZE
+    ):
+        self.redis = redis
+        self.store = DailyReportJobStore(redis)
+        self.attachment_store = attachment_store
+        self.size = size
+        self.queue: asyncio.Queue[tuple[schemas.DailyReportJob, HolidayCalendar]] = asyncio.Queue(queue_size)
+        self._workers: list[asyncio.Task] = []
+        self._in_flight: dict[tuple[datetime.date, ProductType], schemas.DailyReportJob] = {}
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.size)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    async def submit(
+            self,
+            date: datetime.date,
+            product_type: ProductType,
+            holiday_calendar: HolidayCalendar,
+            prev_day_is_holiday: Union[bool, None] = None,
+            callback_url: Union[str, None] = None
+    ) -> schemas.DailyReportJob:
+        """
+        Queue an extraction job, the pending or running job of the same daily report is returned if there is one.
+
+        :raises asyncio.QueueFull: The queue is full.
+        """
+        if job := self._in_flight.get((date, product_type)):
+            return job
+
+        now = datetime.datetime.now()
+        job = schemas.DailyReportJob(
+            id=uuid4().hex,
+            status=JobStatus.PENDING,
+            date=date,
+            product_type=product_type,
+            callback_url=callback_url,
+            correlation_id=correlation_id.get(),
+            prev_day_is_holiday=prev_day_is_holiday,
+            weekday=WeekDay(date.isoweekday()),
+            created_at=now,
+            updated_at=now,
+        )
+        self.queue.put_nowait((job, holiday_calendar))
+        self._in_flight[(date, product_type)] = job
+        await self.store.save(job)
+
+        return job
+
+    async def _work(self):
+        while True:
+            job, holiday_calendar = await self.queue.get()
+
+            try:
+                job = await self._run(job, holiday_calendar)
+            except Exception:
+                await logger.aexception("Failed to run the extraction job", job_id=job.id)
+                job = await self._fail(job)
+            finally:
+                self._in_flight.pop((job.date, job.product_type), None)
+                self.queue.task_done()
+
+            if job.callback_url:
+                await self._callback(job)
+
+    async def _run(self, job: schemas.DailyReportJob, holiday_calendar: HolidayCalendar) -> schemas.DailyReportJob:
+        # the worker is not running in the context of the request, restore the correlation id of the request
+        correlation_id.set(job.correlation_id)
+        job = await self.store.update(job, status=JobStatus.RUNNING)
+        extractor = DailyReportExtractor(
+            job.date, job.product_type, holiday_calendar, self.redis, self.attachment_store
+        )
+
+        try:
+            daily_report = await extractor.extract()
+        except Exception:
+            msg = str(DailyReportHttpErrors.FAILED)
+            await logger.aexception(msg, job_id=job.id)
+            job = await self.store.update(job, status=JobStatus.FAILED, error=msg)
+            await NotificationCoalescer(self.redis).create_from_exception(job.correlation_id, msg)
+
+            return job
+
+        if daily_report:
+            await daily_report.upsert()
+
+        return await self.store.update(
+            job,
+            status=JobStatus.SUCCEEDED,
+            total=1 if daily_report else 0,
+            results=[schemas.DailyReport.model_validate(daily_report)] if daily_report else [],
+        )
+
+    async def _fail(self, job: schemas.DailyReportJob) -> schemas.DailyReportJob:
+        """
+        Mark the job as failed, so the clients polling it do not wait for it until its state expires.
+        """
+        msg = str(DailyReportHttpErrors.FAILED)
+
+        try:
+            return await self.store.update(job, status=JobStatus.FAILED, error=msg)
+        except Exception:
+            await logger.aexception("Failed to update the extraction job", job_id=job.id)
+
+            return job.model_copy(update={"status": JobStatus.FAILED, "error": msg})
+
+    @staticmethod
+    async def _callback(job: schemas.DailyReportJob):
+        try:
+            resp = await get_http_client().post(
+                job.callback_url,
+                content=job.model_dump_json(),
+                headers={"Content-Type": "application/json"},
+                timeout=settings.DAILY_REPORT_JOB_CALLBACK_TIMEOUT,
+            )
+            resp.raise_for_status()
+        except Exception:
+            await logger.aexception("Failed to call back the extraction job", job_id=job.id, url=job.callback_url)
@@ -0,0 +1,72 @@
+
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.models.daily_reports import DailyReport, UNIQUE_KEYS
+from app.utils.workers import PeriodicWorker
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+class DailyReportWriter(PeriodicWorker):
+    """
+    `DailyReportWriter` takes the writes of the extracted daily reports off the requests. A daily report is
+    buffered without any I/O and the buffer is upserted in a single bulk write by a background task,
+    with the relaxed write concern of the daily reports.
+
+    The same daily report written again before the flush replaces the buffered one, so a burst of extractions
+    of a date costs a single write.
+    """
+
+    error_message = "Failed to write the daily reports"
+
+    def __init__(
+            self,
+            batch_size: int = settings.DAILY_REPORT_WRITER_BATCH_SIZE,
+            interval: float = settings.DAILY_REPORT_WRITER_FLUSH_INTERVAL
+    ):
+        super().__init__(interval)
+        self.batch_size = batch_size
+        self.buffer: dict[tuple, DailyReport] = {}
+
+    async def on_stop(self):
+        # the buffered daily reports are not lost on shutdown
+        while self.buffer:
+            try:
+                await self.flush()
+            except Exception:
+                await logger.aexception("Failed to write the daily reports on shutdown", buffered=len(self.buffer))
+                break
+
+    def write(self, daily_report: DailyReport):
+        """
+        Buffer the daily report without blocking, it is upserted by the next flush.
+        """
+        key = tuple(getattr(daily_report, key) for key in UNIQUE_KEYS)
+        self.buffer.pop(key, None)
+        self.buffer[key] = daily_report
+
+    async def flush(self) -> int:
+        """
+        Upsert a batch of the buffered daily reports in a single bulk write.
+
+        :return: The number of the written daily reports.
+        """
+        keys = list(self.buffer)[:self.batch_size]
+        reports = [self.buffer.pop(key) for key in keys]
+
+        try:
+            await DailyReport.bulk_upsert(reports)
+        except Exception:
+            # the reports are put back unless they are written again in the meantime
+            for key, report in zip(keys, reports):
+                self.buffer.setdefault(key, report)
+
+            raise
+
+        return len(reports)
+
+    async def run_once(self) -> bool:
+        # keep flushing without waiting while the batches are full
+        return await self.flush() >= self.batch_size
@@ -1,8 +1,11 @@
 import platform
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import StrEnum
 
+# The timezone of Taiwan, where the daily reports are published
+TAIPEI_TIMEZONE = timezone(timedelta(hours=8), name="Asia/Taipei")
+
 
 class OsNames(StrEnum):
     WINDOWS = 'Windows'
@@ -18,6 +21,10 @@ def get_date():
     return datetime.now().date()
 
 
+def get_datetime_in_taipei():
+    return datetime.now(TAIPEI_TIMEZONE)
+
+
 def datetime_formatter(datetime_str: str):
     def transform_date(date_str, sep):
         return sep.join([str(int(part) + 1911) if len(part) == 3 else part.zfill(2) for part in date_str.split(sep)])
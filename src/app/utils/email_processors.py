@@ -13,6 +13,7 @@ from googleapiclient.discovery import build, Resource
 from structlog import get_logger, BoundLogger
 
 from app.core.enums import GmailScopes, FileTypes
+from app.utils.attachment_stores import AttachmentStore, StoredAttachment
 from app.utils.file_processors import DocumentProcessor
 
 # Logger
@@ -63,22 +64,12 @@ class GmailDailyReportSearcher(GmailSearcher):
 
         for message in messages:
             msg = self.service.users().messages().get(userId='me', id=message['id']).execute()
-            email = {
-                'id': msg['id'],
-                'subject': next(header['value'] for header in msg['payload']['headers'] if header['name'] == 'Subject')
-            }
+            email = self._get_email(msg, file_type)
 
             # Check if the email subject is the same as the keyword
             if email["subject"] != keyword or email["subject"].find(keyword) == -1:
                 continue
 
-            if file_type is not None:
-                email['has_file'] = any(
-                    part['filename'].lower().endswith(f'.{file_type}')
-                    for part in msg['payload'].get('parts', [])
-                    if 'filename' in part
-                )
-
             emails.append(email)
 
             # If the search is for a daily report, only the first email is needed
@@ -87,12 +78,66 @@ class GmailDailyReportSearcher(GmailSearcher):
 
         return emails
 
+    def search_many(
+            self,
+            keywords: List[str],
+            file_type: Union[FileTypes, None] = None,
+            chunk_size: int = 50
+    ) -> dict[str, dict[str, Union[str, bool]]]:
+        """
+        Search the daily reports of many keywords with a combined OR query instead of one query per keyword.
+
+        :param keywords: The subjects of the daily reports.
+        :param file_type: The file type of the attachments.
+        :param chunk_size: The maximum number of keywords in a single query.
+        :return: The newest email of each keyword that was found.
+        """
+        emails = {}
+
+        for i in range(0, len(keywords), chunk_size):
+            chunk = set(keywords[i:i + chunk_size])
+            query = ' OR '.join(f'subject:"{keyword}"' for keyword in chunk)
+            page_token = None
+
+            while chunk - emails.keys():
+                results = self.service.users().messages().list(userId='me', q=query, pageToken=page_token).execute()
+
+                for message in results.get('messages', []):
+                    msg = self.service.users().messages().get(userId='me', id=message['id']).execute()
+                    email = self._get_email(msg, file_type)
+
+                    # the messages are listed from the newest, so the first email of a subject is kept
+                    if email['subject'] in chunk and email['subject'] not in emails:
+                        emails[email['subject']] = email
+
+                if not (page_token := results.get('nextPageToken')):
+                    break
+
+        return emails
+
+    @staticmethod
+    def _get_email(msg: dict, file_type: Union[FileTypes, None] = None) -> dict[str, Union[str, bool]]:
+        email = {
+            'id': msg['id'],
+            'subject': next(header['value'] for header in msg['payload']['headers'] if header['name'] == 'Subject')
+        }
+
+        if file_type is not None:
+            email['has_file'] = any(
+                part['filename'].lower().endswith(f'.{file_type}')
+                for part in msg['payload'].get('parts', [])
+                if 'filename' in part
+            )
+
+        return email
+
 
 class GmailProcessor(EmailProcessor):
     def __init__(
             self,
             document_processor: Union[DocumentProcessor, None] = None,
-            searcher: Union[Type[GmailSearcher] | Type[GmailDailyReportSearcher], None] = None
+            searcher: Union[Type[GmailSearcher] | Type[GmailDailyReportSearcher], None] = None,
+            attachment_store: Union[AttachmentStore, None] = None
     ):
         self._credentials = None
         self._service = None
@@ -101,6 +146,7 @@ class GmailProcessor(EmailProcessor):
         self.token_file = path_join(CREDENTIAL_DIR, TOKEN_FILE_NAME)
         self.credentials_file = path_join(CREDENTIAL_DIR, CREDENTIALS_JSON_FILE_NAME)
         self.searcher_class = searcher
+        self.attachment_store = attachment_store
 
     @property
     def credentials(self) -> Union[Credentials, None]:
@@ -160,6 +206,10 @@ class GmailProcessor(EmailProcessor):
         if not keyword:
             return []
 
+        # The attachments downloaded before are read from the store instead of the mail server
+        if attachments := self._find_stored(keyword):
+            return self.process_stored(attachments)
+
         emails = self.searcher.search(keyword, self.document_processor.file_type)
         results = []
 
@@ -173,6 +223,20 @@ class GmailProcessor(EmailProcessor):
 
         return results
 
+    def _find_stored(self, keyword: str) -> List[StoredAttachment]:
+        """
+        Find the stored attachments of the keyword. Only the daily report searches are answered by the store,
+        their keyword is the exact filename of a single attachment. The keyword of the other searches may match
+        new emails, so the mail server is always searched.
+        """
+        if self.attachment_store is None or self.searcher_class is None:
+            return []
+
+        if not issubclass(self.searcher_class, GmailDailyReportSearcher):
+            return []
+
+        return self.attachment_store.find(keyword=keyword)
+
     def _get_attachment(self, email_id: str):
         message = self.service.users().messages().get(userId='me', id=email_id).execute()
 
@@ -185,10 +249,64 @@ class GmailProcessor(EmailProcessor):
                     userId='me', messageId=email_id, id=part['body']['attachmentId']
                 ).execute()
 
+    def process_email(self, email_id: str, keyword: str) -> List[Union[list[dict[str, str | float]], str]]:
+        """
+        Process the attachment of an email that was already found, e.g. by `GmailDailyReportSearcher.search_many`.
+        """
+        if attachments := self._find_stored(keyword):
+            return self.process_stored(attachments)
+
+        result = self._process_file_attachment(email_id, keyword)
+
+        return [result] if result else []
+
+    def process_stored(self, attachments: List[StoredAttachment]) -> List[Union[list[dict[str, str | float]], str]]:
+        """
+        Process the attachments persisted in the attachment store, no request is sent to the mail server.
+
+        :param attachments: The stored attachments to process.
+        :return: The processed results of the attachments.
+        """
+        results = []
+
+        for attachment in attachments:
+            file_data = self.attachment_store.read(attachment)
+
+            if result := self._process_file_data(file_data, attachment.keyword):
+                results.append(result)
+
+            if self.searcher_class is not None and issubclass(self.searcher_class, GmailDailyReportSearcher):
+                break
+
+        return results
+
+    def _store_attachment(self, email_id: str, keyword: str, file_data: bytes):
+        reader = self.document_processor.reader
+
+        try:
+            self.attachment_store.put(
+                email_id,
+                keyword,
+                file_data,
+                self.document_processor.file_type,
+                date=getattr(reader, 'date', None),
+                product_type=getattr(reader, 'product_type', None),
+            )
+        except Exception:
+            # the store is only a copy of the mail server, failing to write it must not fail the processing
+            logger.exception('Failed to store the attachment', email_id=email_id)
+
     def _process_file_attachment(self, email_id: str, keyword: str) -> Union[list, str]:
         attachment = self._get_attachment(email_id)
         file_data = base64.urlsafe_b64decode(attachment['data'].encode('UTF-8'))
 
+        # Persist the raw attachment before processing it, so it can be reprocessed if the processing fails
+        if self.attachment_store is not None:
+            self._store_attachment(email_id, keyword, file_data)
+
+        return self._process_file_data(file_data, keyword)
+
+    def _process_file_data(self, file_data: bytes, keyword: str) -> Union[list, str]:
         with tempfile.NamedTemporaryFile(
                 delete=False,
                 prefix=f'{keyword}_',
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from typing import NamedTuple
+
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.core.enums import NotificationTypes, NotificationCategories, LogLevel
+from app.models.notifications import Notification
+from app.utils.notification_coalescers import NotificationCoalescer
+from app.utils.workers import PeriodicWorker
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+class ErrorEvent(NamedTuple):
+    correlation_id: str
+    message: str
+    type: NotificationTypes
+    occurred_at: float
+    # set when the event is requeued after it is counted by the coalescer, so it is not counted again
+    coalesced: bool = False
+
+
+class ErrorRecorder(PeriodicWorker):
+    """
+    `ErrorRecorder` takes the errors off the hot path of the requests. An error is recorded in a bounded ring buffer
+    without any I/O, and the buffer is flushed to the outbox in batches by a background task.
+
+    When the buffer is full the oldest error is dropped instead of blocking the request, the dropped errors are
+    counted. The same errors of a batch are coalesced together, so a storm of errors costs a Redis round trip
+    and at most a single notification per distinct error.
+    """
+
+    error_message = "Failed to flush the errors"
+
+    def __init__(
+            self,
+            coalescer: NotificationCoalescer,
+            capacity: int = settings.ERROR_RECORDER_CAPACITY,
+            batch_size: int = settings.ERROR_RECORDER_BATCH_SIZE,
+            interval: float = settings.ERROR_RECORDER_FLUSH_INTERVAL
+    ):
+        super().__init__(interval)
+        self.coalescer = coalescer
+        self.batch_size = batch_size
+        self.buffer: deque[ErrorEvent] = deque(maxlen=capacity)
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+
+    async def on_stop(self):
+        # the buffered errors are not lost on shutdown
+        while self.buffer:
+            try:
+                await self.flush()
+            except Exception:
+                await logger.aexception("Failed to flush the errors on shutdown", buffered=len(self.buffer))
+                break
+
+    def record(self, correlation_id: str, message: str, t: NotificationTypes = NotificationTypes.LINE):
+        """
+        Record an error without blocking, the oldest error is dropped if the buffer is full.
+        """
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+
+        self.buffer.append(ErrorEvent(correlation_id, message, t, time.time()))
+        self.recorded += 1
+
+    def metrics(self) -> dict:
+        return {
+            "buffered": len(self.buffer),
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+        }
+
+    async def flush(self) -> int:
+        """
+        Put a batch of the buffered errors in the outbox, the repeated errors are collapsed by the coalescer.
+
+        :return: The number of the flushed errors.
+        """
+        events = [self.buffer.popleft() for _ in range(min(self.batch_size, len(self.buffer)))]
+        groups: dict[tuple[str, bool], list[ErrorEvent]] = {}
+
+        for event in events:
+            key = self.coalescer.key(NotificationCategories.SYSTEM, event.type, LogLevel.ERROR, event.message)
+            groups.setdefault((key, event.coalesced), []).append(event)
+
+        notifications = []
+        sent = []
+
+        for group in groups.values():
+            notification = Notification.from_exception(group[0].correlation_id, group[0].message, group[0].type)
+
+            if group[0].coalesced:
+                total = len(group)
+            else:
+                try:
+                    total = await self.coalescer.record(
+                        notification, now=group[-1].occurred_at, count=len(group), first=group[0].occurred_at
+                    )
+                except Exception:
+                    # never lose an alert because of the coalescing
+                    await logger.aexception("Failed to coalesce the notification")
+                    total = len(group)
+
+            # only the first occurrence of a window is sent, the others are sent in the summary
+            if total == len(group):
+                notifications.append(notification)
+                sent.append(group[0])
+
+        if notifications:
+            try:
+                await Notification.insert_many(notifications)
+            except Exception:
+                # the alerts are put back in front of the buffer in their order and retried by the next flush
+                for event in reversed(sent):
+                    if len(self.buffer) == self.buffer.maxlen:
+                        self.dropped += 1
+
+                    self.buffer.appendleft(event._replace(coalesced=True))
+
+                raise
+
+        self.flushed += len(events)
+
+        return len(events)
+
+    async def run_once(self) -> bool:
+        # keep flushing without waiting while the batches are full
+        return await self.flush() >= self.batch_size
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from datetime import timedelta, datetime
+from datetime import datetime
 from typing import Union
 
 import fitz
@@ -8,11 +8,11 @@ import pandas as pd
 from app.core.enums import (
     FileTypes,
     ProductType,
-    DailyReportType,
-    WeekDay,
     SupplyType,
     Category,
 )
+from app.utils.holiday_calendars import HolidayCalendar
+from app.utils.report_calendars import get_report_day
 
 
 class FileReader(ABC):
@@ -45,18 +45,18 @@ class DailyReportMetaInfo:
             self,
             date: datetime.date,
             product_type: ProductType,
-            date_of_holidays: Union[list[datetime.date], None] = None
+            holiday_calendar: Union[HolidayCalendar, None] = None
     ):
         """
         :param date: The date of the daily report.
         :param product_type: The type of the product.
-        :param date_of_holidays: The list of holidays.
+        :param holiday_calendar: The calendar of the holidays.
         """
 
         self.roc_year = date.year - 1911
         self.date = date
         self.product_type = product_type
-        self.date_of_holidays = date_of_holidays
+        self.holiday_calendar = holiday_calendar if holiday_calendar is not None else HolidayCalendar()
         self._filename = None
 
     @property
@@ -68,40 +68,16 @@ class DailyReportMetaInfo:
         :return: The filename of the daily report.
         """
         if self._filename is None:
-            weekday = WeekDay(self.date.isoweekday())
-            report_date = self._get_calculated_report_date(weekday)
+            report_day = get_report_day(self.date, self.holiday_calendar)
 
-            if report_date is None:
+            if report_day.report_date is None:
                 return ""
 
             # The filename of the daily report is different based on the product type.
-            filenames = {
-                ProductType.CROPS: DailyReportType.CROPS.value.format(
-                    roc_year=self.roc_year, month=str(report_date.month).zfill(2), day=str(report_date.day).zfill(2)
-                ),
-                ProductType.SEAFOOD: DailyReportType.SEAFOOD.format(
-                    roc_year=self.roc_year, month=str(report_date.month).zfill(2), day=str(report_date.day).zfill(2)
-                ),
-            }
-            self._filename = filenames.get(self.product_type, "")
+            self._filename = report_day.filenames.get(self.product_type, "")
 
         return self._filename
 
-    def _get_calculated_report_date(self, weekday: WeekDay) -> Union[datetime.date, None]:
-        """
-        Get the calculated report date based on the weekday.
-
-        :param weekday: The weekday of the date.
-        :return: The calculated report date.
-        """
-        prev_day_is_holiday = self.date - timedelta(days=1) in self.date_of_holidays
-
-        if weekday is weekday.MONDAY:
-            # Saturday will receive the report of the previous Friday.
-            return self.date - timedelta(days=2)
-
-        return None if prev_day_is_holiday else self.date
-
 
 class DailyReportPDFReader(PDFReader, DailyReportMetaInfo):
     """
@@ -112,10 +88,10 @@ class DailyReportPDFReader(PDFReader, DailyReportMetaInfo):
             self,
             date: datetime.date,
             product_type: ProductType,
-            date_of_holidays: Union[list[datetime.date], None] = None
+            holiday_calendar: Union[HolidayCalendar, None] = None
     ):
         super().__init__(date, product_type)
-        DailyReportMetaInfo.__init__(self, date, product_type, date_of_holidays)
+        DailyReportMetaInfo.__init__(self, date, product_type, holiday_calendar)
         self.supply_type: Union[SupplyType, None] = None
         self.category: Union[Category, None] = None
         self.product_type = product_type
@@ -141,15 +117,15 @@ class DailyReportPDFReader(PDFReader, DailyReportMetaInfo):
 
     @staticmethod
     def get_daily_report_reader(
-            date: datetime.date, product_type: ProductType, date_of_holidays: Union[list[datetime.date], None] = None
+            date: datetime.date, product_type: ProductType, holiday_calendar: Union[HolidayCalendar, None] = None
     ) -> PDFReader:
         """
         This method is used to get the essential daily report reader based on the product type.
         :return: The daily report reader.
         """
         reader = {
-            ProductType.CROPS: FruitDailyReportPDFReader(date, product_type, date_of_holidays),
-            ProductType.SEAFOOD: FishDailyReportPDFReader(date, product_type, date_of_holidays)
+            ProductType.CROPS: FruitDailyReportPDFReader(date, product_type, holiday_calendar),
+            ProductType.SEAFOOD: FishDailyReportPDFReader(date, product_type, holiday_calendar)
         }
 
         return reader.get(product_type, DailyReportPDFReader(date, product_type))
@@ -172,50 +148,21 @@ class FruitDailyReportPDFReader(DailyReportPDFReader):
             self,
             date: datetime.date,
             product_type: ProductType,
-            date_of_holidays: Union[list[datetime.date], None] = None
+            holiday_calendar: Union[HolidayCalendar, None] = None
     ):
-        super().__init__(date, product_type, date_of_holidays)
+        super().__init__(date, product_type, holiday_calendar)
         self.supply_type = SupplyType.ORIGIN
         self.category = Category.AGRICULTURE
 
     @property
     def prev_day_is_holiday(self) -> bool:
-        weekday = WeekDay(self.date.isoweekday())
-
-        return (
-                weekday is WeekDay.SATURDAY
-                or weekday is WeekDay.SUNDAY
-                or self.date - timedelta(days=1) in self.date_of_holidays
-                or WeekDay((self.date - timedelta(days=1)).isoweekday()) is WeekDay.SATURDAY
-                or WeekDay((self.date - timedelta(days=1)).isoweekday()) is WeekDay.SUNDAY
-        )
+        return get_report_day(self.date, self.holiday_calendar).prev_day_is_holiday
 
     @property
     def selected_columns(self) -> list[str]:
         if self._selected_columns is None:
-            time_delta = 1
-            weekday = WeekDay(self.date.isoweekday())
-            product_date = self.date - timedelta(days=3) if weekday is WeekDay.MONDAY else self.date - timedelta(days=1)
-            selected_columns = []
-            flag = True
-
-            while flag:
-                product_date = product_date - timedelta(days=1)
-                is_holiday = product_date in self.date_of_holidays
-                weekday = WeekDay(product_date.isoweekday())
-
-                if weekday is WeekDay.SATURDAY or weekday is WeekDay.SUNDAY:
-                    time_delta += 1
-                elif is_holiday:
-                    time_delta += 1
-                else:
-                    flag = False
-
-            for i in range(1, time_delta + 1):
-                dt = product_date + timedelta(days=i)
-                selected_columns.append(f"{dt.month}/{dt.day}")
-
-            self._selected_columns = [self.PRODUCT_COLUMN] + selected_columns
+            report_day = get_report_day(self.date, self.holiday_calendar)
+            self._selected_columns = [self.PRODUCT_COLUMN, *report_day.selected_columns]
 
         return self._selected_columns
 
@@ -298,11 +245,11 @@ class FileReaderFactory:
             date: datetime.date,
             file_type: FileTypes,
             product_type: Union[ProductType, None] = None,
-            date_of_holidays: Union[list[datetime.date], None] = None
+            holiday_calendar: Union[HolidayCalendar, None] = None
 
     ) -> FileReader:
         readers = {
-            FileTypes.PDF: cls.get_pdf_reader(date, product_type, date_of_holidays=date_of_holidays),
+            FileTypes.PDF: cls.get_pdf_reader(date, product_type, holiday_calendar=holiday_calendar),
             FileTypes.EXCEL: ExcelReader(),
             FileTypes.TXT: TxtReader()
         }
@@ -312,14 +259,14 @@ class FileReaderFactory:
 
     @staticmethod
     def get_pdf_reader(
-            date: datetime.date, product_type: ProductType, date_of_holidays: Union[list[datetime.date], None] = None
+            date: datetime.date, product_type: ProductType, holiday_calendar: Union[HolidayCalendar, None] = None
     ) -> PDFReader:
         """
         Get the PDF reader based on the product type.
         :return: The PDF reader.
         """
         if product_type is not None:
-            return DailyReportPDFReader.get_daily_report_reader(date, product_type, date_of_holidays=date_of_holidays)
+            return DailyReportPDFReader.get_daily_report_reader(date, product_type, holiday_calendar=holiday_calendar)
         else:
             # default reader is PDFReader
             return PDFReader()
@@ -335,13 +282,13 @@ class DocumentProcessor:
             date: datetime.date,
             file_type: FileTypes,
             product_type: Union[ProductType, None] = None,
-            date_of_holidays: Union[list[datetime.date], None] = None
+            holiday_calendar: Union[HolidayCalendar, None] = None
     ):
         self.reader = FileReaderFactory.get_reader(
             date,
             file_type,
             product_type=product_type,
-            date_of_holidays=date_of_holidays
+            holiday_calendar=holiday_calendar
         )
         self.file_type = file_type
 
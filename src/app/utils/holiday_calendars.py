@@ -0,0 +1,169 @@
+import calendar
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterable, Union
+
+# The number of bytes of a bitset of the days of a year, a leap year has 366 days
+BITSET_SIZE = 46
+
+
+class YearCalendar:
+    """
+    The holidays and the business days of a year as bitsets keyed on the day of the year,
+    a business day is a weekday that is not a holiday.
+
+    The ordinals of the business days are also kept in order, the position of a date in them is the number of
+    the business days before it in the year, so the counts and the offsets are found by bisection.
+    """
+    __slots__ = ("year", "first_ordinal", "holidays", "business_days", "business_ordinals")
+
+    def __init__(self, year: int, date_of_holidays: Iterable[datetime.date] = ()):
+        self.year = year
+        self.first_ordinal = datetime.date(year, 1, 1).toordinal()
+        holidays = bytearray(BITSET_SIZE)
+        business_days = bytearray(BITSET_SIZE)
+
+        for date in date_of_holidays:
+            if date.year == year:
+                i = date.toordinal() - self.first_ordinal
+                holidays[i >> 3] |= 1 << (i & 7)
+
+        first_weekday = datetime.date(year, 1, 1).weekday()
+        self.business_ordinals = array("l")
+
+        for i in range(366 if calendar.isleap(year) else 365):
+            if (first_weekday + i) % 7 < 5 and not holidays[i >> 3] >> (i & 7) & 1:
+                business_days[i >> 3] |= 1 << (i & 7)
+                self.business_ordinals.append(self.first_ordinal + i)
+
+        self.holidays = bytes(holidays)
+        self.business_days = bytes(business_days)
+
+    @classmethod
+    def from_bitset(cls, year: int, holidays: bytes) -> "YearCalendar":
+        """
+        :return: The calendar of the year with the holidays of the bitset of `YearCalendar.holidays`.
+        """
+        first_ordinal = datetime.date(year, 1, 1).toordinal()
+
+        return cls(year, (
+            datetime.date.fromordinal(first_ordinal + i)
+            for i in range(len(holidays) * 8)
+            if holidays[i >> 3] >> (i & 7) & 1
+        ))
+
+    def is_holiday(self, date: datetime.date) -> bool:
+        i = date.toordinal() - self.first_ordinal
+
+        return bool(self.holidays[i >> 3] >> (i & 7) & 1)
+
+    def is_business_day(self, date: datetime.date) -> bool:
+        i = date.toordinal() - self.first_ordinal
+
+        return bool(self.business_days[i >> 3] >> (i & 7) & 1)
+
+
+@lru_cache(maxsize=16)
+def get_weekend_calendar(year: int) -> YearCalendar:
+    """
+    :return: The calendar of a year without holidays, only its weekends are not business days.
+    """
+    return YearCalendar(year)
+
+
+class HolidayCalendar:
+    """
+    `HolidayCalendar` answers whether a date is a holiday or a business day in constant time,
+    the counts and the offsets of the business days are found by bisection.
+    The dates of the years without a calendar are never holidays, only their weekends are not business days.
+    """
+
+    def __init__(self, years: Iterable[YearCalendar] = ()):
+        self._years = {year.year: year for year in years}
+
+    @classmethod
+    def from_dates(cls, date_of_holidays: Iterable[datetime.date]) -> "HolidayCalendar":
+        years = defaultdict(list)
+
+        for date in date_of_holidays:
+            years[date.year].append(date)
+
+        return cls(YearCalendar(year, dates) for year, dates in years.items())
+
+    @property
+    def years(self) -> list[int]:
+        return sorted(self._years)
+
+    def __contains__(self, date: datetime.date) -> bool:
+        return self.is_holiday(date)
+
+    def get_year(self, year: int) -> Union[YearCalendar, None]:
+        return self._years.get(year)
+
+    def is_holiday(self, date: datetime.date) -> bool:
+        year = self._years.get(date.year)
+
+        return year is not None and year.is_holiday(date)
+
+    def is_business_day(self, date: datetime.date) -> bool:
+        year = self._years.get(date.year)
+
+        return year.is_business_day(date) if year is not None else date.weekday() < 5
+
+    def next_business_day(self, date: datetime.date, n: int = 1) -> datetime.date:
+        """
+        :return: The n-th business day after the date.
+        """
+        year = self._get_calendar(date.year)
+        i = bisect_right(year.business_ordinals, date.toordinal()) + n - 1
+
+        while i >= len(year.business_ordinals):
+            i -= len(year.business_ordinals)
+            year = self._get_calendar(year.year + 1)
+
+        return datetime.date.fromordinal(year.business_ordinals[i])
+
+    def previous_business_day(self, date: datetime.date, n: int = 1) -> datetime.date:
+        """
+        :return: The n-th business day before the date.
+        """
+        year = self._get_calendar(date.year)
+        i = bisect_left(year.business_ordinals, date.toordinal()) - n
+
+        while i < 0:
+            year = self._get_calendar(year.year - 1)
+            i += len(year.business_ordinals)
+
+        return datetime.date.fromordinal(year.business_ordinals[i])
+
+    def count_business_days(self, start: datetime.date, end: datetime.date) -> int:
+        """
+        :return: The number of the business days from `start` to `end`, both inclusive.
+        """
+        return sum(hi - lo for _, lo, hi in self._slice_business_days(start, end))
+
+    def get_business_days(self, start: datetime.date, end: datetime.date) -> list[datetime.date]:
+        """
+        :return: The business days from `start` to `end`, both inclusive.
+        """
+        return [
+            datetime.date.fromordinal(ordinal)
+            for year, lo, hi in self._slice_business_days(start, end)
+            for ordinal in year.business_ordinals[lo:hi]
+        ]
+
+    def _get_calendar(self, year: int) -> YearCalendar:
+        return self._years.get(year) or get_weekend_calendar(year)
+
+    def _slice_business_days(self, start: datetime.date, end: datetime.date) -> Iterable[tuple[YearCalendar, int, int]]:
+        for y in range(start.year, end.year + 1):
+            year = self._get_calendar(y)
+
+            yield (
+                year,
+                bisect_left(year.business_ordinals, start.toordinal()),
+                bisect_right(year.business_ordinals, end.toordinal()),
+            )
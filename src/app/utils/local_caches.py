@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+from app.core.enums import RedisChannel
+from app.utils.workers import PeriodicWorker
+
+# The sentinel of a missing key, `None` may be a cached value
+MISSING = object()
+
+
+class LocalCache:
+    """
+    An in-process cache evicting the least recently used entry when it is full, an entry also expires after `ttl`
+    seconds, so a missed invalidation is bounded in time.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        :return: The cached value, `MISSING` if the key is not cached or has expired.
+        """
+        entry = self._data.get(key)
+
+        if entry is None:
+            return MISSING
+
+        expires_at, value = entry
+
+        if expires_at <= self.clock():
+            del self._data[key]
+            return MISSING
+
+        self._data.move_to_end(key)
+
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+# The special holidays of the years keyed on the Redis keys, shared by all the requests of the process
+holiday_cache = LocalCache(settings.HOLIDAY_LOCAL_CACHE_SIZE, settings.HOLIDAY_LOCAL_CACHE_TTL)
+
+
+class CacheInvalidationListener(PeriodicWorker):
+    """
+    `CacheInvalidationListener` deletes the keys published to the channel from the local cache, so a change made by
+    a worker is seen by all the workers. The whole cache is cleared whenever the subscription is (re)established,
+    because the invalidations published while not subscribed are lost.
+    A lost subscription is established again after `retry_interval` seconds.
+    """
+
+    error_message = "Lost the subscription of the cache invalidations"
+
+    def __init__(
+            self,
+            pool: aioredis.Redis,
+            cache: LocalCache = holiday_cache,
+            channel: str = RedisChannel.HOLIDAY_INVALIDATION,
+            retry_interval: float = 1.0
+    ):
+        super().__init__(retry_interval)
+        self.pool = pool
+        self.cache = cache
+        self.channel = channel
+
+    def handle(self, message: dict):
+        if message["type"] != "message":
+            return
+
+        key = message["data"].decode() if isinstance(message["data"], bytes) else message["data"]
+        self.cache.delete(key)
+
+    async def run_once(self) -> bool:
+        async with self.pool.pubsub() as pubsub:
+            await pubsub.subscribe(str(self.channel))
+            self.cache.clear()
+
+            async for message in pubsub.listen():
+                self.handle(message)
+
+        # the subscription is established again at once if it is closed without an error
+        return True
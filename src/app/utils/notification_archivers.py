@@ -0,0 +1,110 @@
+import datetime
+from collections import defaultdict
+from typing import Union
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError, CollectionInvalid
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.core.enums import NotificationStatus
+from app.models.notifications import Notification, ARCHIVE_INDEXES, get_archive_collection_name
+from app.utils.workers import PeriodicWorker
+
+# Logger
+logger: BoundLogger = get_logger()
+
+# The error code of a duplicate key
+DUPLICATE_KEY_ERROR = 11000
+
+
+class NotificationArchiver(PeriodicWorker):
+    """
+    `NotificationArchiver` moves the old notifications to the monthly archive collections in the background,
+    so the notifications collection only keeps the recent ones.
+
+    The records of the low levels are removed by the TTL index and the notifications in the outbox are still
+    being sent, neither of them is archived. A batch is copied to the archive before it is removed, so a batch
+    interrupted halfway is copied again by the next run and the documents already archived are skipped.
+    """
+
+    error_message = "Failed to archive the notifications"
+
+    def __init__(
+            self,
+            after_days: int = settings.NOTIFICATION_ARCHIVE_AFTER_DAYS,
+            batch_size: int = settings.NOTIFICATION_ARCHIVE_BATCH_SIZE,
+            interval: float = settings.NOTIFICATION_ARCHIVE_INTERVAL,
+            compressor: str = settings.NOTIFICATION_ARCHIVE_COMPRESSOR
+    ):
+        super().__init__(interval)
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.compressor = compressor
+        self._collections: set[str] = set()
+
+    async def get_archive_collection(self, name: str) -> AsyncIOMotorCollection:
+        """
+        Get the archive collection, it is created with the compressor and the indexes at the first use.
+        """
+        database = Notification.get_motor_collection().database
+
+        if name not in self._collections:
+            if not await database.list_collection_names(filter={"name": name}):
+                options = {}
+
+                if self.compressor:
+                    options["storageEngine"] = {
+                        "wiredTiger": {"configString": f"block_compressor={self.compressor}"}
+                    }
+
+                try:
+                    await database.create_collection(name, **options)
+                except CollectionInvalid:
+                    # the collection is created by another worker
+                    pass
+
+            await database[name].create_indexes(ARCHIVE_INDEXES)
+            self._collections.add(name)
+
+        return database[name]
+
+    async def archive(self, now: Union[datetime.datetime, None] = None) -> int:
+        """
+        Move a batch of the notifications older than `after_days` to the archive collections.
+
+        :return: The number of the archived notifications.
+        """
+        cutoff = (now or datetime.datetime.now()) - datetime.timedelta(days=self.after_days)
+        collection = Notification.get_motor_collection()
+        documents = await collection.find(
+            {
+                "created_at": {"$lt": cutoff},
+                "expire_at": None,
+                "status": {"$nin": [NotificationStatus.PENDING, NotificationStatus.SENDING]},
+            }
+        ).sort("created_at", 1).limit(self.batch_size).to_list(None)
+        months = defaultdict(list)
+
+        for document in documents:
+            months[get_archive_collection_name(document["date"])].append(document)
+
+        for name, archived in months.items():
+            archive = await self.get_archive_collection(name)
+
+            try:
+                await archive.insert_many(archived, ordered=False)
+            except BulkWriteError as e:
+                if any(error["code"] != DUPLICATE_KEY_ERROR for error in e.details["writeErrors"]):
+                    raise
+
+            await collection.delete_many({"_id": {"$in": [document["_id"] for document in archived]}})
+
+        if documents:
+            await logger.ainfo("Archived the notifications", count=len(documents), collections=list(months))
+
+        return len(documents)
+
+    async def run_once(self) -> bool:
+        # keep archiving without waiting while the batches are full
+        return await self.archive() >= self.batch_size
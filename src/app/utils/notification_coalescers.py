@@ -0,0 +1,161 @@
+import datetime
+import hashlib
+import json
+import re
+import time
+from typing import Union
+
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.core.enums import NotificationCategories, NotificationTypes, LogLevel, RedisCacheKey, NotificationStatus
+from app.dependencies.redis import Redis
+from app.models.notifications import Notification
+
+# Logger
+logger: BoundLogger = get_logger()
+
+# The variable parts of a message, they are replaced so the same error with different ids has the same key
+UUID_PATTERN = re.compile(r"\b[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}\b", re.IGNORECASE)
+HEX_PATTERN = re.compile(r"\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b", re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r"\d+(\.\d+)?")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    message = UUID_PATTERN.sub("<uuid>", message)
+    message = HEX_PATTERN.sub("<id>", message)
+    message = NUMBER_PATTERN.sub("<n>", message)
+
+    return WHITESPACE_PATTERN.sub(" ", message).strip()
+
+
+class NotificationCoalescer:
+    """
+    `NotificationCoalescer` collapses the bursts of the same notification, the state is kept in Redis so
+    the occurrences are counted across the workers.
+
+    A notification is keyed on its category, level and normalized message. The first occurrence is sent at once,
+    the following ones in the sliding window are only counted. When the window closes, a summary with the number of
+    the occurrences and the first and last time is sent if the notification occurred more than once.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            window: int = settings.NOTIFICATION_COALESCE_WINDOW,
+            max_window: int = settings.NOTIFICATION_COALESCE_MAX_WINDOW
+    ):
+        self.redis = redis
+        self.window = window
+        self.max_window = max_window
+
+    @staticmethod
+    def key(category: NotificationCategories, t: NotificationTypes, level: LogLevel, message: str) -> str:
+        digest = hashlib.sha1(f"{category}:{t}:{level}:{normalize_message(message)}".encode()).hexdigest()
+
+        return RedisCacheKey.NOTIFICATION_COALESCE.value.format(digest=digest)
+
+    async def record(
+            self,
+            notification: Notification,
+            now: Union[float, None] = None,
+            count: int = 1,
+            first: Union[float, None] = None
+    ) -> int:
+        """
+        Record the occurrences of the notification.
+
+        :param now: The time of the last occurrence.
+        :param count: The number of the occurrences, e.g. the same errors buffered in a batch.
+        :param first: The time of the first occurrence, it is `now` if not given.
+        :return: The number of the occurrences in the current window including these ones,
+            the notification should be sent if it equals `count`.
+        """
+        now = now or time.time()
+        first = first or now
+        key = self.key(notification.category, notification.type, notification.level, notification.message)
+        payload = notification.model_dump_json(include={"correlation_id", "category", "type", "level", "message"})
+        total, *_, first, _ = await self.redis.transaction(
+            ("hincrby", key, "count", count),
+            ("hsetnx", key, "first", first),
+            ("hsetnx", key, "notification", payload),
+            ("hset", key, "last", now),
+            ("hget", key, "first"),
+            ("expire", key, self.max_window * 2),
+        )
+
+        # the window is closed by the last occurrence, but a burst never lasts longer than the max window
+        deadline = min(now + self.window, float(first) + self.max_window)
+        await self.redis.zadd(RedisCacheKey.NOTIFICATION_COALESCE_INDEX.value, {key: deadline})
+
+        return int(total)
+
+    async def create_from_exception(
+            self, correlation_id: str, message: str, t: NotificationTypes = NotificationTypes.LINE
+    ) -> Union[Notification, None]:
+        """
+        The coalesced version of `Notification.create_from_exception`.
+
+        :return: The notification put in the outbox, `None` if it is collapsed into a burst.
+        """
+        notification = Notification(
+            correlation_id=correlation_id,
+            category=NotificationCategories.SYSTEM,
+            type=t,
+            level=LogLevel.ERROR,
+            message=message,
+        )
+
+        try:
+            count = await self.record(notification)
+        except Exception:
+            # never lose an alert because of the coalescing
+            await logger.aexception("Failed to coalesce the notification")
+            count = 1
+
+        if count > 1:
+            return None
+
+        return await Notification.create_from_exception(correlation_id, message, t)
+
+    async def flush(self, now: Union[float, None] = None) -> int:
+        """
+        Close the windows that have expired and put the summaries of the bursts in the outbox.
+
+        :return: The number of the summaries.
+        """
+        now = now or time.time()
+        summaries = 0
+
+        for key in await self.redis.zrangebyscore(RedisCacheKey.NOTIFICATION_COALESCE_INDEX.value, "-inf", now):
+            key = key.decode() if isinstance(key, bytes) else key
+
+            # only the worker that removes the key from the index closes the window
+            if not await self.redis.zrem(RedisCacheKey.NOTIFICATION_COALESCE_INDEX.value, key):
+                continue
+
+            state, _ = await self.redis.transaction(("hgetall", key), ("delete", key))
+            state = {
+                (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+                for k, v in state.items()
+            }
+
+            if int(state.get("count", 0)) > 1:
+                await self._create_summary(state)
+                summaries += 1
+
+        return summaries
+
+    @staticmethod
+    async def _create_summary(state: dict[str, str]):
+        first, last = (
+            datetime.datetime.fromtimestamp(float(state[field])).isoformat(sep=" ", timespec="seconds")
+            for field in ("first", "last")
+        )
+        notification = Notification.model_validate(json.loads(state["notification"]))
+        notification.message = f"{notification.message} (occurred {state['count']} times from {first} to {last})"
+        notification.status = NotificationStatus.PENDING
+        notification.next_attempt_at = datetime.datetime.now()
+
+        await Notification.insert_one(notification)
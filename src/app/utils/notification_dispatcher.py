@@ -0,0 +1,283 @@
+import asyncio
+import datetime
+import random
+import time
+from typing import Union, Callable, Awaitable
+
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
+from app.core.enums import NotificationStatus, NotificationTypes
+from app.models.notifications import Notification
+from app.utils.notification_coalescers import NotificationCoalescer
+from app.utils.notification_helper import (
+    NotificationManager,
+    NotificationStrategy,
+    LineNotificationStrategy,
+    EmailNotificationStrategy,
+)
+from app.utils.rate_limiters import TokenBucket
+from app.utils.workers import PeriodicWorker
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+class ChannelWorkers:
+    """
+    The worker pool of a notification channel. The claimed notifications are queued and sent by `concurrency`
+    workers, and the sends of all the workers are limited to the rate of the channel.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            send: Callable[[Notification], Awaitable[None]],
+            concurrency: int,
+            rate: float,
+            burst: int,
+            queue_size: int
+    ):
+        self.name = name
+        self.send = send
+        self.concurrency = concurrency
+        self.limiter = TokenBucket(rate, burst)
+        self.queue: asyncio.Queue[tuple[Notification, float]] = asyncio.Queue(queue_size)
+        self.in_flight = 0
+        self.sent = 0
+        self.skipped = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.send_seconds = 0.0
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def capacity(self) -> int:
+        """
+        :return: The number of the notifications that can be queued.
+        """
+        return self.queue.maxsize - self.queue.qsize()
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def put(self, notification: Notification):
+        self.queue.put_nowait((notification, time.monotonic()))
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Wait for the queued notifications to be sent.
+
+        :return: False if the timeout is reached first.
+        """
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        return True
+
+    def metrics(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "rate": self.limiter.rate,
+            "backlog": self.queue.qsize(),
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "avg_wait_seconds": self.wait_seconds / self.sent if self.sent else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "avg_send_seconds": self.send_seconds / self.sent if self.sent else 0.0,
+        }
+
+    async def _work(self):
+        while True:
+            notification, queued_at = await self.queue.get()
+
+            try:
+                await self.limiter.acquire()
+
+                # the lease expired while the notification was queued, it may have been claimed again
+                if notification.locked_until and notification.locked_until < datetime.datetime.now():
+                    self.skipped += 1
+                    continue
+
+                started_at = time.monotonic()
+                self.in_flight += 1
+
+                try:
+                    await self.send(notification)
+                finally:
+                    self.in_flight -= 1
+
+                wait = started_at - queued_at
+                self.sent += 1
+                self.wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+                self.send_seconds += time.monotonic() - started_at
+            except Exception:
+                await logger.aexception("Failed to send the notification", channel=self.name)
+            finally:
+                self.queue.task_done()
+
+
+class NotificationDispatcher(PeriodicWorker):
+    """
+    `NotificationDispatcher` sends the notifications of the outbox in the background.
+
+    The pending notifications are claimed in batches with leases, so several dispatchers can run side by side and
+    a notification claimed by a dispatcher that is gone is claimed again after its lease expires.
+    Every channel has its own worker pool, a channel only claims as many notifications as it can queue,
+    so a slow channel neither holds the leases of the other channels nor claims more than it can send in a lease.
+    A failed send is retried with an exponential backoff until `max_attempts` is reached,
+    a send that is rejected by the provider, e.g. with an invalid token, is not retried.
+    The summaries of the coalesced notifications are put in the outbox before every batch.
+    """
+
+    error_message = "Failed to dispatch the notifications"
+
+    def __init__(
+            self,
+            coalescer: Union[NotificationCoalescer, None] = None,
+            batch_size: int = settings.NOTIFICATION_DISPATCH_BATCH_SIZE,
+            interval: float = settings.NOTIFICATION_DISPATCH_INTERVAL,
+            lease: int = settings.NOTIFICATION_LEASE,
+            max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+            drain_timeout: float = settings.NOTIFICATION_DRAIN_TIMEOUT
+    ):
+        super().__init__(interval)
+        self.coalescer = coalescer
+        self.batch_size = batch_size
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.drain_timeout = drain_timeout
+        self.channels = {
+            NotificationTypes.LINE: self.create_channel(
+                NotificationTypes.LINE,
+                settings.NOTIFICATION_LINE_CONCURRENCY,
+                settings.NOTIFICATION_LINE_RATE,
+                settings.NOTIFICATION_LINE_BURST,
+            ),
+            NotificationTypes.EMAIL: self.create_channel(
+                NotificationTypes.EMAIL,
+                settings.NOTIFICATION_EMAIL_CONCURRENCY,
+                settings.NOTIFICATION_EMAIL_RATE,
+                settings.NOTIFICATION_EMAIL_BURST,
+            ),
+        }
+
+    def create_channel(self, name: str, concurrency: int, rate: float, burst: int) -> ChannelWorkers:
+        # only half of a lease is queued, so the notifications are sent before their leases expire
+        queue_size = max(concurrency, burst + int(rate * self.lease / 2))
+
+        return ChannelWorkers(name, self.send, concurrency, rate, burst, queue_size)
+
+    def start(self):
+        for channel in self.channels.values():
+            channel.start()
+
+        super().start()
+
+    async def on_stop(self):
+        # the notifications left in the queues are claimed again after their leases expire
+        drained = await asyncio.gather(*(channel.drain(self.drain_timeout) for channel in self.channels.values()))
+
+        if not all(drained):
+            await logger.awarning("Stopped before the claimed notifications were sent")
+
+        for channel in self.channels.values():
+            await channel.stop()
+
+    @staticmethod
+    def get_strategy(notification: Notification, last_attempt: bool = True) -> NotificationStrategy:
+        """
+        :param last_attempt: Whether the failure of the send is reported, it is only reported once when it is given up.
+        """
+        if notification.type is NotificationTypes.EMAIL:
+            return EmailNotificationStrategy()
+
+        return LineNotificationStrategy(escalate=last_attempt)
+
+    @staticmethod
+    def backoff(attempts: int) -> float:
+        """
+        :return: The seconds to wait before the next attempt, a jitter is added so the retries do not come in waves.
+        """
+        seconds = min(
+            settings.NOTIFICATION_RETRY_BACKOFF * 2 ** (attempts - 1),
+            settings.NOTIFICATION_RETRY_MAX_BACKOFF
+        )
+
+        return seconds * random.uniform(0.8, 1.2)
+
+    async def claim(self, t: NotificationTypes, limit: int) -> list[Notification]:
+        notifications = []
+
+        while len(notifications) < limit and (notification := await Notification.claim(self.lease, t)):
+            notifications.append(notification)
+
+        return notifications
+
+    async def send(self, notification: Notification):
+        strategy = self.get_strategy(notification, notification.attempts >= self.max_attempts)
+
+        try:
+            delivered = await NotificationManager(strategy).send_notification(notification)
+            error = None if delivered else "The notification was not delivered."
+        except Exception as e:
+            await logger.aexception("Failed to send the notification", notification_id=str(notification.id))
+            delivered, error = False, str(e)
+
+        now = datetime.datetime.now()
+
+        if delivered:
+            await notification.release(status=NotificationStatus.DELIVERED, delivered_at=now, last_error=None)
+        elif not strategy.retryable or notification.attempts >= self.max_attempts:
+            await notification.release(status=NotificationStatus.FAILED, last_error=error)
+            await logger.aerror(
+                "Gave up sending the notification", notification_id=str(notification.id), attempts=notification.attempts
+            )
+        else:
+            await notification.release(
+                status=NotificationStatus.PENDING,
+                next_attempt_at=now + datetime.timedelta(seconds=self.backoff(notification.attempts)),
+                last_error=error,
+            )
+
+    async def dispatch(self) -> int:
+        """
+        Claim a batch of notifications for every channel and queue them to the workers of the channel.
+
+        :return: The number of the claimed notifications.
+        """
+        if self.coalescer is not None:
+            await self.coalescer.flush()
+
+        claimed = 0
+
+        for t, channel in self.channels.items():
+            for notification in await self.claim(t, min(self.batch_size, channel.capacity)):
+                channel.put(notification)
+                claimed += 1
+
+        return claimed
+
+    async def drain(self):
+        """
+        Wait for the queued notifications to be sent.
+        """
+        await asyncio.gather(*(channel.queue.join() for channel in self.channels.values()))
+
+    def metrics(self) -> dict[str, dict]:
+        return {t.value: channel.metrics() for t, channel in self.channels.items()}
+
+    async def run_once(self) -> bool:
+        # keep dispatching without waiting while the batches are full
+        return await self.dispatch() >= self.batch_size
@@ -1,13 +1,14 @@
+import asyncio
 import base64
 from abc import ABC, abstractmethod
+from email import policy
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Union
 
-import requests
+import httpx
 from fastapi import status, BackgroundTasks
 from starlette.datastructures import CommaSeparatedStrings
-from requests import Response
 from structlog import get_logger, BoundLogger
 
 from app.core.config import settings
@@ -19,10 +20,41 @@ from app.core.enums import (
     LineNotifyErrorMessages,
 )
 from app.models.notifications import Notification
+from app.utils.circuit_breakers import get_circuit_breaker
 from app.utils.email_processors import GmailProcessor
 
 logger: BoundLogger = get_logger()
 
+# The HTTP client shared by the notification strategies, the connections are kept alive between the sends
+_http_client: Union[httpx.AsyncClient, None] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.NOTIFY_READ_TIMEOUT,
+                connect=settings.NOTIFY_CONNECT_TIMEOUT,
+                pool=settings.NOTIFY_POOL_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.NOTIFY_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.NOTIFY_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class NotificationStrategy(ABC):
     """
@@ -31,8 +63,11 @@ class NotificationStrategy(ABC):
     Subclasses must implement the `send` method to provide specific notification sending behavior.
     """
 
+    # Whether the last failed send may succeed if it is retried, e.g. a rejected token will be rejected again
+    retryable: bool = True
+
     @abstractmethod
-    def send(self, notification: Notification) -> bool:
+    async def send(self, notification: Notification) -> bool:
         """
         Sends a notification.
         :param notification: The notification to send.
@@ -67,23 +102,66 @@ class EmailNotificationStrategy(NotificationStrategy):
     def subject(self, value):
         self._subject = value
 
-    def send(self, notification: Notification) -> bool:
-        for recipient in self._recipients:
-            email_message = MIMEMultipart()
-            email_message['to'] = recipient
-            email_message['subject'] = self.subject
-            email_message.attach(MIMEText(notification.message, 'plain'))
+    def _send_email(self, raw_message: str):
+        self.mail_processor.service.users().messages().send(userId="me", body={'raw': raw_message}).execute()
+
+    def chunk_recipients(self) -> list[list[str]]:
+        """
+        Split the recipients into the chunks of a single email, a Gmail message has a limited number of recipients.
+        """
+        recipients = [recipient for recipient in self._recipients if recipient]
+        size = settings.GMAIL_MAX_RECIPIENTS
+
+        return [recipients[i:i + size] for i in range(0, len(recipients), size)]
+
+    def build_message(self, notification: Notification) -> MIMEMultipart:
+        email_message = MIMEMultipart(policy=policy.SMTP)
+        email_message['subject'] = self.subject
+        email_message.attach(MIMEText(notification.message, 'plain'))
+
+        return email_message
+
+    async def send(self, notification: Notification) -> bool:
+        """
+        Sends the notification to all the recipients with a single email per chunk of recipients.
+
+        :return: True if the notification was sent to all the recipients, False otherwise.
+        """
+        return not await self.send_to_recipients(notification)
+
+    async def send_to_recipients(self, notification: Notification) -> list[str]:
+        """
+        Sends the notification to all the recipients with a single email per chunk of recipients,
+        a single recipient is addressed in `To` and several recipients are addressed in `Bcc`.
+        The message is built once, only its addressing headers are replaced per chunk.
+
+        :return: The recipients of the chunks that failed to be sent.
+        """
+        email_message = self.build_message(notification)
+        failed_recipients = []
+
+        for recipients in self.chunk_recipients():
+            del email_message["To"], email_message["Bcc"]
+
+            if len(recipients) == 1:
+                email_message["To"] = recipients[0]
+            else:
+                email_message["To"] = "undisclosed-recipients:;"
+                email_message["Bcc"] = ", ".join(recipients)
+
+            # the headers are folded and encoded by the policy of the message
+            raw_message = base64.urlsafe_b64encode(email_message.as_bytes()).decode("utf-8")
 
-            raw_message = base64.urlsafe_b64encode(email_message.as_bytes()).decode('utf-8')
             try:
-                self.mail_processor.service.users().messages().send(userId="me", body={'raw': raw_message}).execute()
+                # the Gmail API client is blocking, send the email in a thread to keep the event loop responsive
+                await asyncio.to_thread(self._send_email, raw_message)
             except Exception as e:
-                logger.exception(f"An error occurred while sending email: {e}")
-                return False
+                failed_recipients.extend(recipients)
+                await logger.aexception(f"An error occurred while sending email: {e}", recipients=recipients)
 
-        return True
+        return failed_recipients
 
-    def send_system_notify(self, notification: Notification) -> bool:
+    async def send_system_notify(self, notification: Notification) -> bool:
         copy_notification = notification.model_copy(
             update={
                 "category": NotificationCategories.SYSTEM,
@@ -95,7 +173,7 @@ class EmailNotificationStrategy(NotificationStrategy):
         # Save the system notification to the database
         BackgroundTasks().add_task(copy_notification.save)
 
-        return self.send(copy_notification)
+        return await self.send(copy_notification)
 
 
 class LineNotificationStrategy(NotificationStrategy):
@@ -103,8 +181,13 @@ class LineNotificationStrategy(NotificationStrategy):
     A concrete implementation of the `NotificationStrategy` interface that sends notifications via LINE NOTIFY.
     """
 
-    def __init__(self):
+    def __init__(self, escalate: bool = True):
+        """
+        :param escalate: Whether a failed send that can be retried is reported to the system recipients,
+            the dispatcher only reports it on the last attempt so the system recipients are emailed once.
+        """
         self.mail_strategy = EmailNotificationStrategy()
+        self.escalate = escalate
 
     @staticmethod
     def get_headers(token: str):
@@ -112,7 +195,7 @@ class LineNotificationStrategy(NotificationStrategy):
             "Authorization": f"Bearer {token}",
         }
 
-    def _send_notify(self, notification: Notification) -> Response:
+    async def _send_notify(self, notification: Notification) -> httpx.Response:
         """
         Sends a LINE notification using the LINE Notify API.
 
@@ -120,7 +203,7 @@ class LineNotificationStrategy(NotificationStrategy):
         :return: The response from the LINE Notify API.
         """
 
-        return requests.post(
+        return await get_http_client().post(
             LineApis.NOTIFY,
             headers=self.get_headers(
                 settings.SERVICE_NOTIFY_TOKEN
@@ -130,41 +213,91 @@ class LineNotificationStrategy(NotificationStrategy):
             data={"message": notification.message},
         )
 
-    def send(self, notification: Notification) -> bool:
+    async def send(self, notification: Notification) -> bool:
         """
         Sends a LINE notification.
-        If the notification fails to send or an error occurs, a system notification will be sent via email.
+        If the notification fails to send or an error occurs, a system notification will be sent via email,
+        unless the failure can be retried and `escalate` is False.
+        If LINE is known to be unavailable, the notification is sent via email without trying LINE.
 
         :param notification: The notification to send.
         :return: True if the notification was sent successfully, False otherwise.
         """
 
+        breaker = get_circuit_breaker(NotificationTypes.LINE)
+
+        if not breaker.allow_request():
+            return await self._send_fallback(notification)
+
         try:
-            resp = self._send_notify(notification)
+            resp = await self._send_notify(notification)
 
             # If the response status code is not 200, send a system notification via email
             if resp.status_code != status.HTTP_200_OK:
+                # only the errors of the provider open the breaker, e.g. an invalid token does not,
+                # but a client error does not prove the provider has recovered either
+                self.retryable = is_provider_error(resp.status_code)
+
+                if self.retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.release()
+
                 subject = LineNotifyErrorMessages.SEND_MESSAGE_FAILED
                 msg = f"{subject}: {resp.text}"
-                logger.error(msg)
+                await logger.aerror(msg)
+
+                return await self._send_system_notify(subject, notification, msg)
 
-                return self._send_system_notify(subject, notification, msg)
+            breaker.record_success()
 
             return True
         except Exception as e:
+            breaker.record_failure()
             subject = LineNotifyErrorMessages.ERROR_OCCURRED
-            logger.exception(subject)
+            await logger.aexception(subject)
             msg = f"{subject}: {e}"
 
-            return self._send_system_notify(subject, notification, msg)
+            return await self._send_system_notify(subject, notification, msg)
+
+    async def _send_system_notify(self, subject: str, notification: Notification, msg: str):
+        if self.retryable and not self.escalate:
+            return False
 
-    def _send_system_notify(self, subject: str, notification: Notification, msg: str):
         self.mail_strategy.subject = subject
         self.mail_strategy.recipients = CommaSeparatedStrings(settings.SYSTEM_RECIPIENTS)
-        self.mail_strategy.send_system_notify(notification.model_copy(update={"message": msg}))
+        await self.mail_strategy.send_system_notify(notification.model_copy(update={"message": msg}))
 
         return False
 
+    async def _send_fallback(self, notification: Notification) -> bool:
+        """
+        Sends the notification to the recipients of its category via email instead of LINE.
+        """
+        self.mail_strategy.subject = LineNotifyErrorMessages.CIRCUIT_OPEN
+        self.mail_strategy.recipients = CommaSeparatedStrings(
+            settings.SERVICE_RECIPIENTS
+            if notification.category is NotificationCategories.SERVICE
+            else settings.SYSTEM_RECIPIENTS
+        )
+
+        return await self.mail_strategy.send(notification)
+
+
+def is_provider_error(status_code: int) -> bool:
+    return status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR or status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+async def probe_line_notify() -> bool:
+    """
+    :return: True if the LINE Notify API is reachable, the validity of the token does not matter.
+    """
+    resp = await get_http_client().get(
+        LineApis.STATUS, headers=LineNotificationStrategy.get_headers(settings.SYSTEM_NOTIFY_TOKEN)
+    )
+
+    return not is_provider_error(resp.status_code)
+
 
 class NotificationManager:
     """
@@ -175,5 +308,5 @@ class NotificationManager:
     def __init__(self, strategy: NotificationStrategy):
         self.strategy = strategy
 
-    def send_notification(self, notification: Notification) -> bool:
-        return self.strategy.send(notification)
+    async def send_notification(self, notification: Notification) -> bool:
+        return await self.strategy.send(notification)
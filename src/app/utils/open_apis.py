@@ -1,17 +1,35 @@
-import requests
+import asyncio
+import random
 
+import httpx
+from starlette import status
+from structlog import get_logger, BoundLogger
+
+from app.core.config import settings
 from app.core.enums import OpenApis, IsNotHolidays
 
+# Logger
+logger: BoundLogger = get_logger()
+
 
 class TaiwanCalendarApi:
 
-    def __init__(self, year: int, size: int = 1000, formant: str = "json"):
+    def __init__(
+            self,
+            year: int,
+            size: int = 1000,
+            formant: str = "json",
+            max_retries: int = settings.OPEN_API_MAX_RETRIES,
+            retry_backoff: float = settings.OPEN_API_RETRY_BACKOFF
+    ):
         self.url: str = OpenApis.TAIWAN_CALENDAR_API
         self.formant: str = formant
         self.params: dict = {
             "year": year,
             "size": size
         }
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
 
     async def get_cleaned_list(self) -> list[dict]:
         json = await self.get()
@@ -34,5 +52,35 @@ class TaiwanCalendarApi:
 
         return _list
 
+    @staticmethod
+    def create_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=httpx.Timeout(settings.OPEN_API_TIMEOUT))
+
+    @staticmethod
+    def is_retryable(e: Exception) -> bool:
+        if isinstance(e, httpx.HTTPStatusError):
+            return (
+                e.response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+                or e.response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+            )
+
+        return isinstance(e, httpx.TransportError)
+
     async def get(self):
-        return requests.api.get(f"{self.url}/{self.formant}", params=self.params).json()
+        """
+        Get the calendar of the year, the timeouts, the connection errors and the errors of the server are retried
+        with an exponential backoff.
+        """
+        async with self.create_client() as client:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    resp = await client.get(f"{self.url}/{self.formant}", params=self.params)
+                    resp.raise_for_status()
+
+                    return resp.json()
+                except httpx.HTTPError as e:
+                    if attempt == self.max_retries or not self.is_retryable(e):
+                        raise
+
+                    await logger.awarning("Retrying the Taiwan calendar API", attempt=attempt + 1, error=str(e))
+                    await asyncio.sleep(self.retry_backoff * 2 ** attempt * random.uniform(0.8, 1.2))
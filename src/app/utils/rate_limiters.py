@@ -0,0 +1,37 @@
+import asyncio
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    A token bucket shared by the tasks of an event loop, `rate` tokens are added per second up to `burst` tokens.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self._updated_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+
+        return False
+
+    async def acquire(self):
+        """
+        Wait until a token is available and take it.
+        """
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self.tokens) / self.rate)
@@ -0,0 +1,156 @@
+import datetime
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Union
+
+from app.core.config import settings
+from app.core.enums import DailyReportType, ProductType, WeekDay
+from app.utils.holiday_calendars import HolidayCalendar, YearCalendar
+
+# The product types of the daily reports and the formats of their filenames
+REPORT_FILENAMES = {
+    ProductType.CROPS: DailyReportType.CROPS,
+    ProductType.SEAFOOD: DailyReportType.SEAFOOD,
+}
+
+
+class ReportDay(NamedTuple):
+    """
+    The daily report expected on a date.
+    """
+    # `None` if the date has no daily report
+    report_date: Union[datetime.date, None]
+    filenames: dict[ProductType, str]
+    prev_day_is_holiday: bool
+    # The columns of the dates of the prices in the daily report of the fruits
+    selected_columns: tuple[str, ...]
+
+
+def get_report_date(date: datetime.date, holiday_calendar: HolidayCalendar) -> Union[datetime.date, None]:
+    if WeekDay(date.isoweekday()) is WeekDay.MONDAY:
+        # Saturday will receive the report of the previous Friday.
+        return date - datetime.timedelta(days=2)
+
+    return None if date - datetime.timedelta(days=1) in holiday_calendar else date
+
+
+def get_last_product_date(date: datetime.date) -> datetime.date:
+    days = 3 if WeekDay(date.isoweekday()) is WeekDay.MONDAY else 1
+
+    return date - datetime.timedelta(days=days)
+
+
+def create_report_day(date: datetime.date, holiday_calendar: HolidayCalendar) -> ReportDay:
+    report_date = get_report_date(date, holiday_calendar)
+    filenames = {}
+
+    if report_date is not None:
+        filenames = {
+            product_type: filename.value.format(
+                roc_year=date.year - 1911, month=str(report_date.month).zfill(2), day=str(report_date.day).zfill(2)
+            )
+            for product_type, filename in REPORT_FILENAMES.items()
+        }
+
+    # the report has the columns of the days after the previous business day
+    last_date = get_last_product_date(date)
+    product_date = holiday_calendar.previous_business_day(last_date)
+    selected_columns = tuple(
+        f"{dt.month}/{dt.day}"
+        for dt in (product_date + datetime.timedelta(days=i) for i in range(1, (last_date - product_date).days + 1))
+    )
+
+    return ReportDay(
+        report_date=report_date,
+        filenames=filenames,
+        prev_day_is_holiday=(
+                date.weekday() >= 5 or not holiday_calendar.is_business_day(date - datetime.timedelta(days=1))
+        ),
+        selected_columns=selected_columns,
+    )
+
+
+class ReportCalendar:
+    """
+    `ReportCalendar` is the table of the daily reports expected on the dates of a year, it is built from the
+    holidays of the year, so the report of a date is a single lookup.
+
+    The first days of the year depending on the holidays of the previous year are not in the table.
+    """
+
+    def __init__(self, year: YearCalendar):
+        self.year = year.year
+        self.first_ordinal = year.first_ordinal
+        holiday_calendar = HolidayCalendar([year])
+        first_date = datetime.date(year.year, 1, 1)
+        self.days: list[Union[ReportDay, None]] = []
+        date = first_date
+
+        while date.year == year.year:
+            depends_on_previous_year = (
+                    date == first_date
+                    or holiday_calendar.previous_business_day(get_last_product_date(date)) < first_date
+            )
+            self.days.append(None if depends_on_previous_year else create_report_day(date, holiday_calendar))
+            date += datetime.timedelta(days=1)
+
+    def get(self, date: datetime.date) -> Union[ReportDay, None]:
+        """
+        :return: The daily report expected on the date, `None` if the date is not in the table.
+        """
+        return self.days[date.toordinal() - self.first_ordinal] if date.year == self.year else None
+
+    def get_dates(self, product_type: ProductType) -> list[datetime.date]:
+        """
+        :return: The dates of the year expecting a daily report of the product type.
+        """
+        return [
+            datetime.date.fromordinal(self.first_ordinal + i)
+            for i, day in enumerate(self.days)
+            if day is not None and product_type in day.filenames
+        ]
+
+
+def get_report_calendar(year: YearCalendar) -> ReportCalendar:
+    """
+    The report calendar of a year is built once per holidays of the year, it is only rebuilt when the holidays
+    of the year change, the calendars of the same holidays share it.
+    """
+    return _get_report_calendar(year.year, year.holidays)
+
+
+@lru_cache(maxsize=settings.HOLIDAY_LOCAL_CACHE_SIZE)
+def _get_report_calendar(year: int, holidays: bytes) -> ReportCalendar:
+    return ReportCalendar(YearCalendar.from_bitset(year, holidays))
+
+
+def get_report_day(date: datetime.date, holiday_calendar: HolidayCalendar) -> ReportDay:
+    year = holiday_calendar.get_year(date.year)
+
+    if year is not None and (day := get_report_calendar(year).get(date)) is not None:
+        return day
+
+    # the year has no calendar or the date depends on the calendar of the previous year
+    return create_report_day(date, holiday_calendar)
+
+
+def get_expected_filenames(
+        dates: Iterable[datetime.date],
+        product_types: Iterable[ProductType],
+        holiday_calendar: HolidayCalendar
+) -> dict[str, list[tuple[datetime.date, ProductType]]]:
+    """
+    The filenames of the daily reports expected on the dates, a date without a report (e.g. the day after
+    a holiday) has no filename, and several dates may expect the same file, e.g. Saturday and Monday.
+
+    :return: The dates and the product types of the daily reports keyed by the filename.
+    """
+    filenames = {}
+
+    for date in dates:
+        report_day = get_report_day(date, holiday_calendar)
+
+        for product_type in product_types:
+            if filename := report_day.filenames.get(product_type):
+                filenames.setdefault(filename, []).append((date, product_type))
+
+    return filenames
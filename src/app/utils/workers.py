@@ -0,0 +1,63 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Union
+
+from structlog import get_logger, BoundLogger
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+class PeriodicWorker(ABC):
+    """
+    The base of the workers that run in a background task of the application.
+
+    `run_once` is run every `interval` seconds, or again without waiting while it reports that there is more to do.
+    A failed run is logged and retried after the interval, so an error never stops the worker. The worker is
+    started and stopped with the application, `on_stop` is called after the task is stopped, e.g. to flush
+    what is left in a buffer.
+    """
+
+    # The message logged when a run fails
+    error_message: str = "Failed to run the background worker"
+    # Whether the first run waits for the interval, e.g. the first run is done by the startup
+    wait_first: bool = False
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Union[asyncio.Task, None] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        await self.on_stop()
+
+    async def on_stop(self):
+        pass
+
+    @abstractmethod
+    async def run_once(self) -> bool:
+        """
+        :return: True if there is more to do, the next run does not wait for the interval.
+        """
+        pass
+
+    async def _run(self):
+        if self.wait_first:
+            await asyncio.sleep(self.interval)
+
+        while True:
+            try:
+                more = await self.run_once()
+            except Exception:
+                await logger.aexception(self.error_message)
+                more = False
+
+            if not more:
+                await asyncio.sleep(self.interval)
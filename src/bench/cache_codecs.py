@@ -0,0 +1,77 @@
+import argparse
+import datetime
+import pickle
+import timeit
+from typing import Union
+
+from structlog import get_logger, BoundLogger
+
+from app.core.logging import configure_logging
+from app.models.special_holidays import Holiday, HolidayInfo
+from app.utils.cache_codecs import CacheCodec, zstandard
+
+# Logger
+logger: BoundLogger = get_logger()
+
+
+def create_holidays(n: int) -> list[Holiday]:
+    """
+    The holidays of a year, they are the body of the cached `SpecialHoliday`, so no database is needed.
+    """
+    return [
+        Holiday(
+            date=datetime.date(2024, 1, 1) + datetime.timedelta(days=i),
+            info=HolidayInfo(
+                name=f"節日 {i}",
+                holiday_category="放假之紀念日及節日",
+                # most of the holidays of the calendar have no description
+                description="全國各機關學校放假一日。" if i % 5 == 0 else None,
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+def benchmark(holidays: int, number: int) -> dict[str, tuple[int, float]]:
+    """
+    Compare the payload size and the load time of the codec against pickle.
+
+    :return: The payload size in bytes and the microseconds per load keyed on the name of the codec.
+    """
+    data = create_holidays(holidays)
+    codecs = {
+        "pickle": (pickle.dumps, pickle.loads),
+        "json": CacheCodec(list[Holiday], compress_threshold=0),
+    }
+
+    if zstandard is not None:
+        codecs["json+zstd"] = CacheCodec(list[Holiday], compress_threshold=1)
+
+    result = {}
+
+    for name, codec in codecs.items():
+        dumps, loads = codec if isinstance(codec, tuple) else (codec.encode, codec.decode)
+        payload = dumps(data)
+        seconds = timeit.timeit(lambda: loads(payload), number=number)
+        result[name] = (len(payload), seconds / number * 1e6)
+
+    return result
+
+
+def main(argv: Union[list[str], None] = None):
+    """
+    Benchmark the cache codec from the `src` directory, e.g. `python -m bench.cache_codecs --holidays 60`
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the cache codec against pickle.")
+    parser.add_argument("--holidays", type=int, default=60, help="The number of the holidays of the year.")
+    parser.add_argument("--number", type=int, default=10000, help="The number of the loads timed.")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+
+    for name, (size, load_us) in benchmark(args.holidays, args.number).items():
+        logger.info("Cache codec benchmark", codec=name, bytes=size, us_per_load=round(load_us, 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,17 @@
+import asyncio
 import contextlib
-from unittest.mock import patch
+from unittest.mock import ANY
 
 import pytest
 from fastapi import FastAPI
 from fastapi import Request
 from redis import asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError
 
-from app.dependencies.redis import get_connection, get_redis, Redis
+from app.core.config import settings
+from app.dependencies.redis import get_connection, get_redis, Redis, COMPARE_AND_DELETE
+from app.utils.cache_codecs import CacheCodec
+from app.utils.local_caches import MISSING
 
 
 @pytest.fixture
@@ -73,29 +78,207 @@ async def test_get_redis(mock_request, mock_redis_pool):
 
 
 @pytest.mark.asyncio
-@patch('pickle.loads')
-@patch('pickle.dumps')
-async def test_redis_instance_get_with_auto_set_method(
-        mock_pickle_dumps, mock_pickle_loads, mocker, mock_redis_instance
-):
+async def test_redis_instance_get_with_auto_set_method(mocker, mock_redis_instance):
     # case 1: data does not exist
     # Arrange
+    codec = CacheCodec(list[str])
     mock_redis_instance.connection.get = mocker.AsyncMock(return_value=None)
     mock_redis_instance.connection.set = mocker.AsyncMock()
-    mock_func = mocker.AsyncMock(return_value="new_data")
-    result = await mock_redis_instance.get_with_auto_set("test_key", mock_func)
+    mock_func = mocker.AsyncMock(return_value=["new_data"])
+    result = await mock_redis_instance.get_with_auto_set("test_key", codec, mock_func)
 
     # Assert
-    assert result == "new_data"
+    assert result == ["new_data"]
     mock_func.assert_called_once()
-    mock_redis_instance.connection.set.assert_called_once()
-    mock_pickle_dumps.assert_called_once_with("new_data")
+    mock_redis_instance.connection.set.assert_called_once_with("test_key", codec.encode(["new_data"]), ex=None)
 
     # case 2: data exists
     # Arrange
-    mock_redis_instance.connection.get.reset_mock()
+    mock_func.reset_mock()
+    mock_redis_instance.connection.get = mocker.AsyncMock(return_value=codec.encode(["test_data"]))
+
+    # Act
+    result = await mock_redis_instance.get_with_auto_set("test_key", codec, mock_func)
+
+    # Assert
+    assert result == ["test_data"]
+    mock_func.assert_not_called()
+
+    # case 3: data of another schema version is a miss
+    # Arrange
+    mock_redis_instance.connection.get = mocker.AsyncMock(return_value=CacheCodec(list[str], version=2).encode([]))
+
+    # Act
+    result = await mock_redis_instance.get_with_auto_set("test_key", codec, mock_func)
+
+    # Assert
+    assert result == ["new_data"]
+    mock_func.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_redis_instance_lock_method(mocker, mock_redis_instance):
+    # Arrange
+    mock_lock = mocker.AsyncMock()
+    mock_lock.acquire.return_value = True
+    mock_redis_instance.connection.lock = mocker.MagicMock(return_value=mock_lock)
+
+    # Act
+    async with mock_redis_instance.lock("test_key", timeout=10, blocking_timeout=5) as acquired:
+        # Assert
+        assert acquired == True
+        mock_lock.release.assert_not_called()
+
+    # Assert
+    mock_redis_instance.connection.lock.assert_called_once_with("test_key", timeout=10, blocking_timeout=5)
+    mock_lock.release.assert_called_once()
+
+    # Case 2: Redis is unavailable
+    mock_lock.reset_mock()
+    mock_lock.acquire.side_effect = RedisConnectionError("Redis is down")
+
+    # Act
+    async with mock_redis_instance.lock("test_key", timeout=10, blocking_timeout=5) as acquired:
+        # Assert
+        assert acquired == False
+
+    # Assert
+    mock_lock.release.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_instance_mget_with_refresh_and_mset_with_codec_methods(mocker, mock_redis_instance):
+    # Arrange
+    codec = CacheCodec(list[str])
+    mock_pipeline = mocker.MagicMock()
+    mock_pipeline.execute = mocker.AsyncMock(return_value=[
+        codec.encode(["a"]), 90 * 1000,
+        None, -2,
+        CacheCodec(list[str], version=2).encode(["c"]), 90 * 1000,
+        codec.encode(["d"]), 50 * 1000,
+    ])
+    mock_redis_instance.connection.pipeline = mocker.MagicMock(return_value=mock_pipeline)
+    mock_refresh = mocker.patch.object(mock_redis_instance, "_refresh_in_background", mocker.AsyncMock())
+    mock_func = mocker.AsyncMock()
+
+    # Act
+    result = await mock_redis_instance.mget_with_refresh(
+        {"a": (1,), "b": (2,), "c": (3,), "d": (4,)}, codec, mock_func, ex=100, soft_ex=30
+    )
+
+    # Assert
+    # the missing and the outdated values are misses, the stale value is returned and refreshed in the background
+    assert result == [["a"], MISSING, MISSING, ["d"]]
+    mock_pipeline.execute.assert_called_once()
+    mock_refresh.assert_called_once_with("d", codec, mock_func, 4, ex=100)
+    mock_func.assert_not_called()
+
+    # Case 2: set the values in a single round trip
+    mock_pipeline.reset_mock()
+
+    # Act
+    await mock_redis_instance.mset_with_codec({"b": ["b"], "c": ["c"]}, codec)
+
+    # Assert
+    assert mock_pipeline.set.call_args_list == [
+        mocker.call("b", codec.encode(["b"]), ex=None),
+        mocker.call("c", codec.encode(["c"]), ex=None),
+    ]
+    mock_pipeline.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_redis_instance_get_with_auto_set_method_with_soft_ttl(mocker, mock_redis_instance):
+    # Arrange
+    codec = CacheCodec(list[str])
+    mock_pipeline = mocker.MagicMock()
+    mock_pipeline.execute = mocker.AsyncMock(return_value=[codec.encode(["stale_data"]), 50 * 1000])
+    mock_redis_instance.connection.pipeline = mocker.MagicMock(return_value=mock_pipeline)
+    mock_redis_instance.connection.set = mocker.AsyncMock(return_value=True)
+    mock_detached = mocker.AsyncMock(spec=Redis)
+    mocker.patch.object(mock_redis_instance, "detached", return_value=mock_detached)
+    mock_func = mocker.AsyncMock(return_value=["new_data"])
+
+    # Act
+    # the value has been cached for 50 seconds of its 100 seconds, it is stale after 30 seconds
+    result = await mock_redis_instance.get_with_auto_set(
+        "test_key", codec, mock_func, mock_redis_instance, ex=100, soft_ex=30
+    )
+    await asyncio.gather(*Redis._tasks)
+
+    # Assert
+    # the stale value is returned and refreshed in the background with the detached client
+    assert result == ["stale_data"]
+    mock_func.assert_called_once_with(mock_detached)
+    mock_detached.set_with_codec.assert_called_once_with("test_key", codec, ["new_data"], ex=100)
+    mock_redis_instance.connection.set.assert_called_once_with(
+        "cache_refresh_lock_test_key", ANY, nx=True, ex=settings.CACHE_REFRESH_LOCK_TIMEOUT
+    )
+    # only the lock of this refresh is released
+    token = mock_redis_instance.connection.set.call_args.args[1]
+    mock_detached.compare_and_delete.assert_called_once_with("cache_refresh_lock_test_key", token)
+
+    # Case 2: the value is refreshed by another worker
+    mock_func.reset_mock()
+    mock_redis_instance.connection.set.return_value = None
+
+    # Act
+    result = await mock_redis_instance.get_with_auto_set("test_key", codec, mock_func, ex=100, soft_ex=30)
+
+    # Assert
+    assert result == ["stale_data"]
+    assert not Redis._tasks
+    mock_func.assert_not_called()
+
+    # Case 3: the value is fresh
+    mock_redis_instance.connection.set.reset_mock()
+    mock_pipeline.execute.return_value = [codec.encode(["fresh_data"]), 90 * 1000]
+
+    # Act
+    result = await mock_redis_instance.get_with_auto_set("test_key", codec, mock_func, ex=100, soft_ex=30)
+
+    # Assert
+    assert result == ["fresh_data"]
+    mock_redis_instance.connection.set.assert_not_called()
+
+    # Case 4: the value is expired, the caller waits for it
+    mock_pipeline.execute.return_value = [None, -2]
+
+    # Act
+    result = await mock_redis_instance.get_with_auto_set("test_key", codec, mock_func, ex=100, soft_ex=30)
+
+    # Assert
+    assert result == ["new_data"]
+    mock_redis_instance.connection.set.assert_called_once_with("test_key", codec.encode(["new_data"]), ex=100)
+
+    # Case 5: the value cached without an expiry is stale
     mock_redis_instance.connection.set.reset_mock()
-    mock_redis_instance.connection.get = mocker.AsyncMock(return_value=b"test_data")
+    mock_pipeline.execute.return_value = [codec.encode(["stale_data"]), -1]
+
+    # Act
+    result = await mock_redis_instance.get_with_auto_set("test_key", codec, mock_func, ex=100, soft_ex=30)
+    await Redis.stop_refreshes()
+
+    # Assert
+    assert result == ["stale_data"]
+    mock_redis_instance.connection.set.assert_called_once_with(
+        "cache_refresh_lock_test_key", ANY, nx=True, ex=settings.CACHE_REFRESH_LOCK_TIMEOUT
+    )
+    assert not Redis._tasks
+
+    # Case 6: the soft TTL is not shorter than the TTL
+    with pytest.raises(ValueError):
+        await mock_redis_instance.get_with_auto_set("test_key", codec, mock_func, ex=30, soft_ex=30)
+
+
+@pytest.mark.asyncio
+async def test_redis_instance_compare_and_delete_method(mocker, mock_redis_instance):
+    # Arrange
+    mock_redis_instance.connection.eval = mocker.AsyncMock(return_value=0)
+
+    # Act
+    result = await mock_redis_instance.compare_and_delete("test_key", "token")
 
     # Assert
-    mock_pickle_loads.called_once_with(b"test_data")
+    assert result is False
+    mock_redis_instance.connection.eval.assert_called_once_with(COMPARE_AND_DELETE, 1, "test_key", "token")
@@ -0,0 +1,156 @@
+from datetime import date
+from unittest.mock import patch, AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints.calendar import move_business_days
+from app.core.enums import CalendarHttpErrors
+from app.dependencies.redis import Redis
+from app.models import SpecialHoliday
+from app.utils.local_caches import MISSING
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.calendar.get_cached_holiday_calendar", new_callable=AsyncMock)
+async def test_get_next_business_day(mock_get_cached_holiday_calendar, client: TestClient, special_holidays):
+    # Arrange
+    mock_get_cached_holiday_calendar.return_value = special_holidays
+
+    # Act
+    response = client.get("/api/v1/calendar/business-days/next", params={"date": "2024-10-09"})
+
+    # Assert
+    # National Day
+    assert response.status_code == 200
+    assert response.json() == {"date": "2024-10-09", "n": 1, "business_day": "2024-10-11"}
+    # only the year of the date is loaded and the unpublished years are never fetched
+    mock_get_cached_holiday_calendar.assert_called_once()
+    assert mock_get_cached_holiday_calendar.call_args.args[1] == {2024}
+    assert mock_get_cached_holiday_calendar.call_args.kwargs["fetch"] is False
+
+    # Case 2: the n-th business day
+    # Act
+    response = client.get("/api/v1/calendar/business-days/next", params={"date": "2024-10-09", "n": 3})
+
+    # Assert
+    assert response.json()["business_day"] == "2024-10-15"
+
+    # Case 3: the calendar of the next year is loaded when the date is moved across it
+    mock_get_cached_holiday_calendar.reset_mock()
+
+    # Act
+    response = client.get("/api/v1/calendar/business-days/next", params={"date": "2024-12-31"})
+
+    # Assert
+    # New Year's Day
+    assert response.json()["business_day"] == "2025-01-02"
+    assert [c.args[1] for c in mock_get_cached_holiday_calendar.call_args_list] == [{2024}, {2024, 2025}]
+
+    # Case 4: the year is out of range
+    # Act
+    response = client.get("/api/v1/calendar/business-days/next", params={"date": "9999-12-31"})
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["message"] == CalendarHttpErrors.YEAR_OUT_OF_RANGE
+
+    # Case 5: n is out of range
+    # Act
+    response = client.get("/api/v1/calendar/business-days/next", params={"date": "2024-10-09", "n": 0})
+
+    # Assert
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.calendar.get_cached_holiday_calendar", new_callable=AsyncMock)
+async def test_get_previous_business_day(mock_get_cached_holiday_calendar, client: TestClient, special_holidays):
+    # Arrange
+    mock_get_cached_holiday_calendar.return_value = special_holidays
+
+    # Act
+    response = client.get("/api/v1/calendar/business-days/prev", params={"date": "20241014", "n": 2})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {"date": "2024-10-14", "n": 2, "business_day": "2024-10-09"}
+    assert mock_get_cached_holiday_calendar.call_args.args[1] == {2024}
+
+    # Case 2: invalid date
+    # Act
+    response = client.get("/api/v1/calendar/business-days/prev", params={"date": "invalid"})
+
+    # Assert
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.calendar.get_cached_holiday_calendar", new_callable=AsyncMock)
+async def test_count_business_days(mock_get_cached_holiday_calendar, client: TestClient, special_holidays):
+    # Arrange
+    mock_get_cached_holiday_calendar.return_value = special_holidays
+
+    # Act
+    response = client.get(
+        "/api/v1/calendar/business-days/count", params={"start": "2024-10-07", "end": "2024-10-13"}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {"start": "2024-10-07", "end": "2024-10-13", "total": 4}
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.calendar.get_cached_holiday_calendar", new_callable=AsyncMock)
+async def test_get_business_days(mock_get_cached_holiday_calendar, client: TestClient, special_holidays):
+    # Arrange
+    mock_get_cached_holiday_calendar.return_value = special_holidays
+
+    # Act
+    response = client.get(
+        "/api/v1/calendar/business-days/range", params={"start": "2024-10-07", "end": "2024-10-13"}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["total"] == 4
+    assert response.json()["business_days"] == ["2024-10-07", "2024-10-08", "2024-10-09", "2024-10-11"]
+
+    # Case 2: invalid date range
+    # Act
+    response = client.get(
+        "/api/v1/calendar/business-days/range", params={"start": "2024-10-13", "end": "2024-10-07"}
+    )
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["message"] == CalendarHttpErrors.INVALID_DATE_RANGE
+
+    # Case 3: the date range is too long
+    # Act
+    response = client.get(
+        "/api/v1/calendar/business-days/range", params={"start": "2000-01-01", "end": "2024-10-07"}
+    )
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["message"] == CalendarHttpErrors.DATE_RANGE_TOO_LONG
+
+
+@pytest.mark.asyncio
+@patch("app.models.special_holidays.TaiwanCalendarApi")
+async def test_calendar_never_fetches_unpublished_years(mock_api, init_db):
+    # Arrange
+    mock_redis = AsyncMock(spec=Redis)
+    mock_redis.mget_with_refresh.side_effect = lambda keys, *args, **kwargs: [MISSING] * len(keys)
+
+    # Act
+    business_day = await move_business_days(mock_redis, date(2030, 12, 31), 1)
+
+    # Assert
+    # the years not in the database only have the weekends, they are neither fetched nor cached
+    assert business_day == date(2031, 1, 1)
+    mock_api.assert_not_called()
+    mock_redis.mset_with_codec.assert_not_called()
+    assert await SpecialHoliday.find_one(SpecialHoliday.year == 2031) is None
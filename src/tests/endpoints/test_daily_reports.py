@@ -1,21 +1,28 @@
-from unittest.mock import patch, AsyncMock, MagicMock
+from datetime import datetime, timedelta
+from unittest.mock import patch, AsyncMock, MagicMock, ANY
 from uuid import uuid4
 
 import pytest
 from fastapi import FastAPI
 from starlette.testclient import TestClient
 
+from app import schemas
+from app.core.config import settings
 from app.core.enums import (
+    CalendarHttpErrors,
     DailyReportHttpErrors,
+    JobStatus,
+    FileTypes,
     ProductType,
     WeekDay,
-    NotificationCategories,
     NotificationTypes,
-    LogLevel
 )
+from app.dependencies.daily_reports import get_attachment_store, DAILY_REPORT_PRODUCT_TYPES
+from app.dependencies.notifications import get_error_recorder
 from app.dependencies.special_holidays import cache_key
 from app.models import DailyReport, Notification
 from app.models.special_holidays import SpecialHoliday, HolidayInfo, Holiday
+from app.utils.attachment_stores import LocalAttachmentStore
 from app.utils.datetime import get_date, datetime_formatter
 
 
@@ -126,9 +133,11 @@ async def test_get_daily_reports_with_extract_param(
         init_db,
         mock_cached_holidays,
         mock_daily_reports: list[DailyReport],
-        client: TestClient
+        client: TestClient,
+        test_app: tuple[FastAPI, AsyncMock]
 ):
     # Arrange
+    app, _ = test_app
     dt = "20241002"
     mock_get_cached_holidays.return_value = mock_cached_holidays
     mock_get_by_params.return_value = []
@@ -154,14 +163,15 @@ async def test_get_daily_reports_with_extract_param(
     assert response.json()["weekday"] is WeekDay(datetime_formatter(dt).isoweekday()).value
     assert len(response.json()["results"]) == 1
     assert response.json()["results"][0]["date"] == daily_report.date.strftime("%Y-%m-%d")
+    # the daily report is written in the next batch
+    assert await DailyReport.find_all().count() == 0
+    assert await app.state.daily_report_writer.flush() == 1
     assert await DailyReport.find_all().count() == 1
     assert await DailyReport.find_one(DailyReport.date == daily_report.date) == daily_report
 
 
 @pytest.mark.asyncio
 @patch("app.api.v1.endpoints.daily_reports.correlation_id", new_callable=MagicMock)
-@patch("app.api.v1.endpoints.daily_reports.NotificationManager.send_notification", new_callable=MagicMock)
-@patch("app.api.v1.endpoints.daily_reports.Notification.create_from_exception", new_callable=AsyncMock)
 @patch("app.api.v1.endpoints.daily_reports.DailyReport.get_fulfilled_instance", new_callable=AsyncMock)
 @patch("app.api.v1.endpoints.daily_reports.DailyReport.get_by_params", new_callable=AsyncMock)
 @patch("app.api.v1.endpoints.daily_reports.get_cached_holidays", new_callable=AsyncMock)
@@ -169,29 +179,21 @@ async def test_get_daily_reports_with_extract_param_failed(
         mock_get_cached_holidays,
         mock_get_by_params,
         mock_get_fulfilled_instance,
-        mock_create_from_exception,
-        mock_send_notification,
         mock_correlation_id,
         init_db,
         mock_cached_holidays,
-        client: TestClient
+        client: TestClient,
+        test_app: tuple[FastAPI, AsyncMock]
 ):
     # Arrange
     dt = "20241002"
     mock_correlation_id.get.return_value = uuid4().hex
     _id = mock_correlation_id.get()
     error_msg = DailyReportHttpErrors.FAILED
-    notification = await Notification.insert_one(
-        Notification(
-            correlation_id=_id,
-            category=NotificationCategories.SERVICE,
-            type=NotificationTypes.LINE,
-            level=LogLevel.ERROR,
-            message=str(error_msg)
-        )
-    )
+    app, mock_redis = test_app
+    error_recorder = await app.dependency_overrides[get_error_recorder]()
+    mock_redis.transaction.return_value = [1, 1, 1, 1, b"1728432508.0", 1]
     mock_get_cached_holidays.return_value = mock_cached_holidays
-    mock_create_from_exception.return_value = notification
     mock_get_by_params.return_value = []
     mock_get_fulfilled_instance.side_effect = Exception("Failed to get daily report")
 
@@ -208,8 +210,19 @@ async def test_get_daily_reports_with_extract_param_failed(
     # Assert
     assert response.status_code == 500
     assert response.json()["message"] == DailyReportHttpErrors.INTERNAL_SERVER_ERROR.value
-    mock_create_from_exception.assert_called_once_with(_id, str(error_msg))
-    mock_send_notification.assert_called_once_with(notification)
+    # the error is only buffered by the request
+    assert [(e.correlation_id, e.message, e.type) for e in error_recorder.buffer] == [
+        (_id, str(error_msg), NotificationTypes.LINE)
+    ]
+    assert await Notification.find_all().count() == 0
+
+    # Act
+    await error_recorder.flush()
+
+    # Assert
+    notification = await Notification.find_one()
+    assert notification.correlation_id.hex == _id
+    assert notification.message == str(error_msg)
 
 
 @pytest.mark.asyncio
@@ -292,3 +305,254 @@ async def test_get_daily_reports_with_extract_param_and_daily_report_instance_is
     assert len(response.json()["results"]) == 0
     assert response.json()["results"] == []
     assert await DailyReport.find_all().count() == 0
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.daily_reports.DailyReport.reprocess", new_callable=AsyncMock)
+@patch("app.api.v1.endpoints.utils.get_cached_holidays_of_years", new_callable=AsyncMock)
+async def test_reprocess_daily_reports(
+        mock_get_cached_holidays_of_years,
+        mock_reprocess,
+        init_db,
+        mock_cached_holidays,
+        mock_daily_reports: list[DailyReport],
+        client: TestClient,
+        test_app: tuple[FastAPI, AsyncMock],
+        tmp_path
+):
+    # Arrange
+    app, _ = test_app
+    store = LocalAttachmentStore(str(tmp_path))
+    store.put(
+        "message_id", "keyword", b"raw", FileTypes.PDF,
+        date=datetime_formatter("20240911"), product_type=ProductType.CROPS
+    )
+    app.dependency_overrides[get_attachment_store] = lambda: store
+    mock_get_cached_holidays_of_years.return_value = {2024: mock_cached_holidays}
+    mock_reprocess.return_value = mock_daily_reports[:2]
+    await DailyReport.insert_one(mock_daily_reports[0].model_copy(update={"products": []}))
+
+    # Act
+    response = client.post(
+        url="/api/v1/daily-reports/reprocess",
+        params={
+            "start": "20240901",
+            "end": "20240930",
+        }
+    )
+    app.dependency_overrides.pop(get_attachment_store)
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+    assert mock_reprocess.call_args.args[0] is store
+    assert mock_reprocess.call_args.args[1] == [
+        datetime_formatter("20240901") + timedelta(days=i) for i in range(30)
+    ]
+    assert mock_reprocess.call_args.args[2] == DAILY_REPORT_PRODUCT_TYPES
+    mock_get_cached_holidays_of_years.assert_called_once()
+    assert await DailyReport.find_all().count() == 2
+    assert all(report.products for report in await DailyReport.find_all().to_list())
+
+
+@pytest.mark.asyncio
+async def test_reprocess_daily_reports_with_invalid_date_range(client: TestClient):
+    # Act
+    response = client.post(
+        url="/api/v1/daily-reports/reprocess",
+        params={
+            "start": "20240930",
+            "end": "20240901",
+        }
+    )
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["message"] == DailyReportHttpErrors.INVALID_DATE_RANGE
+
+    # Case 2: the date range is too long
+    # Act
+    response = client.post(
+        url="/api/v1/daily-reports/reprocess",
+        params={
+            "start": "20200101",
+            "end": "20240930",
+        }
+    )
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["message"] == DailyReportHttpErrors.DATE_RANGE_TOO_LONG
+
+    # Case 3: the year is not supported
+    # Act
+    response = client.post(
+        url="/api/v1/daily-reports/backfill",
+        params={
+            "start": "99990101",
+            "end": "99990102",
+        }
+    )
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["message"] == CalendarHttpErrors.YEAR_OUT_OF_RANGE
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.daily_reports.DailyReportBackfill.run", new_callable=AsyncMock)
+@patch("app.api.v1.endpoints.utils.get_cached_holidays_of_years", new_callable=AsyncMock)
+async def test_backfill_daily_reports(
+        mock_get_cached_holidays_of_years,
+        mock_run,
+        mock_cached_holidays,
+        client: TestClient
+):
+    # Arrange
+    mock_get_cached_holidays_of_years.return_value = {2024: mock_cached_holidays}
+
+    # Act
+    response = client.post(
+        url="/api/v1/daily-reports/backfill",
+        params={
+            "start": "20240916",
+            "end": "20240920",
+            "product_type": [ProductType.CROPS],
+        }
+    )
+
+    # Assert
+    assert response.status_code == 202
+    assert response.json()["product_types"] == [ProductType.CROPS]
+    # the day after the holiday(2024-09-17) has no daily report
+    assert response.json()["expected"] == 4
+    mock_run.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.daily_reports.DailyReport.get_fulfilled_instance", new_callable=AsyncMock)
+@patch("app.api.v1.endpoints.daily_reports.DailyReport.get_by_params", new_callable=AsyncMock)
+@patch("app.api.v1.endpoints.daily_reports.get_cached_holidays", new_callable=AsyncMock)
+async def test_get_daily_reports_with_extract_param_and_not_found_cache(
+        mock_get_cached_holidays,
+        mock_get_by_params,
+        mock_get_fulfilled_instance,
+        mock_cached_holidays,
+        client: TestClient,
+        test_app: tuple[FastAPI, AsyncMock]
+):
+    # Arrange
+    _, mock_redis = test_app
+    mock_get_cached_holidays.return_value = mock_cached_holidays
+    mock_get_by_params.return_value = []
+    mock_redis.exists.return_value = True
+    params = {
+        "product_type": ProductType.CROPS,
+        "extract": True,
+    }
+
+    # Act
+    # Case 1: the report is known to be not published yet
+    response = client.get(url="/api/v1/daily-reports", params=params | {"date": "20241002"})
+    mock_redis.exists.return_value = False
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+    mock_get_fulfilled_instance.assert_not_called()
+
+    # Case 2: the date has no daily report, because the previous day is a holiday
+    response = client.get(url="/api/v1/daily-reports", params=params | {"date": "20240918"})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+    assert response.json()["prev_day_is_holiday"] == True
+    mock_get_fulfilled_instance.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.daily_reports.DailyReport.get_fulfilled_instance", new_callable=AsyncMock)
+@patch("app.api.v1.endpoints.daily_reports.DailyReport.get_by_params", new_callable=AsyncMock)
+@patch("app.api.v1.endpoints.daily_reports.get_cached_holidays", new_callable=AsyncMock)
+async def test_get_daily_reports_with_async_param(
+        mock_get_cached_holidays,
+        mock_get_by_params,
+        mock_get_fulfilled_instance,
+        mock_cached_holidays,
+        client: TestClient,
+        test_app: tuple[FastAPI, AsyncMock]
+):
+    # Arrange
+    dt = "20241002"
+    _, mock_redis = test_app
+    mock_get_cached_holidays.return_value = mock_cached_holidays
+    mock_get_by_params.return_value = []
+
+    params = {
+        "date": dt,
+        "product_type": ProductType.CROPS,
+        "extract": True,
+        "async": True,
+        "callback_url": "https://example.com/callback",
+    }
+
+    # Act
+    with patch.object(settings, "DAILY_REPORT_JOB_CALLBACK_HOSTS", "example.com,"):
+        response = client.get(url="/api/v1/daily-reports", params=params)
+
+    # Assert
+    assert response.status_code == 202
+    assert response.json()["status"] == JobStatus.PENDING
+    assert response.json()["date"] == "2024-10-02"
+    assert response.json()["callback_url"] == "https://example.com/callback"
+    assert response.json()["prev_day_is_holiday"] == False
+    assert response.headers["Location"].endswith(f"/api/v1/daily-reports/jobs/{response.json()['id']}")
+    mock_get_fulfilled_instance.assert_not_called()
+    mock_redis.set.assert_called_with(
+        f"daily_report_job_{response.json()['id']}", ANY, ex=settings.DAILY_REPORT_JOB_TTL
+    )
+
+    # Case 2: the host or the scheme of the callback URL is not allowed
+    for callback_url in ("https://169.254.169.254/latest/meta-data", "http://example.com/callback"):
+        # Act
+        with patch.object(settings, "DAILY_REPORT_JOB_CALLBACK_HOSTS", "example.com,"):
+            response = client.get(url="/api/v1/daily-reports", params=params | {"callback_url": callback_url})
+
+        # Assert
+        assert response.status_code == 400
+        assert response.json()["message"] == DailyReportHttpErrors.CALLBACK_URL_NOT_ALLOWED
+
+
+@pytest.mark.asyncio
+async def test_get_daily_report_job(client: TestClient, test_app: tuple[FastAPI, AsyncMock]):
+    # Arrange
+    _, mock_redis = test_app
+    now = datetime.now()
+    job = schemas.DailyReportJob(
+        id=uuid4().hex,
+        status=JobStatus.SUCCEEDED,
+        date=datetime_formatter("20241002"),
+        product_type=ProductType.CROPS,
+        total=0,
+        created_at=now,
+        updated_at=now,
+    )
+    mock_redis.get.return_value = job.model_dump_json()
+
+    # Act
+    response = client.get(url=f"/api/v1/daily-reports/jobs/{job.id}")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["id"] == job.id
+    assert response.json()["status"] == JobStatus.SUCCEEDED
+    mock_redis.get.assert_called_with(f"daily_report_job_{job.id}")
+
+    # Case 2: the job does not exist
+    mock_redis.get.return_value = None
+    response = client.get(url=f"/api/v1/daily-reports/jobs/{job.id}")
+
+    # Assert
+    assert response.status_code == 404
+    assert response.json()["message"] == DailyReportHttpErrors.JOB_NOT_FOUND.value
@@ -1,12 +1,15 @@
-from unittest.mock import patch, MagicMock
+import json
+from unittest.mock import patch, MagicMock, AsyncMock
 from uuid import uuid4
 
 import pytest
+from fastapi import FastAPI
 from starlette.testclient import TestClient
 
-from app.core.enums import NotificationCategories, LogLevel, NotificationTypes
+from app.core.enums import NotificationCategories, LogLevel, NotificationTypes, StatsGranularity
 from app.models import Notification
 from app.utils.datetime import datetime_formatter
+from app.utils.notification_archivers import NotificationArchiver
 
 
 async def test_get_notifications_with_invalid_date(client: TestClient):
@@ -69,6 +72,42 @@ async def test_get_notifications(
     assert result.json()["total"] == 1
 
 
+@pytest.mark.asyncio
+async def test_get_archived_notifications(
+        init_db,
+        mock_notifications: list[Notification],
+        client: TestClient
+):
+    # Arrange
+    await Notification.insert_many(mock_notifications)
+    await NotificationArchiver(after_days=0, compressor="").archive()
+
+    # Act
+    result = client.get(
+        url="/api/v1/notifications",
+        params={
+            "date": "20241009",
+            "archived": True,
+        }
+    )
+
+    # Assert
+    assert result.status_code == 200
+    assert result.json()["total"] == 2
+
+    # Case 2: the archived notifications are not returned by default
+    result = client.get(
+        url="/api/v1/notifications",
+        params={
+            "date": "20241009"
+        }
+    )
+
+    # Assert
+    assert result.status_code == 200
+    assert result.json()["total"] == 0
+
+
 @pytest.mark.asyncio
 @patch("app.dependencies.notifications.correlation_id", new_callable=MagicMock)
 async def test_create_notification(mock_correlation_id, init_db, client: TestClient):
@@ -107,3 +146,134 @@ async def test_create_notification(mock_correlation_id, init_db, client: TestCli
     assert result.json()["message"] == notification_instance.message
     assert await Notification.find_all().count() == 1
     assert (await Notification.find_all().first_or_none()).correlation_id == notification_instance.correlation_id
+
+
+@pytest.mark.asyncio
+async def test_create_notifications(init_db, client: TestClient):
+    # Arrange
+    item = {
+        "date": "2024-10-09",
+        "category": NotificationCategories.SERVICE,
+        "type": NotificationTypes.LINE,
+        "level": LogLevel.WARNING,
+        "message": "Test message",
+    }
+
+    # Act
+    # Case 1: a JSON array with an invalid item
+    result = client.post(url="/api/v1/notifications/bulk", json=[item, item | {"level": "invalid"}, item])
+
+    # Assert
+    assert result.status_code == 200
+    assert result.json()["inserted"] == 2
+    assert result.json()["failed"] == 1
+    assert [r["index"] for r in result.json()["results"]] == [0, 1, 2]
+    assert result.json()["results"][1]["error"].startswith("level:")
+    assert await Notification.find_all().count() == 2
+
+    # Case 2: NDJSON
+    result = client.post(
+        url="/api/v1/notifications/bulk",
+        content="\n".join([json.dumps(item)] * 3),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    # Assert
+    assert result.status_code == 200
+    assert result.json()["inserted"] == 3
+    assert await Notification.find_all().count() == 5
+
+    # Case 3: not an array
+    result = client.post(url="/api/v1/notifications/bulk", json=item)
+
+    # Assert
+    assert result.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_notification_stats(
+        init_db,
+        mock_notifications: list[Notification],
+        client: TestClient,
+        test_app: tuple[FastAPI, AsyncMock]
+):
+    # Arrange
+    _, mock_redis = test_app
+    mock_redis.get_with_auto_set.reset_mock()
+
+    async def get_with_auto_set(key, codec, func, *args, ex=None, soft_ex=None):
+        # the result is loaded from the cache
+        return codec.decode(codec.encode(await func(*args)))
+
+    mock_redis.get_with_auto_set.side_effect = get_with_auto_set
+    await Notification.insert_many(mock_notifications)
+
+    # Act
+    result = client.get(
+        url="/api/v1/notifications/stats",
+        params={
+            "start": "20241008",
+            "end": "20241009",
+            "category": NotificationCategories.SYSTEM,
+        }
+    )
+
+    # Assert
+    assert result.status_code == 200
+    assert result.json()["granularity"] == StatsGranularity.DAY
+    assert [(r["bucket"], r["type"], r["count"]) for r in result.json()["results"]] == [
+        ("2024-10-08", NotificationTypes.EMAIL, 1),
+        ("2024-10-09", NotificationTypes.LINE, 2),
+    ]
+    # the result is refreshed in the background before it expires
+    kwargs = mock_redis.get_with_auto_set.call_args.kwargs
+    assert 0 < kwargs["soft_ex"] < kwargs["ex"]
+    key = mock_redis.get_with_auto_set.call_args.args[0]
+
+    # Case 2: the stats of the archived notifications are cached apart
+    # Act
+    result = client.get(
+        url="/api/v1/notifications/stats",
+        params={
+            "start": "20241008",
+            "end": "20241009",
+            "category": NotificationCategories.SYSTEM,
+            "archived": True,
+        }
+    )
+
+    # Assert
+    # the notifications are not archived yet
+    assert result.status_code == 200
+    assert result.json()["results"] == []
+    assert mock_redis.get_with_auto_set.call_args.args[0] != key
+    assert mock_redis.get_with_auto_set.call_args.args[2] == Notification.get_archived_stats
+
+    # Case 3: invalid date range
+    result = client.get(
+        url="/api/v1/notifications/stats",
+        params={
+            "start": "20241009",
+            "end": "20241008",
+        }
+    )
+
+    # Assert
+    assert result.status_code == 400
+    mock_redis.get_with_auto_set.side_effect = None
+
+
+@pytest.mark.asyncio
+async def test_get_notification_metrics(init_db, client: TestClient):
+    # Arrange
+    await Notification.create_from_exception(str(uuid4()), "Test error message")
+
+    # Act
+    result = client.get(url="/api/v1/notifications/metrics")
+
+    # Assert
+    assert result.status_code == 200
+    assert set(result.json()["channels"]) == {NotificationTypes.LINE, NotificationTypes.EMAIL}
+    assert result.json()["channels"][NotificationTypes.LINE]["backlog"] == 0
+    assert result.json()["outbox"]["pending"] == 1
+    assert "dropped" in result.json()["errors"]
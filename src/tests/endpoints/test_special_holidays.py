@@ -1,11 +1,13 @@
-from unittest.mock import patch, AsyncMock
+from datetime import date
+from unittest.mock import ANY, patch, AsyncMock
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.core.enums import SpecialHolidayHttpErrors
+from app.core.enums import SpecialHolidayHttpErrors, RedisChannel, RedisCacheKey
 from app.dependencies.special_holidays import cache_key
 from app.models.special_holidays import SpecialHoliday, Holiday, HolidayInfo
+from app.utils.local_caches import holiday_cache, MISSING
 
 
 @pytest.fixture
@@ -47,6 +49,100 @@ async def test_get_holidays_by_year(mock_get_cached_holidays, test_app, init_db,
     assert mock_get_cached_holidays.called_once_with(key, mock_redis, get_test_data.year)
 
 
+@pytest.mark.asyncio
+@patch("app.api.v1.endpoints.utils.get_date", return_value=date(2027, 10, 1))
+@patch("app.models.special_holidays.TaiwanCalendarApi")
+async def test_get_holidays_by_range(mock_api, mock_get_date, test_app, init_db, client: TestClient):
+    # Arrange
+    _, mock_redis = test_app
+    mock_redis.reset_mock()
+
+    def create_special_holiday(year: int) -> SpecialHoliday:
+        return SpecialHoliday(
+            year=year,
+            holidays=[
+                Holiday(date=f"{year}-12-25", info=HolidayInfo(name="行憲紀念日", holiday_category="放假之紀念日及節日")),
+                Holiday(date=f"{year}-01-01", info=HolidayInfo(name="開國紀念日", holiday_category="放假之紀念日及節日")),
+            ]
+        )
+
+    # 2024 is cached in the process, 2025 in Redis, 2026 is in the database and 2027 is fetched
+    holiday_cache.set(await cache_key(2024), create_special_holiday(2024))
+    mock_redis.mget_with_refresh.return_value = [create_special_holiday(2025), MISSING, MISSING]
+    await SpecialHoliday.insert(create_special_holiday(2026))
+    mock_api.return_value.get_cleaned_list = AsyncMock(return_value=[
+        {"date": "2027-01-01", "info": {"name": "開國紀念日", "holidaycategory": "放假之紀念日及節日"}},
+    ])
+
+    # Act
+    response = client.get("/api/v1/special-holidays/holidays", params={"from": "2024-12-01", "to": "2027-01-31"})
+
+    # Assert
+    # only the holidays in the range are returned
+    assert response.status_code == 200
+    assert [h["date"] for h in response.json()["holidays"]] == [
+        "2024-12-25", "2025-01-01", "2025-12-25", "2026-01-01", "2026-12-25", "2027-01-01"
+    ]
+    assert response.json()["total"] == 6
+    keys = mock_redis.mget_with_refresh.call_args.args[0]
+    assert keys == {await cache_key(year): (year, ANY) for year in (2025, 2026, 2027)}
+    assert list(mock_redis.mset_with_codec.call_args.args[0]) == [await cache_key(year) for year in (2026, 2027)]
+    mock_api.assert_called_once_with(2027)
+    # the missing years are cached under the lock of the refresh of the holidays
+    locks = [call.args[0] for call in mock_redis.lock.call_args_list]
+    assert [RedisCacheKey.TAIWAN_CALENDAR_CACHE_LOCK.value.format(year=year) for year in (2026, 2027)] == [
+        lock for lock in locks if lock.startswith("taiwan_calendar_cache_lock_")
+    ]
+
+    # Case 2: the years after the current one are not fetched, they may not be published yet
+    mock_redis.reset_mock()
+    mock_api.reset_mock()
+    mock_redis.mget_with_refresh.return_value = [MISSING]
+
+    # Act
+    response = client.get("/api/v1/special-holidays/holidays", params={"from": "2027-01-01", "to": "2028-01-31"})
+
+    # Assert
+    assert response.status_code == 200
+    # the holidays of the next year are empty until they are published
+    assert [h["date"] for h in response.json()["holidays"]] == ["2027-01-01"]
+    mock_api.assert_not_called()
+    assert await SpecialHoliday.find_one(SpecialHoliday.year == 2028) is None
+
+    # Case 3: the holidays of a year are being refreshed by another worker
+    mock_redis.reset_mock()
+    holiday_cache.clear()
+    mock_redis.mget_with_refresh.return_value = [MISSING]
+
+    with patch.object(mock_redis, "lock") as mock_lock:
+        mock_lock.return_value.__aenter__.return_value = False
+
+        # Act
+        response = client.get("/api/v1/special-holidays/holidays", params={"from": "2026-01-01", "to": "2026-12-31"})
+
+    # Assert
+    # the holidays are returned but not cached, so they cannot overwrite the refreshed ones
+    assert response.json()["total"] == 2
+    mock_redis.mset_with_codec.assert_not_called()
+    assert holiday_cache.get(await cache_key(2026)) is MISSING
+
+    # Case 4: invalid date range
+    # Act
+    response = client.get("/api/v1/special-holidays/holidays", params={"from": "2025-01-01", "to": "2024-01-01"})
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["message"] == SpecialHolidayHttpErrors.INVALID_DATE_RANGE.value
+
+    # Case 5: the date range is too long
+    # Act
+    response = client.get("/api/v1/special-holidays/holidays", params={"from": "2020-01-01", "to": "2025-01-01"})
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["message"] == SpecialHolidayHttpErrors.DATE_RANGE_TOO_LONG.value
+
+
 @pytest.mark.asyncio
 async def test_create_holiday(test_app, init_db, client: TestClient, get_test_data):
     # Arrange
@@ -74,7 +170,44 @@ async def test_create_holiday(test_app, init_db, client: TestClient, get_test_da
     assert result.holidays[1].info.name == json_data["info"]["name"]
     assert response.status_code == 201
     assert response.json() == json_data
+    # the caches are written through instead of deleted
+    mock_redis.delete.assert_not_called()
+    assert mock_redis.set_with_codec.call_args.args[0] == key
+    assert len(mock_redis.set_with_codec.call_args.args[2].holidays) == 2
+    assert len(holiday_cache.get(key).holidays) == 2
+    mock_redis.publish.assert_called_once_with(RedisChannel.HOLIDAY_INVALIDATION, key)
+
+
+@pytest.mark.asyncio
+async def test_create_holiday_without_lock(test_app, init_db, client: TestClient, get_test_data):
+    # Arrange
+    _, mock_redis = test_app
+    key = await cache_key(get_test_data.year)
+    mock_redis.reset_mock()
+    json_data = {
+        "date": "2024-10-03",
+        "info": {
+            "name": "113年10月3日天然災害停止辦公及上課情形(山陀兒颱風)",
+            "holiday_category": "颱風假",
+            "description": None,
+        }
+    }
+    await SpecialHoliday.create(get_test_data)
+
+    # Act
+    with patch.object(mock_redis, "lock") as mock_lock:
+        # the lock is not acquired, e.g. Redis is unavailable
+        mock_lock.return_value.__aenter__.return_value = False
+        response = client.post(
+            "/api/v1/special-holidays/holidays",
+            json=json_data
+        )
+
+    # Assert
+    assert response.status_code == 201
+    mock_redis.set_with_codec.assert_not_called()
     mock_redis.delete.assert_called_once_with(key)
+    mock_redis.publish.assert_called_once_with(RedisChannel.HOLIDAY_INVALIDATION, key)
 
 
 @pytest.mark.asyncio
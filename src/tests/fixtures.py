@@ -14,14 +14,67 @@ from starlette.testclient import TestClient
 from app.core.config import Settings
 from app.core.enums import Category, SupplyType, ProductType, NotificationCategories, NotificationTypes, LogLevel, \
     DailyReportHttpErrors
+from app.dependencies.daily_reports import get_job_workers
+from app.dependencies.notifications import get_error_recorder, get_notification_dispatcher
 from app.dependencies.redis import get_redis, Redis
 from app.models import SpecialHoliday, DailyReport, Notification
 from app.models.daily_reports import Product
+from app.utils.circuit_breakers import reset_circuit_breakers
+from app.utils.daily_report_jobs import DailyReportJobWorkers
+from app.utils.daily_report_writers import DailyReportWriter
 from app.utils.datetime import get_date, datetime_formatter
+from app.utils.error_recorders import ErrorRecorder
+from app.utils.holiday_calendars import HolidayCalendar
+from app.utils.local_caches import holiday_cache
+from app.utils.notification_coalescers import NotificationCoalescer
+from app.utils.notification_dispatcher import NotificationDispatcher
 
 BASE_DIR = dirname(abspath(__file__))
 
 
+class FakeRedis:
+    """
+    An in-memory stand-in of the `Redis` wrapper supporting the commands used by the coalescer.
+    """
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.sorted_sets: dict[str, dict[str, float]] = {}
+
+    def _execute(self, name: str, key: str, *args):
+        h = self.hashes.setdefault(key, {}) if name in ("hincrby", "hsetnx", "hset") else self.hashes.get(key, {})
+
+        match name:
+            case "hincrby":
+                h[args[0]] = str(int(h.get(args[0], 0)) + args[1])
+                return int(h[args[0]])
+            case "hsetnx":
+                return int(h.setdefault(args[0], str(args[1])) == str(args[1]))
+            case "hset":
+                h[args[0]] = str(args[1])
+                return 1
+            case "hget":
+                return h.get(args[0])
+            case "hgetall":
+                return dict(h)
+            case "delete":
+                return int(self.hashes.pop(key, None) is not None)
+            case "expire":
+                return 1
+
+    async def transaction(self, *commands: tuple) -> list:
+        return [self._execute(*command) for command in commands]
+
+    async def zadd(self, key: str, mapping: dict[str, float]):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    async def zrangebyscore(self, key: str, min_score, max_score: float) -> list[bytes]:
+        return [member.encode() for member, score in self.sorted_sets.get(key, {}).items() if score <= max_score]
+
+    async def zrem(self, key: str, *members: str) -> int:
+        return sum(self.sorted_sets.get(key, {}).pop(member, None) is not None for member in members)
+
+
 ###################
 # Global fixtures #
 ###################
@@ -32,6 +85,7 @@ def mock_settings():
     mock_settings.SERVICE_RECIPIENTS = "test@example.com,"
     mock_settings.SERVICE_NOTIFY_TOKEN = "service_token"
     mock_settings.SYSTEM_NOTIFY_TOKEN = "system_token"
+    mock_settings.GMAIL_MAX_RECIPIENTS = 2
 
     return mock_settings
 
@@ -42,6 +96,18 @@ def mock_settings_globally(mock_settings):
         yield
 
 
+@pytest.fixture(autouse=True)
+def reset_breakers():
+    yield
+    reset_circuit_breakers()
+
+
+@pytest.fixture(autouse=True)
+def clear_holiday_cache():
+    yield
+    holiday_cache.clear()
+
+
 @pytest.fixture
 async def init_db():
     client = AsyncMongoMockClient()
@@ -61,20 +127,38 @@ def special_holidays():
             ).date()
             for holiday in d['holidays']
         )
-    return holidays
+    return HolidayCalendar.from_dates(holidays)
 
 
 @pytest.fixture(scope="module")
 @patch("app.main.StaticFiles", new_callable=MagicMock, auto_use=True)
 def test_app(mock_static_files, mock_settings):
     mock_redis = AsyncMock(spec=Redis)
+    mock_redis.exists.return_value = False
 
     async def override_get_redis():
         return mock_redis
 
+    async def override_get_job_workers():
+        return DailyReportJobWorkers(mock_redis)
+
+    error_recorder = ErrorRecorder(NotificationCoalescer(mock_redis))
+
+    async def override_get_error_recorder():
+        return error_recorder
+
+    notification_dispatcher = NotificationDispatcher()
+
+    async def override_get_notification_dispatcher():
+        return notification_dispatcher
+
     from app.main import create_app
     app = create_app()
+    app.state.daily_report_writer = DailyReportWriter()
     app.dependency_overrides[get_redis] = override_get_redis
+    app.dependency_overrides[get_job_workers] = override_get_job_workers
+    app.dependency_overrides[get_error_recorder] = override_get_error_recorder
+    app.dependency_overrides[get_notification_dispatcher] = override_get_notification_dispatcher
 
     return app, mock_redis
 
@@ -1,12 +1,18 @@
+import asyncio
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
 import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import DuplicateKeyError
 
-from app.core.enums import Category, SupplyType, ProductType
+from app.core.enums import Category, SupplyType, ProductType, FileTypes
+from app.db.migrations import remove_duplicate_daily_reports
 from app.models.daily_reports import DailyReport, Product
+from app.utils.attachment_stores import LocalAttachmentStore
 from app.utils.datetime import get_date, datetime_formatter
 from app.utils.email_processors import GmailProcessor
+from app.utils.holiday_calendars import HolidayCalendar
 
 
 @pytest.mark.asyncio
@@ -92,7 +98,7 @@ async def test_update_instance_from_db(init_db, mock_daily_reports: list[DailyRe
         "category": Category.FISHERY,
         "supply_type": SupplyType.WHOLESALE
     })
-    report.supply_type = SupplyType.ORIGIN
+    report.supply_type = SupplyType.RETAIL
     await report.save()
 
     # Act
@@ -171,3 +177,110 @@ async def test_get_fulfilled_instance_returns_none(mock_mail_processor):
 
     # Assert
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert(init_db, mock_daily_reports: list[DailyReport]):
+    # Arrange
+    await DailyReport.bulk_upsert(mock_daily_reports)
+    report = mock_daily_reports[0].model_copy(update={"products": mock_daily_reports[0].products[:1]})
+
+    # Act
+    await DailyReport.bulk_upsert([report])
+
+    # Assert
+    assert await DailyReport.find_all().count() == len(mock_daily_reports)
+    result = await DailyReport.find_one(
+        DailyReport.date == report.date,
+        DailyReport.supply_type == report.supply_type,
+        DailyReport.product_type == report.product_type,
+    )
+    assert len(result.products) == 1
+    assert result.updated_at is not None
+
+
+@pytest.mark.asyncio
+async def test_upsert(init_db, mock_daily_reports: list[DailyReport]):
+    # Arrange
+    report = mock_daily_reports[0]
+    duplicate = report.model_copy(update={"products": report.products[:1]})
+
+    # Act
+    await asyncio.gather(report.upsert(), duplicate.upsert())
+
+    # Assert
+    assert await DailyReport.find_all().count() == 1
+    result = await DailyReport.find_one(DailyReport.date == report.date)
+    assert result.id in (report.id, duplicate.id)
+    assert result.updated_at is not None
+
+
+@pytest.mark.asyncio
+async def test_insert_duplicate_instance_into_db(init_db, mock_daily_reports: list[DailyReport]):
+    # Arrange
+    report = mock_daily_reports[0]
+    await report.create()
+
+    # Act & Assert
+    with pytest.raises(DuplicateKeyError):
+        await DailyReport.insert_one(report.model_copy(update={"id": None}))
+
+
+@pytest.mark.asyncio
+async def test_remove_duplicate_daily_reports(mock_daily_reports: list[DailyReport]):
+    # Arrange
+    database = AsyncMongoMockClient().db
+    collection = database[DailyReport.Settings.name]
+    report = mock_daily_reports[0]
+    documents = [
+        report.model_dump(mode="json", exclude={"id"}) | {"updated_at": f"2024-10-0{day}"} for day in (1, 3, 2)
+    ]
+    await collection.insert_many(documents + [mock_daily_reports[1].model_dump(mode="json", exclude={"id"})])
+
+    # Act
+    # the duplicates are only counted in a dry run
+    assert await remove_duplicate_daily_reports(database, dry_run=True) == 2
+    assert await collection.count_documents({}) == 4
+    count = await remove_duplicate_daily_reports(database)
+
+    # Assert
+    assert count == 2
+    assert await collection.count_documents({}) == 2
+    assert (await collection.find_one({"supply_type": report.supply_type}))["updated_at"] == "2024-10-03"
+
+
+@pytest.mark.asyncio
+async def test_reprocess(init_db, tmp_path):
+    # Arrange
+    # the daily reports of Saturday and Monday read the columns of the days before them
+    mock_data = [[{"產品別": "香蕉", "產地": "平均"} | {f"10/{day}": 11.1 for day in range(9, 14)}]]
+    store = LocalAttachmentStore(str(tmp_path))
+    saturday, monday = datetime_formatter("20241012"), datetime_formatter("20241014")
+    # the file of Saturday is stored with the date it was extracted for
+    store.put("1", "113年10月12日敏感性農產品產地價格日報表", b"raw", FileTypes.PDF, date=saturday)
+
+    # Act
+    # Monday expects the daily report of Saturday
+    with patch("app.models.daily_reports.GmailProcessor.process_stored", return_value=mock_data) as mock_process:
+        result = await DailyReport.reprocess(store, [monday], [ProductType.CROPS], HolidayCalendar())
+
+    # Assert
+    assert len(result) == 1
+    assert result[0].date == monday
+    assert result[0].products[0].product_name == "香蕉"
+    mock_process.assert_called_once()
+
+    # Case 2: the file is reprocessed for every date expecting it
+    # Act
+    with patch("app.models.daily_reports.GmailProcessor.process_stored", return_value=mock_data):
+        result = await DailyReport.reprocess(store, [saturday, monday], [ProductType.CROPS], HolidayCalendar())
+
+    # Assert
+    assert [report.date for report in result] == [saturday, monday]
+
+    # Case 3: the file of the date is not stored
+    # Act
+    result = await DailyReport.reprocess(store, [saturday], [ProductType.SEAFOOD], HolidayCalendar())
+
+    # Assert
+    assert result == []
@@ -1,10 +1,12 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import uuid4, UUID
 
 import pytest
 
-from app.core.enums import NotificationCategories, NotificationTypes, LogLevel
-from app.models.notifications import Notification
+from app.core.enums import NotificationCategories, NotificationTypes, LogLevel, NotificationStatus, StatsGranularity
+from app.dependencies.notifications import CommonParams, StatsParams
+from app.models.notifications import Notification, get_archive_collection_name
+from app.schemas import PaginationParams, SortingParams
 from app.utils.datetime import get_date
 
 
@@ -154,6 +156,7 @@ async def test_create_from_exception(init_db):
     assert notification.level == LogLevel.ERROR
     assert notification.message == message
     assert isinstance(notification.created_at, datetime)
+    assert notification.status is NotificationStatus.PENDING
 
     # Case 2: Test with different notification type
     correlation_id = str(uuid4())
@@ -167,3 +170,172 @@ async def test_create_from_exception(init_db):
     message = "Test error message"
     with pytest.raises(ValueError):
         await Notification.create_from_exception(correlation_id, message)
+
+
+@pytest.mark.asyncio
+async def test_claim(init_db, test_data: list[Notification]):
+    # Arrange
+    await Notification.insert_many(test_data)
+    pending = await Notification.create_from_exception(str(uuid4()), "Test error message")
+
+    # Act
+    notification = await Notification.claim(lease=60)
+
+    # Assert
+    assert notification.id == pending.id
+    assert notification.status is NotificationStatus.SENDING
+    assert notification.attempts == 1
+    assert notification.locked_until > datetime.now()
+
+    # Case 2: the claimed notification is leased, the records without a status are never claimed
+    assert await Notification.claim(lease=60) is None
+
+    # Case 3: the lease has expired
+    await Notification.find_one(Notification.id == pending.id).set({"locked_until": datetime.now() - timedelta(1)})
+    notification = await Notification.claim(lease=60)
+
+    # Assert
+    assert notification.id == pending.id
+    assert notification.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_release(init_db):
+    # Arrange
+    await Notification.create_from_exception(str(uuid4()), "Test error message")
+    notification = await Notification.claim(lease=60)
+    outdated = notification.model_copy(update={"attempts": notification.attempts - 1})
+
+    # Act
+    await outdated.release(status=NotificationStatus.FAILED)
+    await notification.release(status=NotificationStatus.DELIVERED)
+
+    # Assert
+    result = await Notification.get(notification.id)
+    assert result.status is NotificationStatus.DELIVERED
+    assert result.locked_until is None
+
+
+@pytest.mark.asyncio
+async def test_set_expire_at(init_db, test_data: list[Notification]):
+    # Arrange
+    test_data[3].status = NotificationStatus.PENDING
+
+    # Act
+    error, _, info, pending = [await Notification.insert_one(notification) for notification in test_data]
+
+    # Assert
+    assert error.expire_at is None
+    assert info.expire_at > info.created_at
+    # a notification in the outbox never expires
+    assert pending.expire_at is None
+
+
+@pytest.mark.asyncio
+async def test_get_archived_by_params(init_db, test_data: list[Notification]):
+    # Arrange
+    collection = Notification.get_motor_collection()
+
+    for i, notification in enumerate(test_data):
+        notification.created_at = datetime(2024, 10, 4) + timedelta(minutes=i)
+
+    await Notification.insert_many(test_data)
+
+    async for document in collection.find():
+        await collection.database[get_archive_collection_name(document["date"])].insert_one(document)
+
+    await collection.delete_many({})
+
+    params = CommonParams()
+    paging = PaginationParams(page=1, per_page=3)
+    sorting = SortingParams()
+
+    # Act
+    result = await Notification.get_archived_by_params(params, paging, sorting)
+
+    # Assert
+    assert [notification.message for notification in result] == [n.message for n in test_data[:3]]
+
+    # Case 2: the second page
+    paging = PaginationParams(page=2, per_page=3)
+
+    # Act
+    result = await Notification.get_archived_by_params(params, paging, sorting)
+
+    # Assert
+    assert [notification.message for notification in result] == [test_data[3].message]
+
+    # Case 3: the archive of the month with the params
+    params = CommonParams(date=test_data[2].date, type=NotificationTypes.EMAIL)
+    paging = PaginationParams(page=1, per_page=10)
+
+    # Act
+    result = await Notification.get_archived_by_params(params, paging, SortingParams(sort="-created_at"))
+
+    # Assert
+    assert [notification.message for notification in result] == [test_data[3].message]
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert(init_db, test_data: list[Notification]):
+    # Arrange
+    existing = await Notification.insert_one(test_data[0])
+    notifications = [test_data[1], existing.model_copy(), test_data[2]]
+
+    # Act
+    errors = await Notification.bulk_insert(notifications)
+
+    # Assert
+    assert list(errors) == [1]
+    assert await Notification.find_all().count() == 3
+    assert all(notification.id is not None for notification in notifications)
+    # the records of the low levels expire as if they were inserted one by one
+    assert (await Notification.get(test_data[2].id)).expire_at is not None
+
+
+@pytest.mark.asyncio
+async def test_get_stats(init_db, test_data: list[Notification]):
+    # Arrange
+    await Notification.insert_many(test_data)
+
+    # Act
+    result = await Notification.get_stats(CommonParams(level=LogLevel.INFO), StatsParams())
+
+    # Assert
+    assert [(r["type"], r["count"]) for r in result] == [(NotificationTypes.EMAIL, 1), (NotificationTypes.LINE, 1)]
+
+    # Case 2: the larger buckets are truncated in the database
+    pipeline = Notification.stats_pipeline(CommonParams(), StatsParams(granularity=StatsGranularity.WEEK))
+
+    # Assert
+    assert pipeline[1]["$group"]["_id"]["bucket"] == {
+        "$dateTrunc": {"date": "$date", "unit": "week", "startOfWeek": "monday"}
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_archived_stats(init_db, test_data: list[Notification]):
+    # Arrange
+    collection = Notification.get_motor_collection()
+    await Notification.insert_many(test_data)
+
+    async for document in collection.find():
+        await collection.database[get_archive_collection_name(document["date"])].insert_one(document)
+
+    await collection.delete_many({})
+
+    # Act
+    result = await Notification.get_archived_stats(CommonParams(level=LogLevel.INFO), StatsParams())
+
+    # Assert
+    assert [(r["type"], r["count"]) for r in result] == [(NotificationTypes.EMAIL, 1), (NotificationTypes.LINE, 1)]
+    assert await Notification.get_stats(CommonParams(level=LogLevel.INFO), StatsParams()) == []
+
+    # Case 2: the archives of the months out of the range are not aggregated
+    start = max(notification.date for notification in test_data) + timedelta(days=31)
+
+    # Act
+    result = await Notification.get_archived_stats(CommonParams(), StatsParams(start=start))
+
+    # Assert
+    assert result == []
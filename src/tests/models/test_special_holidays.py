@@ -1,5 +1,6 @@
+import asyncio
 from datetime import date
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from pytest_asyncio import fixture
@@ -80,3 +81,74 @@ async def test_special_holiday_get_document_by_year(init_db, mocker, mock_api_da
     # Test caching behavior
     second_document = await SpecialHoliday.get_document_by_year(year)
     assert second_document == document
+
+
+@pytest.mark.asyncio
+async def test_special_holiday_get_document_by_year_single_flight(init_db, mocker, mock_api_data):
+    # Arrange
+    year = 2025
+
+    async def get_cleaned_list():
+        await asyncio.sleep(0.01)
+        return mock_api_data
+
+    mock_api = AsyncMock(spec=TaiwanCalendarApi)
+    mock_api.get_cleaned_list = AsyncMock(side_effect=get_cleaned_list)
+    mocker.patch('app.models.special_holidays.TaiwanCalendarApi', return_value=mock_api)
+    mock_redis = MagicMock()
+    mock_lock = mock_redis.lock.return_value
+    # the lock is not acquired, e.g. Redis is unavailable
+    mock_lock.__aenter__.return_value = False
+
+    # Act
+    documents = await asyncio.gather(*(SpecialHoliday.get_document_by_year(year, mock_redis) for _ in range(5)))
+
+    # Assert
+    assert all(document.id == documents[0].id for document in documents)
+    mock_api.get_cleaned_list.assert_called_once()
+    mock_redis.lock.assert_called_once()
+    assert await SpecialHoliday.find(SpecialHoliday.year == year).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_special_holiday_calendar(mock_api_data):
+    # Arrange
+    document = SpecialHoliday(year=2024, holidays=await SpecialHoliday.create_holidays(mock_api_data))
+
+    # Act
+    calendar = document.calendar
+
+    # Assert
+    assert calendar.is_holiday(date(2024, 1, 1))
+    assert not calendar.is_business_day(date(2024, 1, 1))
+    assert calendar.is_business_day(date(2024, 1, 2))
+    # the calendar is built once per document
+    assert document.calendar is calendar
+
+
+@pytest.mark.asyncio
+async def test_special_holiday_add_holiday(init_db, mock_api_data):
+    # Arrange
+    holidays = await SpecialHoliday.create_holidays(mock_api_data)
+    await SpecialHoliday(year=2024, holidays=holidays).insert()
+    new_holidays = [
+        Holiday(date=date(2024, 10, day), info=HolidayInfo(name="颱風假", holidaycategory="颱風假")) for day in (2, 3)
+    ]
+
+    # Act
+    added = await asyncio.gather(*(SpecialHoliday.add_holiday(holiday) for holiday in new_holidays))
+
+    # Assert
+    # the concurrent additions are not lost
+    assert added == [True, True]
+    assert (await SpecialHoliday.find_one(SpecialHoliday.year == 2024)).holidays == holidays + new_holidays
+
+    # Case 2: the holiday already exists
+    # Act & Assert
+    assert not await SpecialHoliday.add_holiday(holidays[0])
+
+    # Case 3: the year does not exist
+    # Act & Assert
+    assert not await SpecialHoliday.add_holiday(
+        Holiday(date=date(2030, 1, 1), info=HolidayInfo(name="Test", holidaycategory="Test"))
+    )
@@ -0,0 +1,75 @@
+from datetime import date
+from os.path import exists
+
+import pytest
+
+from app.core.enums import FileTypes, ProductType
+from app.utils.attachment_stores import LocalAttachmentStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalAttachmentStore(str(tmp_path / "attachments"))
+
+
+class TestLocalAttachmentStore:
+    def test_store_is_created_lazily(self, store):
+        # Act
+        result = store.find()
+
+        # Assert
+        assert result == []
+        assert store.get("message_id") is None
+        assert not exists(store.root_dir)
+
+    def test_put_and_read(self, store):
+        # Arrange
+        data = b"%PDF-1.4 raw attachment"
+
+        # Act
+        attachment = store.put(
+            "message_id", "keyword", data, FileTypes.PDF, date=date(2024, 10, 2), product_type=ProductType.CROPS
+        )
+
+        # Assert
+        assert attachment.size == len(data)
+        assert store.read(attachment) == data
+        assert store.get("message_id") == attachment
+        assert exists(store._object_path(attachment.digest))
+
+    def test_identical_data_is_stored_once(self, store):
+        # Arrange
+        data = b"%PDF-1.4 raw attachment"
+
+        # Act
+        first = store.put("first", "keyword", data, FileTypes.PDF)
+        second = store.put("second", "keyword", data, FileTypes.PDF)
+
+        # Assert
+        assert first.digest == second.digest
+        assert len(store.find(keyword="keyword")) == 2
+
+    def test_find(self, store):
+        # Arrange
+        store.put("1", "a", b"1", FileTypes.PDF, date=date(2024, 10, 1), product_type=ProductType.CROPS)
+        store.put("2", "b", b"2", FileTypes.PDF, date=date(2024, 10, 2), product_type=ProductType.CROPS)
+        store.put("3", "c", b"3", FileTypes.PDF, date=date(2024, 10, 3), product_type=ProductType.SEAFOOD)
+
+        # Case 1: by keyword
+        result = store.find(keyword="b")
+
+        # Assert
+        assert [a.message_id for a in result] == ["2"]
+
+        # Case 2: by range of dates
+        result = store.find(start=date(2024, 10, 2), end=date(2024, 10, 3))
+
+        # Assert
+        assert {a.message_id for a in result} == {"2", "3"}
+
+        # Case 3: by product type
+        result = store.find(product_type=ProductType.CROPS)
+
+        # Assert
+        assert {a.message_id for a in result} == {"1", "2"}
+        assert result[0].date == date(2024, 10, 2)
@@ -0,0 +1,71 @@
+import pickle
+import zlib
+from datetime import date
+from types import SimpleNamespace
+
+from app.models.special_holidays import SpecialHoliday, Holiday, HolidayInfo
+from app.utils import cache_codecs
+from app.utils.cache_codecs import CacheCodec, MISSING, HEADER, MAGIC, ZSTD
+
+
+def create_special_holiday(n: int = 30) -> SpecialHoliday:
+    return SpecialHoliday(
+        year=2024,
+        holidays=[
+            Holiday(date=date(2024, 1, 1 + i), info=HolidayInfo(name=f"節日 {i}", holiday_category="放假之紀念日及節日"))
+            for i in range(n)
+        ],
+    )
+
+
+class TestCacheCodec:
+    def test_encode_and_decode(self, init_db):
+        # Arrange
+        codec = CacheCodec(SpecialHoliday, compress_threshold=0)
+        document = create_special_holiday()
+
+        # Act
+        payload = codec.encode(document)
+
+        # Assert
+        assert codec.decode(payload) == document
+
+        # Case 2: the payload of another schema version is a miss
+        # Act & Assert
+        assert CacheCodec(SpecialHoliday, version=2).decode(payload) is MISSING
+
+        # Case 3: the pickled payload cached before the codec is a miss
+        # Act & Assert
+        assert codec.decode(pickle.dumps(document)) is MISSING
+
+        # Case 4: the payload cannot be decoded
+        # Act & Assert
+        assert codec.decode(HEADER.pack(MAGIC, 1, 0) + b"{invalid") is MISSING
+        assert codec.decode(b"") is MISSING
+
+    def test_compression(self, init_db, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(cache_codecs, "zstandard", SimpleNamespace(compress=zlib.compress, decompress=zlib.decompress))
+        codec = CacheCodec(SpecialHoliday, compress_threshold=100)
+        document = create_special_holiday()
+
+        # Act
+        payload = codec.encode(document)
+
+        # Assert
+        assert HEADER.unpack_from(payload)[2] == ZSTD
+        assert codec.decode(payload) == document
+
+        # Case 2: the payload under the threshold is not compressed
+        # Act
+        payload = codec.encode(create_special_holiday(0))
+
+        # Assert
+        assert HEADER.unpack_from(payload)[2] != ZSTD
+
+        # Case 3: the compressed payload is a miss without zstd
+        monkeypatch.setattr(cache_codecs, "zstandard", None)
+
+        # Act & Assert
+        assert codec.decode(codec.encode(document)) == document
+        assert codec.decode(HEADER.pack(MAGIC, 1, ZSTD) + zlib.compress(b"[]")) is MISSING
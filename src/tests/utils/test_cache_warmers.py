@@ -0,0 +1,97 @@
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.models import SpecialHoliday, DailyReport
+from app.utils.cache_warmers import CacheWarmer
+from app.utils.local_caches import holiday_cache
+
+
+class TestCacheWarmer:
+    @pytest.mark.asyncio
+    async def test_warm_holidays(self, init_db):
+        # Arrange
+        mock_redis = AsyncMock()
+        mock_redis.get_with_auto_set.side_effect = [Exception("Test error"), "2024"]
+        await SpecialHoliday.insert_one(SpecialHoliday(year=2026, holidays=[]))
+        warmer = CacheWarmer(mock_redis)
+
+        # Act
+        await warmer.warm_holidays(date(2024, 10, 9))
+
+        # Assert
+        # the failure of a year does not stop the others, the next year is not in the database
+        assert [c.args[3] for c in mock_redis.get_with_auto_set.call_args_list] == [2023, 2024]
+        assert holiday_cache.get("taiwan_calendar_2024") == "2024"
+
+        # Case 2: the next year is in the database
+        mock_redis.get_with_auto_set.reset_mock(side_effect=True)
+
+        # Act
+        await warmer.warm_holidays(date(2025, 1, 1))
+
+        # Assert
+        # 2024 is reloaded although it is in the in-process cache
+        assert [c.args[3] for c in mock_redis.get_with_auto_set.call_args_list] == [2024, 2025, 2026]
+
+    @pytest.mark.asyncio
+    async def test_warm_holidays_renews_local_cache(self, init_db):
+        # Arrange
+        now = 0
+        mock_redis = AsyncMock()
+        mock_redis.get_with_auto_set.return_value = "2024"
+        warmer = CacheWarmer(mock_redis)
+
+        # Act
+        with patch.object(holiday_cache, "clock", lambda: now):
+            await warmer.warm_holidays(date(2024, 10, 9))
+            # the refresh runs before the entry of the in-process cache expires
+            now = settings.WARMUP_INTERVAL
+            await warmer.warm_holidays(date(2024, 10, 9))
+            # the entry would have expired without the refresh
+            now = settings.HOLIDAY_LOCAL_CACHE_TTL + 1
+            cached = holiday_cache.get("taiwan_calendar_2024")
+
+        # Assert
+        assert [c.args[3] for c in mock_redis.get_with_auto_set.call_args_list] == [2023, 2024] * 2
+        assert cached == "2024"
+
+    @pytest.mark.asyncio
+    async def test_warm_daily_reports(self, init_db, mock_daily_reports: list[DailyReport]):
+        # Arrange
+        warmer = CacheWarmer(AsyncMock(), daily_report_days=7)
+
+        # Act
+        with patch("app.utils.cache_warmers.DailyReport.find") as mock_find:
+            mock_find.return_value.to_list = AsyncMock()
+            await warmer.warm_daily_reports(date(2024, 10, 9))
+
+        # Assert
+        mock_find.assert_called_once()
+        mock_find.return_value.to_list.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_warmup_budget(self):
+        # Arrange
+        warmer = CacheWarmer(AsyncMock(), budget=0.01)
+        finished = asyncio.Event()
+
+        async def warm_holidays():
+            await asyncio.sleep(0.05)
+            finished.set()
+
+        # Act
+        with patch.object(warmer, "warm_holidays", side_effect=warm_holidays):
+            result = await warmer.warmup()
+
+            # Assert
+            assert result == False
+            assert not finished.is_set()
+
+            # the warmup goes on in the background
+            await asyncio.wait_for(finished.wait(), 1)
+
+        await warmer.stop()
@@ -0,0 +1,158 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.enums import CircuitState
+from app.utils.circuit_breakers import (
+    CircuitBreaker,
+    CircuitBreakerProber,
+    get_circuit_breaker,
+    reset_circuit_breakers,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    def test_open_after_failures(self):
+        # Arrange
+        breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=30, clock=FakeClock())
+
+        # Act
+        for _ in range(2):
+            breaker.record_failure()
+
+        # Assert
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.allow_request() == True
+
+        # Case 2: the threshold is reached
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.allow_request() == False
+
+    def test_success_resets_failures(self):
+        # Arrange
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=30, clock=FakeClock())
+
+        # Act
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.failures == 1
+
+    def test_half_open(self):
+        # Arrange
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=30, clock=clock)
+        breaker.record_failure()
+
+        # Act
+        clock.now = 30.0
+
+        # Assert
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert breaker.allow_request() == True
+        # only a single trial is allowed
+        assert breaker.allow_request() == False
+
+        # Case 2: the trial fails
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state is CircuitState.OPEN
+
+        # Case 3: the trial succeeds
+        clock.now = 60.0
+        assert breaker.allow_request() == True
+        breaker.record_success()
+
+        # Assert
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.allow_request() == True
+
+    def test_release(self):
+        # Arrange
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 30.0
+        breaker.allow_request()
+
+        # Act
+        breaker.release()
+
+        # Assert
+        # the trial is inconclusive, the breaker stays half-open and allows another trial
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert breaker.failures == 1
+        assert breaker.allow_request() == True
+
+    def test_get_circuit_breaker(self):
+        # Act
+        breaker = get_circuit_breaker("test")
+
+        # Assert
+        assert get_circuit_breaker("test") is breaker
+
+        # Case 2: the breakers are reset
+        reset_circuit_breakers()
+
+        # Assert
+        assert get_circuit_breaker("test") is not breaker
+
+
+class TestCircuitBreakerProber:
+    @pytest.mark.asyncio
+    async def test_probe(self):
+        # Arrange
+        breaker = get_circuit_breaker("test")
+        breaker.recovery_timeout = 0
+        mock_probe = AsyncMock(side_effect=[False, True])
+        prober = CircuitBreakerProber({"test": mock_probe})
+
+        # Case 1: the breaker is closed, the channel is not probed
+        await prober.probe()
+
+        # Assert
+        mock_probe.assert_not_called()
+
+        # Case 2: the channel is still down
+        breaker.open()
+        await prober.probe()
+
+        # Assert
+        assert mock_probe.call_count == 1
+        assert breaker._state is CircuitState.OPEN
+
+        # Case 3: the channel has recovered
+        await prober.probe()
+
+        # Assert
+        assert mock_probe.call_count == 2
+        assert breaker.state is CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_probe_exception(self):
+        # Arrange
+        breaker = get_circuit_breaker("test")
+        breaker.recovery_timeout = 0
+        breaker.open()
+        prober = CircuitBreakerProber({"test": AsyncMock(side_effect=Exception("Test error"))})
+
+        # Act
+        await prober.probe()
+
+        # Assert
+        assert breaker._state is CircuitState.OPEN
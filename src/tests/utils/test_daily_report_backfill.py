@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.core.enums import ProductType, FileTypes
+from app.models.daily_reports import DailyReport
+from app.utils.attachment_stores import LocalAttachmentStore
+from app.utils.daily_report_backfill import DailyReportBackfill
+from app.utils.holiday_calendars import HolidayCalendar
+
+
+@pytest.fixture
+def dates() -> list[date]:
+    # from Monday to Friday
+    return [date(2024, 9, 30) + timedelta(days=i) for i in range(5)]
+
+
+@pytest.fixture
+def mock_data():
+    return [[{'產品別': '香蕉'}]]
+
+
+def from_processed_result(reader, _):
+    return DailyReport(
+        date=reader.date,
+        category=reader.category,
+        supply_type=reader.supply_type,
+        product_type=reader.product_type,
+        products=[],
+    )
+
+
+class TestDailyReportBackfill:
+    def test_expected_filenames(self, dates):
+        # Arrange
+        # the day after a holiday has no daily report
+        backfill = DailyReportBackfill(dates, [ProductType.CROPS], HolidayCalendar.from_dates([date(2024, 10, 2)]))
+
+        # Act
+        filenames = backfill.expected_filenames()
+
+        # Assert
+        assert len(filenames) == 4
+        assert all(len(values) == 1 for values in filenames.values())
+        assert date(2024, 10, 3) not in {d for values in filenames.values() for d, _ in values}
+        assert all(product_type is ProductType.CROPS for values in filenames.values() for _, product_type in values)
+
+        # Case 2: Saturday and Monday expect the daily report of Saturday
+        backfill = DailyReportBackfill([date(2024, 10, 12), date(2024, 10, 14)], [ProductType.CROPS], HolidayCalendar())
+
+        # Act
+        filenames = backfill.expected_filenames()
+
+        # Assert
+        assert filenames == {
+            "113年10月12日敏感性農產品產地價格日報表": [
+                (date(2024, 10, 12), ProductType.CROPS), (date(2024, 10, 14), ProductType.CROPS)
+            ]
+        }
+
+    @pytest.mark.asyncio
+    @patch('app.utils.daily_report_backfill.GmailProcessor.process_email')
+    @patch('app.utils.daily_report_backfill.GmailDailyReportSearcher.search_many')
+    @patch('app.utils.daily_report_backfill.GmailProcessor.service')
+    async def test_run(self, mock_service, mock_search_many, mock_process_email, init_db, dates, mock_data, tmp_path):
+        # Arrange
+        store = LocalAttachmentStore(str(tmp_path))
+        backfill = DailyReportBackfill(dates, [ProductType.CROPS], HolidayCalendar(), attachment_store=store, concurrency=2)
+        filenames = list(backfill.expected_filenames())
+        stored_filename, found_filename, missing_filenames = filenames[0], filenames[2], filenames[3:]
+        store.put('stored', stored_filename, b'raw', FileTypes.PDF)
+        mock_search_many.return_value = {found_filename: {'id': 'found', 'has_file': True}}
+        mock_process_email.return_value = mock_data
+        reader = backfill._get_mail_processor(dates[1], ProductType.CROPS).document_processor.reader
+        await from_processed_result(reader, None).insert()
+
+        # Act
+        with (
+            patch('app.utils.daily_report_backfill.GmailProcessor.process_stored', return_value=mock_data),
+            patch.object(DailyReport, 'from_processed_result', side_effect=from_processed_result),
+        ):
+            summary = await backfill.run()
+
+        # Assert
+        assert summary.expected == 5
+        assert summary.existing == 1
+        assert summary.not_found == 2
+        assert summary.saved == 2
+        assert summary.failed == 0
+        assert set(missing_filenames) <= set(mock_search_many.call_args.args[0])
+        assert stored_filename not in mock_search_many.call_args.args[0]
+        mock_search_many.assert_called_once()
+        mock_process_email.assert_called_once_with('found', found_filename)
+        assert await DailyReport.find_all().count() == 3
+
+    @pytest.mark.asyncio
+    @patch('app.utils.daily_report_backfill.GmailProcessor.process_email')
+    @patch('app.utils.daily_report_backfill.GmailDailyReportSearcher.search_many')
+    @patch('app.utils.daily_report_backfill.GmailProcessor.service')
+    async def test_run_with_shared_filename(
+            self, mock_service, mock_search_many, mock_process_email, init_db, mock_data
+    ):
+        # Arrange
+        saturday, monday = date(2024, 10, 12), date(2024, 10, 14)
+        backfill = DailyReportBackfill([saturday, monday], [ProductType.CROPS], HolidayCalendar())
+        filename = next(iter(backfill.expected_filenames()))
+        mock_search_many.return_value = {filename: {'id': 'found', 'has_file': True}}
+        mock_process_email.return_value = mock_data
+
+        # Act
+        with patch.object(DailyReport, 'from_processed_result', side_effect=from_processed_result):
+            summary = await backfill.run()
+
+        # Assert
+        # the daily report of every date expecting the file is saved
+        assert summary.expected == 2
+        assert summary.saved == 2
+        assert summary.not_found == 0
+        assert {report.date for report in await DailyReport.find_all().to_list()} == {saturday, monday}
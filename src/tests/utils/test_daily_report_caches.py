@@ -0,0 +1,60 @@
+from datetime import date, datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.config import settings
+from app.core.enums import ProductType
+from app.dependencies.redis import Redis
+from app.utils.daily_report_caches import DailyReportNotFoundCache
+from app.utils.datetime import TAIPEI_TIMEZONE
+
+
+class TestDailyReportNotFoundCache:
+    def test_ttl(self):
+        # Arrange
+        dt = date(2024, 10, 2)
+        published_at = datetime.combine(dt, settings.DAILY_REPORT_PUBLISH_TIME, tzinfo=TAIPEI_TIMEZONE)
+
+        # Case 1: the report is not published yet
+        ttl = DailyReportNotFoundCache.ttl(dt, published_at.replace(hour=published_at.hour - 1))
+
+        # Assert
+        assert ttl == 60 * 60
+
+        # Case 2: the report should be published already
+        ttl = DailyReportNotFoundCache.ttl(dt, published_at.replace(hour=published_at.hour + 1))
+
+        # Assert
+        assert ttl == settings.DAILY_REPORT_NOT_FOUND_TTL
+
+        # Case 3: the date is long past
+        ttl = DailyReportNotFoundCache.ttl(dt, published_at.replace(day=10))
+
+        # Assert
+        assert ttl == settings.DAILY_REPORT_NOT_FOUND_MAX_TTL
+
+        # Case 4: the date is far in the future
+        ttl = DailyReportNotFoundCache.ttl(dt, published_at.replace(month=1))
+
+        # Assert
+        assert ttl == settings.DAILY_REPORT_NOT_FOUND_MAX_TTL
+
+    @pytest.mark.asyncio
+    async def test_set_and_exists(self):
+        # Arrange
+        dt = date(2024, 10, 2)
+        redis = AsyncMock(spec=Redis)
+        redis.exists.return_value = True
+        cache = DailyReportNotFoundCache(redis)
+        key = cache.key(dt, ProductType.CROPS)
+
+        # Act
+        await cache.set(dt, ProductType.CROPS, "filename")
+        result = await cache.exists(dt, ProductType.CROPS)
+
+        # Assert
+        assert result is True
+        assert key == "daily_report_not_found_2024-10-02_作物"
+        redis.set.assert_called_once_with(key, "filename", ex=settings.DAILY_REPORT_NOT_FOUND_MAX_TTL)
+        redis.exists.assert_called_once_with(key)
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, patch, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.enums import JobStatus, ProductType, DailyReportHttpErrors, NotificationTypes
+from app.dependencies.redis import Redis
+from app.models import DailyReport
+from app.utils.daily_report_jobs import DailyReportJobWorkers, DailyReportJobStore
+from app.utils.holiday_calendars import HolidayCalendar
+
+
+@pytest.fixture
+def mock_redis() -> AsyncMock:
+    data = {}
+    mock_redis = AsyncMock(spec=Redis)
+    mock_redis.exists.return_value = False
+    mock_redis.get.side_effect = lambda key: data.get(key)
+    mock_redis.set.side_effect = lambda key, value, ex=None: data.__setitem__(key, value)
+
+    return mock_redis
+
+
+class TestDailyReportJobWorkers:
+    @pytest.mark.asyncio
+    async def test_submit(self, mock_redis):
+        # Arrange
+        workers = DailyReportJobWorkers(mock_redis, queue_size=1)
+        dt = date(2024, 10, 2)
+
+        # Act
+        job = await workers.submit(dt, ProductType.CROPS, HolidayCalendar(), callback_url="https://example.com/callback")
+
+        # Assert
+        assert job.status is JobStatus.PENDING
+        assert workers.queue.qsize() == 1
+        assert await DailyReportJobStore(mock_redis).get(job.id) == job
+
+        # Case 2: the job of the same daily report is pending
+        assert await workers.submit(dt, ProductType.CROPS, HolidayCalendar()) == job
+        assert workers.queue.qsize() == 1
+
+        # Case 3: the queue is full
+        with pytest.raises(asyncio.QueueFull):
+            await workers.submit(dt, ProductType.SEAFOOD, HolidayCalendar())
+
+    @pytest.mark.asyncio
+    @patch("app.utils.daily_report_jobs.get_http_client")
+    @patch("app.utils.daily_report_jobs.DailyReportExtractor.extract", new_callable=AsyncMock)
+    async def test_run(
+            self, mock_extract, mock_get_http_client, init_db, mock_redis, mock_daily_reports: list[DailyReport]
+    ):
+        # Arrange
+        mock_post = mock_get_http_client.return_value.post = AsyncMock(return_value=MagicMock())
+        workers = DailyReportJobWorkers(mock_redis)
+        daily_report = mock_daily_reports[0]
+        mock_extract.return_value = daily_report
+        job = await workers.submit(daily_report.date, ProductType.CROPS, HolidayCalendar(), callback_url="https://example.com")
+
+        # Act
+        workers.start()
+        await asyncio.wait_for(workers.queue.join(), timeout=1)
+        await workers.stop()
+
+        # Assert
+        job = await DailyReportJobStore(mock_redis).get(job.id)
+        assert job.status is JobStatus.SUCCEEDED
+        assert job.total == 1
+        assert job.results[0].products == daily_report.products
+        assert await DailyReport.find_all().count() == 1
+        mock_post.assert_called_once()
+        assert mock_post.call_args.args[0] == "https://example.com"
+
+    @pytest.mark.asyncio
+    @patch("app.utils.notification_coalescers.Notification.create_from_exception", new_callable=AsyncMock)
+    @patch("app.utils.daily_report_jobs.DailyReportExtractor.extract", new_callable=AsyncMock)
+    async def test_run_failed(
+            self,
+            mock_extract,
+            mock_create_from_exception,
+            init_db,
+            mock_redis
+    ):
+        # Arrange
+        workers = DailyReportJobWorkers(mock_redis)
+        mock_extract.side_effect = Exception("Failed to get daily report")
+        mock_redis.transaction.return_value = [1, 1, 1, 1, b"1728432508.0", 1]
+        _id = uuid4().hex
+
+        with patch("app.utils.daily_report_jobs.correlation_id") as mock_correlation_id:
+            mock_correlation_id.get.return_value = _id
+            job = await workers.submit(date(2024, 10, 2), ProductType.CROPS, HolidayCalendar())
+
+        # Act
+        job = await workers._run(job, HolidayCalendar())
+
+        # Assert
+        assert job.status is JobStatus.FAILED
+        assert job.error == DailyReportHttpErrors.FAILED.value
+        assert (await DailyReportJobStore(mock_redis).get(job.id)).status is JobStatus.FAILED
+        mock_create_from_exception.assert_called_once_with(
+            _id, str(DailyReportHttpErrors.FAILED), NotificationTypes.LINE
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.utils.daily_report_jobs.DailyReportJobWorkers._run", new_callable=AsyncMock)
+    async def test_work_failed(self, mock_run, mock_redis):
+        # Arrange
+        workers = DailyReportJobWorkers(mock_redis)
+        mock_run.side_effect = Exception("Failed to update the job")
+        job = await workers.submit(date(2024, 10, 2), ProductType.CROPS, HolidayCalendar())
+
+        # Act
+        workers.start()
+        await asyncio.wait_for(workers.queue.join(), timeout=1)
+        await workers.stop()
+
+        # Assert
+        # the job is not left pending until its state expires
+        job = await DailyReportJobStore(mock_redis).get(job.id)
+        assert job.status is JobStatus.FAILED
+        assert job.error == DailyReportHttpErrors.FAILED.value
+        assert not workers._in_flight
@@ -0,0 +1,61 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.daily_reports import DailyReport
+from app.utils.daily_report_writers import DailyReportWriter
+
+
+class TestDailyReportWriter:
+    @pytest.mark.asyncio
+    async def test_flush(self, init_db, mock_daily_reports: list[DailyReport]):
+        # Arrange
+        writer = DailyReportWriter(batch_size=2)
+        report = mock_daily_reports[0]
+
+        # Act
+        # the same daily report written again replaces the buffered one
+        writer.write(report.model_copy(update={"products": []}))
+        writer.write(report)
+        writer.write(mock_daily_reports[1])
+        writer.write(mock_daily_reports[2])
+
+        # Assert
+        assert len(writer.buffer) == 3
+        assert await writer.flush() == 2
+        assert await writer.flush() == 1
+        assert await DailyReport.find_all().count() == 3
+        assert await DailyReport.find_one(DailyReport.id == report.id) == report
+
+    @pytest.mark.asyncio
+    async def test_flush_with_mongo_error(self, init_db, mock_daily_reports: list[DailyReport]):
+        # Arrange
+        writer = DailyReportWriter()
+        writer.write(mock_daily_reports[0])
+
+        # Act
+        with patch.object(DailyReport, "bulk_upsert", AsyncMock(side_effect=ConnectionError("Mongo is down"))):
+            with pytest.raises(ConnectionError):
+                await writer.flush()
+
+        # Assert
+        # the daily reports are put back and written by the next flush
+        assert list(writer.buffer.values()) == [mock_daily_reports[0]]
+        assert await writer.flush() == 1
+        assert await DailyReport.find_all().count() == 1
+
+    @pytest.mark.asyncio
+    async def test_stop(self, init_db, mock_daily_reports: list[DailyReport]):
+        # Arrange
+        writer = DailyReportWriter(batch_size=1, interval=60)
+        writer.start()
+
+        for report in mock_daily_reports:
+            writer.write(report)
+
+        # Act
+        await writer.stop()
+
+        # Assert
+        assert not writer.buffer
+        assert await DailyReport.find_all().count() == len(mock_daily_reports)
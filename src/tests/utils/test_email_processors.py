@@ -1,10 +1,13 @@
+import base64
+from datetime import date
 from unittest.mock import Mock, patch, mock_open, PropertyMock, MagicMock
 
 import pytest
 from google.oauth2.credentials import Credentials
 
-from app.core.enums import FileTypes
-from app.utils.email_processors import GmailProcessor, SCOPES, GmailDailyReportSearcher
+from app.core.enums import FileTypes, ProductType
+from app.utils.attachment_stores import LocalAttachmentStore
+from app.utils.email_processors import GmailProcessor, SCOPES, GmailDailyReportSearcher, GmailSearcher
 
 
 class TestGmailProcessor:
@@ -140,3 +143,99 @@ class TestGmailSearcher:
         assert result[0]["subject"] == mock_message["payload"]["headers"][0]["value"]
         mock_resource.users().messages().list.assert_called_once_with(userId='me', q=keyword)
         mock_resource.users().messages().get.assert_called_once_with(userId='me', id=message['id'])
+
+
+    @patch('app.utils.email_processors.Resource', new_callable=MagicMock)
+    def test_mail_searcher_search_many(self, mock_resource, mock_messages, mock_message):
+        # Arrange
+        keywords = ['keyword', 'missing keyword']
+        mock_resource.users().messages().list.return_value.execute.return_value = mock_messages
+        mock_resource.users().messages().get.return_value.execute.return_value = mock_message
+        searcher = GmailDailyReportSearcher(mock_resource)
+
+        # Act
+        result = searcher.search_many(keywords, FileTypes.PDF)
+
+        # Assert
+        assert list(result) == ['keyword']
+        assert result['keyword']['id'] == mock_message['id']
+        assert result['keyword']['has_file'] is True
+        query = mock_resource.users().messages().list.call_args.kwargs['q']
+        assert 'subject:"keyword"' in query and 'subject:"missing keyword"' in query and ' OR ' in query
+        mock_resource.users().messages().list.assert_called_once()
+
+class TestGmailProcessorAttachmentStore:
+    @patch('app.utils.email_processors.GmailProcessor.service', new_callable=PropertyMock)
+    def test_process_stores_downloaded_attachment(self, mock_service, mock_messages, mock_message, tmp_path):
+        # Arrange
+        keyword = 'keyword'
+        data = b'%PDF-1.4 raw attachment'
+        store = LocalAttachmentStore(str(tmp_path))
+        document_processor = Mock()
+        document_processor.file_type = FileTypes.PDF
+        document_processor.reader.date = date(2024, 10, 2)
+        document_processor.reader.product_type = ProductType.CROPS
+        document_processor.process.return_value = [{'產品別': '香蕉'}]
+        service = mock_service.return_value
+        service.users().messages().list.return_value.execute.return_value = mock_messages
+        service.users().messages().get.return_value.execute.return_value = mock_message | {
+            'payload': mock_message['payload'] | {
+                'parts': [{'filename': 'file.pdf', 'body': {'attachmentId': 'attachment_id'}}]
+            }
+        }
+        service.users().messages().attachments().get.return_value.execute.return_value = {
+            'data': base64.urlsafe_b64encode(data).decode('UTF-8')
+        }
+        processor = GmailProcessor(document_processor, GmailDailyReportSearcher, store)
+
+        # Act
+        result = processor.process(keyword)
+
+        # Assert
+        assert result == [[{'產品別': '香蕉'}]]
+        attachments = store.find(keyword=keyword)
+        assert len(attachments) == 1
+        assert attachments[0].message_id == mock_message['id']
+        assert attachments[0].date == date(2024, 10, 2)
+        assert store.read(attachments[0]) == data
+
+    @patch('app.utils.email_processors.GmailProcessor.service', new_callable=PropertyMock)
+    def test_process_reads_stored_attachment(self, mock_service, tmp_path):
+        # Arrange
+        keyword = 'keyword'
+        store = LocalAttachmentStore(str(tmp_path))
+        store.put('message_id', keyword, b'%PDF-1.4 raw attachment', FileTypes.PDF)
+        document_processor = Mock()
+        document_processor.file_type = FileTypes.PDF
+        document_processor.process.return_value = [{'產品別': '香蕉'}]
+        processor = GmailProcessor(document_processor, GmailDailyReportSearcher, store)
+
+        # Act
+        result = processor.process(keyword)
+
+        # Assert
+        assert result == [[{'產品別': '香蕉'}]]
+        document_processor.process.assert_called_once()
+        mock_service.assert_not_called()
+
+    @patch('app.utils.email_processors.GmailProcessor.service', new_callable=PropertyMock)
+    def test_process_searches_mail_despite_stored_attachment(self, mock_service, tmp_path):
+        # Arrange
+        keyword = 'keyword'
+        store = LocalAttachmentStore(str(tmp_path))
+        store.put('message_id', keyword, b'%PDF-1.4 raw attachment', FileTypes.PDF)
+        document_processor = Mock()
+        document_processor.file_type = FileTypes.PDF
+        searcher = Mock(spec=GmailSearcher)
+        searcher.search.return_value = []
+        searcher_class = type('KeywordSearcher', (GmailSearcher,), {'search': searcher.search})
+        processor = GmailProcessor(document_processor, searcher_class, store)
+
+        # Act
+        result = processor.process(keyword)
+
+        # Assert
+        # the keyword of a general search may match new emails, the store does not answer it
+        assert result == []
+        searcher.search.assert_called_once_with(keyword, FileTypes.PDF)
+        document_processor.process.assert_not_called()
@@ -0,0 +1,141 @@
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.enums import NotificationStatus, NotificationTypes
+from app.models.notifications import Notification
+from app.utils.error_recorders import ErrorRecorder
+from app.utils.notification_coalescers import NotificationCoalescer
+from tests.fixtures import FakeRedis
+
+
+class TestErrorRecorder:
+    def test_record(self):
+        # Arrange
+        recorder = ErrorRecorder(NotificationCoalescer(FakeRedis()), capacity=2)
+
+        # Act
+        for i in range(3):
+            recorder.record(str(uuid4()), f"Error {i}")
+
+        # Assert
+        assert recorder.recorded == 3
+        assert recorder.dropped == 1
+        # the oldest error is dropped
+        assert [event.message for event in recorder.buffer] == ["Error 1", "Error 2"]
+
+    @pytest.mark.asyncio
+    async def test_flush(self, init_db):
+        # Arrange
+        redis = FakeRedis()
+        recorder = ErrorRecorder(NotificationCoalescer(redis), batch_size=10)
+
+        for i in range(5):
+            recorder.record(str(uuid4()), f"Timeout after {i}s")
+
+        recorder.record(str(uuid4()), "Failed to get the daily report")
+
+        # Act
+        result = await recorder.flush()
+
+        # Assert
+        assert result == 6
+        assert recorder.flushed == 6
+        assert await Notification.find(Notification.status == NotificationStatus.PENDING).count() == 2
+        assert sorted(int(h["count"]) for h in redis.hashes.values()) == [1, 5]
+
+        # Case 2: the error is in the window of the previous batch
+        recorder.record(str(uuid4()), "Timeout after 9s")
+
+        # Act
+        await recorder.flush()
+
+        # Assert
+        assert await Notification.find_all().count() == 2
+
+        # Case 3: the same errors of another notification type are not merged
+        recorder.record(str(uuid4()), "Timeout after 9s")
+        recorder.record(str(uuid4()), "Timeout after 9s", NotificationTypes.EMAIL)
+
+        # Act
+        await recorder.flush()
+
+        # Assert
+        assert await Notification.find_all().count() == 3
+        assert await Notification.find(Notification.type == NotificationTypes.EMAIL).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_with_redis_error(self, init_db):
+        # Arrange
+        redis = AsyncMock()
+        redis.transaction.side_effect = ConnectionError("Redis is down")
+        recorder = ErrorRecorder(NotificationCoalescer(redis))
+        recorder.record(str(uuid4()), "Error")
+
+        # Act
+        await recorder.flush()
+
+        # Assert
+        assert await Notification.find_all().count() == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_records_first_and_last_occurrences(self, init_db):
+        # Arrange
+        redis = FakeRedis()
+        recorder = ErrorRecorder(NotificationCoalescer(redis))
+
+        for i in range(3):
+            recorder.record(str(uuid4()), "Error")
+
+        first, *_, last = [event.occurred_at for event in recorder.buffer]
+
+        # Act
+        await recorder.flush()
+
+        # Assert
+        (h,) = redis.hashes.values()
+        assert float(h["first"]) == first
+        assert float(h["last"]) == last
+
+    @pytest.mark.asyncio
+    async def test_flush_with_mongo_error(self, init_db):
+        # Arrange
+        redis = FakeRedis()
+        recorder = ErrorRecorder(NotificationCoalescer(redis))
+
+        for message in ("Error", "Error", "Timeout"):
+            recorder.record(str(uuid4()), message)
+
+        # Act
+        with patch.object(Notification, "insert_many", AsyncMock(side_effect=ConnectionError("Mongo is down"))):
+            with pytest.raises(ConnectionError):
+                await recorder.flush()
+
+        # Assert
+        # the alerts are requeued in their order and not counted by the coalescer again
+        assert [(event.message, event.coalesced) for event in recorder.buffer] == [("Error", True), ("Timeout", True)]
+
+        # Act
+        await recorder.flush()
+
+        # Assert
+        assert not recorder.buffer
+        assert await Notification.find_all().count() == 2
+        assert sorted(int(h["count"]) for h in redis.hashes.values()) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_stop(self, init_db):
+        # Arrange
+        recorder = ErrorRecorder(NotificationCoalescer(FakeRedis()), batch_size=1, interval=60)
+        recorder.start()
+
+        for message in ("Error", "Timeout", "Not found"):
+            recorder.record(str(uuid4()), message)
+
+        # Act
+        await recorder.stop()
+
+        # Assert
+        assert not recorder.buffer
+        assert await Notification.find_all().count() == 3
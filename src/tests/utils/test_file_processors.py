@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from unittest.mock import Mock, patch
 
 import pandas as pd
@@ -9,7 +9,6 @@ from app.core.enums import (
     ProductType,
     SupplyType,
     Category,
-    WeekDay,
     DailyReportType,
 )
 from app.utils.file_processors import (
@@ -77,41 +76,25 @@ class TestDailyReportMetaInfo:
         assert meta_info.date == date
         assert meta_info.product_type == ProductType.CROPS
 
-    def test_daily_reporty_meta_info_get_calculated_report_date(self, special_holidays):
+    def test_daily_report_meta_info_filename(self, special_holidays):
         # Arrange
         # Case 1: 2024-10-01 is Tuesday
-        date = datetime(2024, 10, 1).date()
-        weekday = WeekDay(date.isoweekday())
-        meta_info = DailyReportMetaInfo(date, ProductType.CROPS, special_holidays)
-
-        # Act
-        calculated_date = meta_info._get_calculated_report_date(weekday)
-
-        # Assert
-        assert calculated_date == date
-
-        # Case 2: 2024-09-30 is Monday
-        date = datetime(2024, 9, 30).date()
-        weekday = WeekDay(date.isoweekday())
-        meta_info.date = date
+        meta_info = DailyReportMetaInfo(datetime(2024, 10, 1).date(), ProductType.CROPS, special_holidays)
 
-        # Act
-        calculated_date = meta_info._get_calculated_report_date(weekday)
+        # Act & Assert
+        assert meta_info.filename == "113年10月01日敏感性農產品產地價格日報表"
 
-        # Assert
-        assert calculated_date == date - timedelta(days=2)
-        assert WeekDay(calculated_date.isoweekday()) == WeekDay.SATURDAY
+        # Case 2: 2024-09-30 is Monday, it receives the daily report of Saturday
+        meta_info = DailyReportMetaInfo(datetime(2024, 9, 30).date(), ProductType.CROPS, special_holidays)
 
-        # Case 3: 2024-09-17 is Moon Festival
-        date = datetime(2024, 9, 18).date()
-        weekday = WeekDay(date.isoweekday())
-        meta_info.date = date
+        # Act & Assert
+        assert meta_info.filename == "113年09月28日敏感性農產品產地價格日報表"
 
-        # Act
-        calculated_date = meta_info._get_calculated_report_date(weekday)
+        # Case 3: 2024-09-17 is Moon Festival, the day after it has no daily report
+        meta_info = DailyReportMetaInfo(datetime(2024, 9, 18).date(), ProductType.CROPS, special_holidays)
 
-        # Assert
-        assert calculated_date is None
+        # Act & Assert
+        assert meta_info.filename == ""
 
     def test_daily_report_meta_info_filename(self, special_holidays):
         # Arrange
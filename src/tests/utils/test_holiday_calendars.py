@@ -0,0 +1,89 @@
+from datetime import date
+
+from app.utils.holiday_calendars import HolidayCalendar, YearCalendar
+
+
+class TestYearCalendar:
+    def test_year_calendar(self):
+        # Arrange
+        # 2024 is a leap year, the holiday of another year is ignored
+        calendar = YearCalendar(2024, [date(2024, 10, 10), date(2024, 12, 31), date(2025, 1, 1)])
+
+        # Assert
+        assert calendar.is_holiday(date(2024, 10, 10))
+        assert calendar.is_holiday(date(2024, 12, 31))
+        assert not calendar.is_holiday(date(2024, 10, 11))
+        assert not calendar.is_business_day(date(2024, 10, 10))  # Holiday
+        assert not calendar.is_business_day(date(2024, 10, 12))  # Saturday
+        assert calendar.is_business_day(date(2024, 10, 11))
+        assert calendar.is_business_day(date(2024, 2, 29))
+        assert sum(bin(b).count("1") for b in calendar.business_days) == 262 - 2
+
+    def test_from_bitset(self):
+        # Arrange
+        calendar = YearCalendar(2024, [date(2024, 1, 1), date(2024, 10, 10), date(2024, 12, 31)])
+
+        # Act
+        rebuilt = YearCalendar.from_bitset(2024, calendar.holidays)
+
+        # Assert
+        assert rebuilt.holidays == calendar.holidays
+        assert rebuilt.business_days == calendar.business_days
+        assert rebuilt.business_ordinals == calendar.business_ordinals
+
+
+class TestHolidayCalendar:
+    def test_holiday_calendar(self, special_holidays):
+        # Assert
+        assert date(2024, 9, 17) in special_holidays  # Moon Festival
+        assert date(2024, 9, 18) not in special_holidays
+        assert not special_holidays.is_business_day(date(2024, 9, 17))
+        assert special_holidays.is_business_day(date(2024, 9, 18))
+
+        # Case 2: the year without a calendar only has the weekends
+        calendar = HolidayCalendar()
+
+        # Assert
+        assert date(2030, 1, 1) not in calendar
+        assert calendar.is_business_day(date(2030, 1, 1))
+        assert not calendar.is_business_day(date(2030, 1, 5))
+
+    def test_from_dates(self):
+        # Act
+        calendar = HolidayCalendar.from_dates([date(2024, 12, 31), date(2025, 1, 1)])
+
+        # Assert
+        assert calendar.years == [2024, 2025]
+        assert date(2024, 12, 31) in calendar
+        assert date(2025, 1, 1) in calendar
+
+    def test_previous_business_day(self, special_holidays):
+        # Assert
+        assert special_holidays.previous_business_day(date(2024, 10, 3)) == date(2024, 10, 2)
+        # National Day
+        assert special_holidays.previous_business_day(date(2024, 10, 11)) == date(2024, 10, 9)
+        # Weekend
+        assert special_holidays.previous_business_day(date(2024, 10, 7)) == date(2024, 10, 4)
+        # across the years
+        calendar = HolidayCalendar.from_dates([date(2025, 1, 1)])
+        assert calendar.previous_business_day(date(2025, 1, 2)) == date(2024, 12, 31)
+
+    def test_next_business_day(self, special_holidays):
+        # Assert
+        assert special_holidays.next_business_day(date(2024, 10, 9)) == date(2024, 10, 11)
+        assert special_holidays.next_business_day(date(2024, 10, 9), 3) == date(2024, 10, 15)
+        # across the years
+        calendar = HolidayCalendar.from_dates([date(2025, 1, 1)])
+        assert calendar.next_business_day(date(2024, 12, 31)) == date(2025, 1, 2)
+        assert calendar.next_business_day(date(2024, 1, 1), 262) == date(2025, 1, 2)
+
+    def test_count_business_days(self, special_holidays):
+        # Assert
+        assert special_holidays.count_business_days(date(2024, 10, 7), date(2024, 10, 13)) == 4
+        assert special_holidays.count_business_days(date(2024, 10, 12), date(2024, 10, 13)) == 0
+        assert special_holidays.get_business_days(date(2024, 10, 9), date(2024, 10, 11)) == [
+            date(2024, 10, 9), date(2024, 10, 11)
+        ]
+        # across the years
+        calendar = HolidayCalendar.from_dates([date(2025, 1, 1)])
+        assert calendar.count_business_days(date(2024, 12, 30), date(2025, 1, 3)) == 4
@@ -0,0 +1,105 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.api.v1.endpoints.utils import get_cached_holidays
+from app.utils.local_caches import LocalCache, CacheInvalidationListener, MISSING, holiday_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLocalCache:
+    def test_get_and_set(self):
+        # Arrange
+        clock = FakeClock()
+        cache = LocalCache(maxsize=2, ttl=10, clock=clock)
+
+        # Act
+        cache.set("a", None)
+        cache.set("b", 2)
+
+        # Assert
+        assert cache.get("a") is None
+        assert cache.get("c") is MISSING
+
+        # Case 2: the least recently used entry is evicted
+        cache.set("c", 3)
+
+        # Assert
+        assert cache.get("b") is MISSING
+        assert cache.get("a") is None
+        assert len(cache) == 2
+
+        # Case 3: the entries expire
+        clock.now = 10
+
+        # Assert
+        assert cache.get("a") is MISSING
+        assert cache.get("c") is MISSING
+        assert len(cache) == 0
+
+    def test_delete_and_clear(self):
+        # Arrange
+        cache = LocalCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        # Act
+        cache.delete("a")
+        cache.delete("missing")
+
+        # Assert
+        assert cache.get("a") is MISSING
+        assert cache.get("b") == 2
+
+        # Case 2: clear
+        cache.clear()
+
+        # Assert
+        assert len(cache) == 0
+
+
+class TestCacheInvalidationListener:
+    def test_handle(self):
+        # Arrange
+        cache = LocalCache(maxsize=2, ttl=10)
+        cache.set("taiwan_calendar_2024", 1)
+        cache.set("taiwan_calendar_2025", 2)
+        listener = CacheInvalidationListener(MagicMock(), cache)
+
+        # Act
+        listener.handle({"type": "subscribe", "data": 1})
+        listener.handle({"type": "message", "data": b"taiwan_calendar_2024"})
+
+        # Assert
+        assert cache.get("taiwan_calendar_2024") is MISSING
+        assert cache.get("taiwan_calendar_2025") == 2
+
+
+@pytest.mark.asyncio
+async def test_get_cached_holidays():
+    # Arrange
+    mock_redis = AsyncMock()
+    mock_redis.get_with_auto_set.return_value = holidays = MagicMock()
+
+    # Act
+    results = [await get_cached_holidays("taiwan_calendar_2024", mock_redis, 2024) for _ in range(2)]
+
+    # Assert
+    assert results == [holidays, holidays]
+    mock_redis.get_with_auto_set.assert_called_once()
+
+    # Case 2: the local cache is invalidated
+    holiday_cache.delete("taiwan_calendar_2024")
+
+    # Act
+    await get_cached_holidays("taiwan_calendar_2024", mock_redis, 2024)
+
+    # Assert
+    assert mock_redis.get_with_auto_set.call_count == 2
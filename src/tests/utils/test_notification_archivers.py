@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.core.enums import NotificationCategories, NotificationTypes, LogLevel, NotificationStatus
+from app.models.notifications import Notification, get_archive_collection_name
+from app.utils.notification_archivers import NotificationArchiver
+
+
+def create_notification(created_at: datetime, level: LogLevel = LogLevel.ERROR, **kwargs) -> Notification:
+    return Notification(
+        date=created_at.date(),
+        correlation_id=uuid4(),
+        category=NotificationCategories.SYSTEM,
+        type=NotificationTypes.LINE,
+        level=level,
+        message="Test message",
+        created_at=created_at,
+        **kwargs
+    )
+
+
+class TestNotificationArchiver:
+    @pytest.mark.asyncio
+    async def test_archive(self, init_db):
+        # Arrange
+        now = datetime(2024, 12, 31)
+        archiver = NotificationArchiver(after_days=30, batch_size=10, compressor="")
+        notifications = [
+            create_notification(datetime(2024, 10, 9)),
+            create_notification(datetime(2024, 11, 1), status=NotificationStatus.DELIVERED),
+            # the notifications that are not archived
+            create_notification(datetime(2024, 10, 9), status=NotificationStatus.PENDING),
+            create_notification(datetime(2024, 10, 9), level=LogLevel.INFO),
+            create_notification(datetime(2024, 12, 30)),
+        ]
+
+        for notification in notifications:
+            await Notification.insert_one(notification)
+
+        database = Notification.get_motor_collection().database
+
+        # Act
+        result = await archiver.archive(now)
+
+        # Assert
+        assert result == 2
+        assert await Notification.find(Notification.level == LogLevel.ERROR).count() == 2
+        assert await database[get_archive_collection_name(notifications[0].date)].count_documents({}) == 1
+        assert await database[get_archive_collection_name(notifications[1].date)].count_documents({}) == 1
+
+        # Case 2: nothing is left to be archived
+        assert await archiver.archive(now) == 0
+
+    @pytest.mark.asyncio
+    async def test_archive_interrupted(self, init_db):
+        # Arrange
+        now = datetime(2024, 12, 31)
+        archiver = NotificationArchiver(after_days=30, compressor="")
+        notification = await Notification.insert_one(create_notification(now - timedelta(days=60)))
+        archive = await archiver.get_archive_collection(get_archive_collection_name(notification.date))
+        # the notification was copied but not removed
+        await archive.insert_one(await Notification.get_motor_collection().find_one({"_id": notification.id}))
+
+        # Act
+        result = await archiver.archive(now)
+
+        # Assert
+        assert result == 1
+        assert await Notification.find_all().count() == 0
+        assert await archive.count_documents({}) == 1
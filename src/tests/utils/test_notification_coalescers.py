@@ -0,0 +1,121 @@
+from unittest.mock import patch, AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.enums import NotificationCategories, LogLevel, NotificationStatus, NotificationTypes
+from app.models.notifications import Notification
+from app.utils.notification_coalescers import NotificationCoalescer, normalize_message
+from tests.fixtures import FakeRedis
+
+
+class TestNormalizeMessage:
+    def test_normalize_message(self):
+        # Act & Assert
+        assert normalize_message("Timeout after 30.5s  for 6c84fb90-12c4-11e1-840d-7b25c5ee775a") == (
+            "Timeout after <n>s for <uuid>"
+        )
+        assert normalize_message("Message 18c5f2a3b4d5e6f7 not found") == "Message <id> not found"
+        assert normalize_message("Failed to get the daily report") == "Failed to get the daily report"
+
+
+class TestNotificationCoalescer:
+    def test_key(self):
+        # Arrange
+        system, service = NotificationCategories.SYSTEM, NotificationCategories.SERVICE
+        line, email = NotificationTypes.LINE, NotificationTypes.EMAIL
+
+        # Act & Assert
+        assert NotificationCoalescer.key(system, line, LogLevel.ERROR, "Error 1") == (
+            NotificationCoalescer.key(system, line, LogLevel.ERROR, "Error  2")
+        )
+        assert NotificationCoalescer.key(system, line, LogLevel.ERROR, "Error") != (
+            NotificationCoalescer.key(service, line, LogLevel.ERROR, "Error")
+        )
+        assert NotificationCoalescer.key(system, line, LogLevel.ERROR, "Error") != (
+            NotificationCoalescer.key(system, email, LogLevel.ERROR, "Error")
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.utils.notification_coalescers.Notification.create_from_exception", new_callable=AsyncMock)
+    async def test_create_from_exception(self, mock_create_from_exception, init_db):
+        # Arrange
+        coalescer = NotificationCoalescer(FakeRedis(), window=60, max_window=600)
+        correlation_id = str(uuid4())
+
+        # Act
+        results = [await coalescer.create_from_exception(correlation_id, f"Error {i}") for i in range(3)]
+
+        # Assert
+        assert results[0] is mock_create_from_exception.return_value
+        assert results[1:] == [None, None]
+        mock_create_from_exception.assert_called_once_with(correlation_id, "Error 0", NotificationTypes.LINE)
+
+    @pytest.mark.asyncio
+    @patch("app.utils.notification_coalescers.Notification.create_from_exception", new_callable=AsyncMock)
+    async def test_create_from_exception_with_redis_error(self, mock_create_from_exception, init_db):
+        # Arrange
+        redis = AsyncMock()
+        redis.transaction.side_effect = ConnectionError("Redis is down")
+        coalescer = NotificationCoalescer(redis)
+
+        # Act
+        await coalescer.create_from_exception(str(uuid4()), "Error")
+
+        # Assert
+        mock_create_from_exception.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_record_and_flush(self, init_db):
+        # Arrange
+        redis = FakeRedis()
+        coalescer = NotificationCoalescer(redis, window=60, max_window=600)
+        notification = Notification(
+            correlation_id=uuid4(),
+            category=NotificationCategories.SYSTEM,
+            type=NotificationTypes.LINE,
+            level=LogLevel.ERROR,
+            message="Error",
+        )
+
+        # Act
+        counts = [await coalescer.record(notification, now=1000.0 + i * 30) for i in range(3)]
+
+        # Assert
+        assert counts == [1, 2, 3]
+
+        # Case 1: the window slides with every occurrence
+        assert await coalescer.flush(now=1100.0) == 0
+
+        # Case 2: the window is closed
+        assert await coalescer.flush(now=1121.0) == 1
+        summary = await Notification.find_one(Notification.status == NotificationStatus.PENDING)
+        assert summary.message.startswith("Error (occurred 3 times from ")
+        assert summary.correlation_id == notification.correlation_id
+        assert redis.hashes == {}
+
+        # Case 3: a single occurrence has no summary
+        await coalescer.record(notification, now=2000.0)
+
+        # Assert
+        assert await coalescer.flush(now=2061.0) == 0
+        assert await Notification.find_all().count() == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_with_max_window(self, init_db):
+        # Arrange
+        coalescer = NotificationCoalescer(FakeRedis(), window=60, max_window=100)
+        notification = Notification(
+            correlation_id=uuid4(),
+            category=NotificationCategories.SYSTEM,
+            type=NotificationTypes.LINE,
+            level=LogLevel.ERROR,
+            message="Error",
+        )
+
+        # Act
+        for i in range(5):
+            await coalescer.record(notification, now=1000.0 + i * 30)
+
+        # Assert
+        assert await coalescer.flush(now=1101.0) == 1
@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch, AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.enums import NotificationStatus, NotificationTypes
+from app.models.notifications import Notification
+from app.utils.notification_dispatcher import NotificationDispatcher, ChannelWorkers
+from app.utils.notification_helper import LineNotificationStrategy, EmailNotificationStrategy
+
+
+@pytest.fixture
+async def pending_notifications(init_db) -> list[Notification]:
+    return [
+        await Notification.create_from_exception(str(uuid4()), f"Test error message {i}") for i in range(3)
+    ]
+
+
+def start_channels(dispatcher: NotificationDispatcher):
+    for channel in dispatcher.channels.values():
+        channel.start()
+
+
+class TestNotificationDispatcher:
+    def test_get_strategy(self, pending_notifications):
+        # Arrange
+        notification = pending_notifications[0]
+
+        # Act & Assert
+        assert isinstance(NotificationDispatcher.get_strategy(notification), LineNotificationStrategy)
+        assert isinstance(
+            NotificationDispatcher.get_strategy(notification.model_copy(update={"type": NotificationTypes.EMAIL})),
+            EmailNotificationStrategy
+        )
+
+    @patch("app.utils.notification_dispatcher.settings")
+    def test_backoff(self, mock_settings):
+        # Arrange
+        mock_settings.NOTIFICATION_RETRY_BACKOFF = 5
+        mock_settings.NOTIFICATION_RETRY_MAX_BACKOFF = 30
+
+        # Act & Assert
+        assert 4 <= NotificationDispatcher.backoff(1) <= 6
+        assert 16 <= NotificationDispatcher.backoff(3) <= 24
+        assert 24 <= NotificationDispatcher.backoff(10) <= 36
+
+    @pytest.mark.asyncio
+    @patch("app.utils.notification_dispatcher.NotificationManager.send_notification", new_callable=AsyncMock)
+    async def test_dispatch(self, mock_send_notification, pending_notifications):
+        # Arrange
+        dispatcher = NotificationDispatcher(batch_size=2)
+        start_channels(dispatcher)
+        mock_send_notification.return_value = True
+
+        # Act
+        claimed = await dispatcher.dispatch()
+        await dispatcher.drain()
+
+        # Assert
+        assert claimed == 2
+        assert mock_send_notification.call_count == 2
+        assert await Notification.find(Notification.status == NotificationStatus.DELIVERED).count() == 2
+        assert await Notification.find(Notification.status == NotificationStatus.PENDING).count() == 1
+        assert dispatcher.metrics()[NotificationTypes.LINE]["sent"] == 2
+
+        # Case 2: the rest of the outbox
+        assert await dispatcher.dispatch() == 1
+        assert await dispatcher.dispatch() == 0
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    @patch("app.utils.notification_dispatcher.NotificationManager.send_notification", new_callable=AsyncMock)
+    async def test_dispatch_failed(self, mock_send_notification, pending_notifications):
+        # Arrange
+        dispatcher = NotificationDispatcher(batch_size=1, max_attempts=2)
+        start_channels(dispatcher)
+        mock_send_notification.side_effect = [False, Exception("Test error")]
+
+        # Act
+        await dispatcher.dispatch()
+        await dispatcher.drain()
+
+        # Assert
+        notification = await Notification.get(pending_notifications[0].id)
+        assert notification.status is NotificationStatus.PENDING
+        assert notification.attempts == 1
+        assert notification.next_attempt_at > datetime.now()
+        assert notification.last_error is not None
+
+        # Case 2: the last attempt
+        await Notification.find(Notification.id != notification.id).delete()
+        await notification.set({Notification.next_attempt_at: datetime.now()})
+        await dispatcher.dispatch()
+        await dispatcher.stop()
+
+        # Assert
+        notification = await Notification.get(pending_notifications[0].id)
+        assert notification.status is NotificationStatus.FAILED
+        assert notification.attempts == 2
+        assert notification.last_error == "Test error"
+
+    @pytest.mark.asyncio
+    @patch("app.utils.notification_helper.get_circuit_breaker")
+    @patch("app.utils.notification_helper.get_http_client")
+    @patch("app.utils.notification_helper.EmailNotificationStrategy", new_callable=MagicMock)
+    async def test_dispatch_rejected(
+            self, mock_email_strategy, mock_get_http_client, mock_get_circuit_breaker, pending_notifications
+    ):
+        # Arrange
+        dispatcher = NotificationDispatcher(batch_size=1, max_attempts=3)
+        start_channels(dispatcher)
+        mock_get_http_client.return_value.post = AsyncMock(return_value=MagicMock(status_code=401, text="Invalid"))
+        mock_send_system_notify = mock_email_strategy.return_value.send_system_notify = AsyncMock(return_value=True)
+
+        # Act
+        await dispatcher.dispatch()
+        await dispatcher.stop()
+
+        # Assert
+        # the rejected notification is not retried and the system recipients are emailed once
+        notification = await Notification.get(pending_notifications[0].id)
+        assert notification.status is NotificationStatus.FAILED
+        assert notification.attempts == 1
+        mock_send_system_notify.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_per_channel(self, pending_notifications):
+        # Arrange
+        email = await Notification.create_from_exception(str(uuid4()), "Test error message", NotificationTypes.EMAIL)
+        dispatcher = NotificationDispatcher()
+        line = dispatcher.channels[NotificationTypes.LINE]
+        line.queue = asyncio.Queue(2)
+        line.put(pending_notifications[0])
+
+        # Act
+        claimed = await dispatcher.dispatch()
+
+        # Assert
+        # the LINE channel only claims as many as it can queue
+        assert claimed == 2
+        assert line.queue.qsize() == 2
+        assert dispatcher.channels[NotificationTypes.EMAIL].queue.get_nowait()[0].id == email.id
+
+    @pytest.mark.asyncio
+    async def test_skip_expired_lease(self, pending_notifications):
+        # Arrange
+        mock_send = AsyncMock()
+        channel = ChannelWorkers(NotificationTypes.LINE, mock_send, concurrency=1, rate=100, burst=1, queue_size=2)
+        expired = pending_notifications[0].model_copy(update={"locked_until": datetime.now() - timedelta(seconds=1)})
+        channel.start()
+
+        # Act
+        channel.put(expired)
+        channel.put(pending_notifications[1])
+        await channel.drain(timeout=1)
+        await channel.stop()
+
+        # Assert
+        mock_send.assert_called_once_with(pending_notifications[1])
+        assert channel.metrics()["sent"] == 1
+        assert channel.metrics()["skipped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_dispatch_with_coalescer(self, init_db):
+        # Arrange
+        mock_coalescer = AsyncMock()
+        dispatcher = NotificationDispatcher(mock_coalescer)
+
+        # Act
+        claimed = await dispatcher.dispatch()
+
+        # Assert
+        assert claimed == 0
+        mock_coalescer.flush.assert_called_once()
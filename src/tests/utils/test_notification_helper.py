@@ -1,4 +1,6 @@
-from unittest.mock import patch, MagicMock
+import base64
+from email import message_from_bytes, policy
+from unittest.mock import patch, MagicMock, AsyncMock
 from uuid import uuid4
 
 import pytest
@@ -10,12 +12,17 @@ from app.core.enums import (
     LogLevel,
     LineApis,
     LineNotifyErrorMessages,
+    CircuitState,
 )
 from app.models.notifications import Notification
+from app.utils.circuit_breakers import get_circuit_breaker
 from app.utils.notification_helper import (
     EmailNotificationStrategy,
     LineNotificationStrategy,
     NotificationManager,
+    get_http_client,
+    close_http_client,
+    probe_line_notify,
 )
 
 
@@ -31,15 +38,16 @@ def notification(init_db):
 
 
 class TestEmailNotificationStrategy:
+    @pytest.mark.asyncio
     @patch('app.utils.notification_helper.GmailProcessor')
-    def test_send(self, mock_gmail_processor, notification, mock_settings):
+    async def test_send(self, mock_gmail_processor, notification, mock_settings):
         # Arrange
         mock_service = MagicMock()
         mock_gmail_processor.return_value.service = mock_service
         strategy = EmailNotificationStrategy()
 
         # Act
-        result = strategy.send(notification)
+        result = await strategy.send(notification)
 
         # Assert
         assert strategy.recipients is not None
@@ -47,8 +55,9 @@ class TestEmailNotificationStrategy:
         assert result == True
         mock_service.users().messages().send.assert_called_once()
 
+    @pytest.mark.asyncio
     @patch('app.utils.notification_helper.GmailProcessor')
-    def test_send_failure(self, mock_gmail_processor, notification, mock_settings):
+    async def test_send_failure(self, mock_gmail_processor, notification, mock_settings):
         # Arrange
         mock_service = MagicMock()
         mock_service.users().messages().send.side_effect = Exception("Test error")
@@ -56,21 +65,67 @@ class TestEmailNotificationStrategy:
         strategy = EmailNotificationStrategy()
 
         # Act
-        result = strategy.send(notification)
+        result = await strategy.send(notification)
 
         # Assert
         assert result == False
 
+    @pytest.mark.asyncio
+    @patch('app.utils.notification_helper.GmailProcessor')
+    async def test_send_to_multiple_recipients(self, mock_gmail_processor, notification, mock_settings):
+        # Arrange
+        mock_service = MagicMock()
+        mock_send = mock_service.users().messages().send
+        mock_send.return_value.execute.side_effect = [None, Exception("Test error")]
+        mock_gmail_processor.return_value.service = mock_service
+        strategy = EmailNotificationStrategy(CommaSeparatedStrings("a@example.com,b@example.com,c@example.com"))
+
+        # Act
+        failed_recipients = await strategy.send_to_recipients(notification)
+
+        # Assert
+        assert strategy.chunk_recipients() == [["a@example.com", "b@example.com"], ["c@example.com"]]
+        assert failed_recipients == ["c@example.com"]
+        assert mock_send.call_count == 2
+        first = message_from_bytes(base64.urlsafe_b64decode(mock_send.call_args_list[0].kwargs["body"]["raw"]))
+        second = message_from_bytes(base64.urlsafe_b64decode(mock_send.call_args_list[1].kwargs["body"]["raw"]))
+        assert first["bcc"].strip() == "a@example.com, b@example.com"
+        assert second["to"].strip() == "c@example.com"
+        assert second["bcc"] is None
+        # the emails only differ in the addressing headers
+        assert first["subject"] == second["subject"] == strategy.subject
+        assert first.get_payload(0).get_payload() == second.get_payload(0).get_payload() == notification.message
+
+        # Case 2: the headers of many recipients are folded and the non-ASCII names are encoded
+        mock_send.reset_mock()
+        mock_send.return_value.execute.side_effect = None
+        recipients = [f"user{i}@example.com" for i in range(99)] + ["測試 <test@example.com>"]
+        strategy.recipients = CommaSeparatedStrings(",".join(recipients))
+
+        with patch.object(mock_settings, "GMAIL_MAX_RECIPIENTS", 100):
+            # Act
+            failed_recipients = await strategy.send_to_recipients(notification)
+
+        # Assert
+        assert failed_recipients == []
+        raw = base64.urlsafe_b64decode(mock_send.call_args.kwargs["body"]["raw"])
+        assert raw.isascii()
+        assert max(len(line) for line in raw.split(b"\r\n")) <= 998
+        message = message_from_bytes(raw, policy=policy.default)
+        assert [address.addr_spec for address in message["bcc"].addresses][-1] == "test@example.com"
+        assert message["bcc"].addresses[-1].display_name == "測試"
+
+    @pytest.mark.asyncio
     @patch('app.utils.notification_helper.BackgroundTasks')
     @patch('app.utils.notification_helper.GmailProcessor')
-    def test_send_system_notify(self, mock_gmail_processor, mock_background_tasks, notification, mock_settings):
+    async def test_send_system_notify(self, mock_gmail_processor, mock_background_tasks, notification, mock_settings):
         # Arrange
         mock_service = MagicMock()
         mock_gmail_processor.return_value.service = mock_service
         strategy = EmailNotificationStrategy()
 
         # Act
-        result = strategy.send_system_notify(notification)
+        result = await strategy.send_system_notify(notification)
 
         # Assert
         assert result == True
@@ -79,43 +134,45 @@ class TestEmailNotificationStrategy:
 
 
 class TestLineNotificationStrategy:
-    @patch('app.utils.notification_helper.requests.post')
-    def test_send_success(self, mock_post, notification, mock_settings):
+    @pytest.mark.asyncio
+    @patch('app.utils.notification_helper.get_http_client')
+    async def test_send_success(self, mock_get_http_client, notification, mock_settings):
         # Arrange
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_post = mock_get_http_client.return_value.post = AsyncMock(return_value=mock_response)
         strategy = LineNotificationStrategy()
         headers = strategy.get_headers(mock_settings.SERVICE_NOTIFY_TOKEN)
         data = {"message": notification.message}
 
         # Act
-        result = strategy.send(notification)
+        result = await strategy.send(notification)
 
         # Assert
         assert result == True
         mock_post.assert_called_once_with(LineApis.NOTIFY, headers=headers, data=data)
 
-    @patch('app.utils.notification_helper.requests.post')
+    @pytest.mark.asyncio
+    @patch('app.utils.notification_helper.get_http_client')
     @patch(
         'app.utils.notification_helper.EmailNotificationStrategy',
         new_callable=MagicMock,
         spec=EmailNotificationStrategy
     )
-    def test_send_failure(self, mock_email_strategy, mock_post, notification, mock_settings):
+    async def test_send_failure(self, mock_email_strategy, mock_get_http_client, notification, mock_settings):
         # Arrange
         mock_response = MagicMock()
         mock_response.status_code = 400
         mock_response.text = "Bad request"
-        mock_post.return_value = mock_response
-        mock_email_strategy.return_value.send_system_notify.return_value = True
+        mock_post = mock_get_http_client.return_value.post = AsyncMock(return_value=mock_response)
+        mock_email_strategy.return_value.send_system_notify = AsyncMock(return_value=True)
         strategy = LineNotificationStrategy()
         mail_subject = LineNotifyErrorMessages.SEND_MESSAGE_FAILED
         msg = f"{mail_subject}: {mock_response.text}"
         copy_notification = notification.model_copy(update={"message": msg})
 
         # Act
-        result = strategy.send(notification)
+        result = await strategy.send(notification)
 
         # Assert
         assert result == False
@@ -124,24 +181,25 @@ class TestLineNotificationStrategy:
         mock_post.assert_called_once()
         mock_email_strategy.return_value.send_system_notify.assert_called_once_with(copy_notification)
 
-    @patch('app.utils.notification_helper.requests.post')
+    @pytest.mark.asyncio
+    @patch('app.utils.notification_helper.get_http_client')
     @patch(
         'app.utils.notification_helper.EmailNotificationStrategy',
         new_callable=MagicMock,
         spec=EmailNotificationStrategy
     )
-    def test_send_exception(self, mock_email_strategy, mock_post, notification, mock_settings):
+    async def test_send_exception(self, mock_email_strategy, mock_get_http_client, notification, mock_settings):
         # Arrange
         error_msg = "Test error"
-        mock_post.side_effect = Exception(error_msg)
-        mock_email_strategy.return_value.send_system_notify.return_value = True
+        mock_post = mock_get_http_client.return_value.post = AsyncMock(side_effect=Exception(error_msg))
+        mock_email_strategy.return_value.send_system_notify = AsyncMock(return_value=True)
         strategy = LineNotificationStrategy()
         mail_subject = LineNotifyErrorMessages.ERROR_OCCURRED
         msg = f"{mail_subject}: {error_msg}"
         copy_notification = notification.model_copy(update={"message": msg})
 
         # Act
-        result = strategy.send(notification)
+        result = await strategy.send(notification)
 
         # Assert
         assert result == False
@@ -149,17 +207,174 @@ class TestLineNotificationStrategy:
         assert strategy.mail_strategy.subject == mail_subject
         mock_email_strategy.return_value.send_system_notify.assert_called_once_with(copy_notification)
 
+    @pytest.mark.asyncio
+    @patch('app.utils.notification_helper.get_http_client')
+    @patch(
+        'app.utils.notification_helper.EmailNotificationStrategy',
+        new_callable=MagicMock,
+        spec=EmailNotificationStrategy
+    )
+    async def test_send_with_open_circuit(self, mock_email_strategy, mock_get_http_client, notification, mock_settings):
+        # Arrange
+        mock_response = MagicMock()
+        mock_response.status_code = 503
+        mock_response.text = "Service unavailable"
+        mock_post = mock_get_http_client.return_value.post = AsyncMock(return_value=mock_response)
+        mock_email_strategy.return_value.send_system_notify = AsyncMock(return_value=True)
+        mock_email_strategy.return_value.send = AsyncMock(return_value=True)
+        strategy = LineNotificationStrategy()
+        breaker = get_circuit_breaker(NotificationTypes.LINE)
+
+        # Act
+        for _ in range(breaker.failure_threshold):
+            await strategy.send(notification)
+
+        result = await strategy.send(notification)
+
+        # Assert
+        assert breaker.state is CircuitState.OPEN
+        assert result == True
+        assert mock_post.call_count == breaker.failure_threshold
+        assert strategy.mail_strategy.subject == LineNotifyErrorMessages.CIRCUIT_OPEN
+        assert list(strategy.mail_strategy.recipients) == list(CommaSeparatedStrings(mock_settings.SERVICE_RECIPIENTS))
+        mock_email_strategy.return_value.send.assert_called_once_with(notification)
+
+    @pytest.mark.asyncio
+    @patch('app.utils.notification_helper.get_http_client')
+    @patch(
+        'app.utils.notification_helper.EmailNotificationStrategy',
+        new_callable=MagicMock,
+        spec=EmailNotificationStrategy
+    )
+    async def test_send_failure_of_client(self, mock_email_strategy, mock_get_http_client, notification, mock_settings):
+        # Arrange
+        mock_response = MagicMock()
+        mock_response.status_code = 401
+        mock_get_http_client.return_value.post = AsyncMock(return_value=mock_response)
+        mock_email_strategy.return_value.send_system_notify = AsyncMock(return_value=True)
+        strategy = LineNotificationStrategy()
+        breaker = get_circuit_breaker(NotificationTypes.LINE)
+
+        # Act
+        for _ in range(breaker.failure_threshold):
+            await strategy.send(notification)
+
+        # Assert
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.failures == 0
+
+        # Case 2: the trial of a half-open breaker fails with a client error
+        breaker.record_failure()
+        breaker.open()
+
+        with patch.object(breaker, "recovery_timeout", 0):
+            # Act
+            await strategy.send(notification)
+
+            # Assert
+            # the client error does not close the breaker, another trial is allowed
+            assert breaker.state is CircuitState.HALF_OPEN
+            assert breaker.failures == 1
+            assert breaker.allow_request() == True
+
+    @pytest.mark.asyncio
+    @patch('app.utils.notification_helper.get_http_client')
+    @patch(
+        'app.utils.notification_helper.EmailNotificationStrategy',
+        new_callable=MagicMock,
+        spec=EmailNotificationStrategy
+    )
+    async def test_send_failure_without_escalation(
+            self, mock_email_strategy, mock_get_http_client, notification, mock_settings
+    ):
+        # Arrange
+        mock_response = MagicMock()
+        mock_response.status_code = 503
+        mock_get_http_client.return_value.post = AsyncMock(return_value=mock_response)
+        mock_send_system_notify = mock_email_strategy.return_value.send_system_notify = AsyncMock(return_value=True)
+        strategy = LineNotificationStrategy(escalate=False)
+
+        # Act
+        result = await strategy.send(notification)
+
+        # Assert
+        # the failure may be retried, it is reported on the last attempt
+        assert result == False
+        assert strategy.retryable == True
+        mock_send_system_notify.assert_not_called()
+
+        # Case 2: the failure cannot be retried
+        mock_response.status_code = 401
+
+        # Act
+        result = await strategy.send(notification)
+
+        # Assert
+        assert result == False
+        assert strategy.retryable == False
+        mock_send_system_notify.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch('app.utils.notification_helper.get_http_client')
+    async def test_probe_line_notify(self, mock_get_http_client, mock_settings):
+        # Arrange
+        mock_response = MagicMock()
+        mock_get = mock_get_http_client.return_value.get = AsyncMock(return_value=mock_response)
+
+        # Case 1: an invalid token means the service is up
+        mock_response.status_code = 401
+
+        # Act & Assert
+        assert await probe_line_notify() == True
+        mock_get.assert_called_once_with(
+            LineApis.STATUS, headers=LineNotificationStrategy.get_headers(mock_settings.SYSTEM_NOTIFY_TOKEN)
+        )
+
+        # Case 2: the service is down
+        mock_response.status_code = 502
+
+        # Act & Assert
+        assert await probe_line_notify() == False
+
 
 class TestNotificationManager:
-    def test_send_notification(self, notification, mock_settings):
+    @pytest.mark.asyncio
+    async def test_send_notification(self, notification, mock_settings):
         # Arrange
         mock_strategy = MagicMock()
-        mock_strategy.send.return_value = True
+        mock_strategy.send = AsyncMock(return_value=True)
         manager = NotificationManager(mock_strategy)
 
         # Act
-        result = manager.send_notification(notification)
+        result = await manager.send_notification(notification)
 
         # Assert
         assert result == True
         mock_strategy.send.assert_called_once_with(notification)
+
+
+class TestHttpClient:
+    @pytest.mark.asyncio
+    async def test_get_http_client(self, mock_settings):
+        # Arrange
+        mock_settings.NOTIFY_CONNECT_TIMEOUT = 3.0
+        mock_settings.NOTIFY_READ_TIMEOUT = 10.0
+        mock_settings.NOTIFY_POOL_TIMEOUT = 5.0
+        mock_settings.NOTIFY_MAX_CONNECTIONS = 10
+        mock_settings.NOTIFY_MAX_KEEPALIVE_CONNECTIONS = 5
+
+        # Act
+        client = get_http_client()
+
+        # Assert
+        assert get_http_client() is client
+        assert client.timeout.connect == 3.0
+        assert client.timeout.read == 10.0
+
+        # Case 2: the client is created again after it is closed
+        await close_http_client()
+
+        # Assert
+        assert client.is_closed
+        assert get_http_client() is not client
+        await close_http_client()
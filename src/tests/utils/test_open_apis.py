@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.utils.open_apis import TaiwanCalendarApi
+
+
+def create_client(responses: list):
+    """
+    :return: A factory of the clients returning the responses in order, an exception in the responses is raised.
+    """
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses[len(requests) - 1]
+
+        if isinstance(response, Exception):
+            raise response
+
+        return response
+
+    return lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)), requests
+
+
+class TestTaiwanCalendarApi:
+    @pytest.mark.asyncio
+    async def test_get(self):
+        # Arrange
+        factory, requests = create_client([
+            httpx.ConnectTimeout("Timeout"),
+            httpx.Response(503),
+            httpx.Response(200, json=[{"date": "20240101"}]),
+        ])
+
+        # Act
+        with patch.object(TaiwanCalendarApi, "create_client", side_effect=factory):
+            result = await TaiwanCalendarApi(2024, retry_backoff=0).get()
+
+        # Assert
+        assert result == [{"date": "20240101"}]
+        assert len(requests) == 3
+        assert requests[0].url.params["year"] == "2024"
+
+    @pytest.mark.asyncio
+    async def test_get_failure(self):
+        # Arrange
+        factory, requests = create_client([httpx.Response(404), httpx.Response(503), httpx.Response(503)])
+
+        # Act & Assert
+        # Case 1: the errors of the client are not retried
+        with patch.object(TaiwanCalendarApi, "create_client", side_effect=factory):
+            with pytest.raises(httpx.HTTPStatusError):
+                await TaiwanCalendarApi(2024, retry_backoff=0).get()
+
+        assert len(requests) == 1
+
+        # Case 2: the retries are exhausted
+        with patch.object(TaiwanCalendarApi, "create_client", side_effect=factory):
+            with pytest.raises(httpx.HTTPStatusError):
+                await TaiwanCalendarApi(2024, max_retries=1, retry_backoff=0).get()
+
+        assert len(requests) == 3
@@ -0,0 +1,45 @@
+import pytest
+
+from app.utils.rate_limiters import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    def test_try_acquire(self):
+        # Arrange
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+        # Act & Assert
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+        # Case 2: the tokens are refilled at the rate
+        clock.now = 0.5
+
+        # Act & Assert
+        assert [bucket.try_acquire() for _ in range(2)] == [True, False]
+
+        # Case 3: the tokens never exceed the burst
+        clock.now = 100
+
+        # Act & Assert
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_acquire(self):
+        # Arrange
+        bucket = TokenBucket(rate=100, burst=1)
+
+        # Act
+        await bucket.acquire()
+        await bucket.acquire()
+
+        # Assert
+        assert bucket.tokens < 1
@@ -0,0 +1,91 @@
+from datetime import date
+
+from app.core.enums import ProductType
+from app.utils.holiday_calendars import HolidayCalendar, YearCalendar
+from app.utils.report_calendars import ReportCalendar, create_report_day, get_report_calendar, get_report_day
+
+
+class TestReportCalendar:
+    def test_report_calendar(self, special_holidays):
+        # Arrange
+        year = special_holidays.get_year(2024)
+
+        # Act
+        calendar = ReportCalendar(year)
+
+        # Assert
+        assert len(calendar.days) == 366
+        # the first day of the year depends on the holidays of the previous year
+        assert calendar.get(date(2024, 1, 1)) is None
+        assert calendar.get(date(2025, 1, 1)) is None
+
+        # the day after National Day has no daily report
+        day = calendar.get(date(2024, 10, 11))
+        assert day.report_date is None
+        assert day.filenames == {}
+        assert day.prev_day_is_holiday
+
+        # Monday receives the daily report of Saturday
+        day = calendar.get(date(2024, 10, 14))
+        assert day.report_date == date(2024, 10, 12)
+        assert day.filenames[ProductType.CROPS] == "113年10月12日敏感性農產品產地價格日報表"
+        assert day.filenames[ProductType.SEAFOOD] == "農業部通報魚價113.10.12"
+        # the report after National Day has the columns of the holiday and the day after it
+        assert day.selected_columns == ("10/10", "10/11")
+        assert calendar.get(date(2024, 10, 9)).selected_columns == ("10/8",)
+
+    def test_report_calendar_matches_create_report_day(self, special_holidays):
+        # Arrange
+        calendar = get_report_calendar(special_holidays.get_year(2024))
+
+        # Assert
+        for i, day in enumerate(calendar.days):
+            if day is not None:
+                assert day == create_report_day(date.fromordinal(calendar.first_ordinal + i), special_holidays)
+
+    def test_get_dates(self, special_holidays):
+        # Act
+        dates = get_report_calendar(special_holidays.get_year(2024)).get_dates(ProductType.CROPS)
+
+        # Assert
+        assert date(2024, 10, 11) not in dates
+        assert date(2024, 10, 14) in dates
+        assert date(2024, 1, 1) not in dates
+
+    def test_get_report_calendar(self, special_holidays):
+        # Arrange
+        year = special_holidays.get_year(2024)
+
+        # Assert
+        # the table is built once per holidays of the year, even for another calendar of the same holidays
+        assert get_report_calendar(year) is get_report_calendar(year)
+        assert get_report_calendar(year) is get_report_calendar(YearCalendar.from_bitset(2024, year.holidays))
+        # the table is rebuilt when the holidays change
+        assert get_report_calendar(year) is not get_report_calendar(YearCalendar(2024, [date(2024, 10, 10)]))
+
+
+class TestGetReportDay:
+    def test_get_report_day(self, special_holidays):
+        # Act
+        day = get_report_day(date(2024, 10, 11), special_holidays)
+
+        # Assert
+        assert day is get_report_calendar(special_holidays.get_year(2024)).get(date(2024, 10, 11))
+
+        # Case 2: the first day of the year is computed with the holidays of the previous year
+        calendar = HolidayCalendar.from_dates([date(2024, 12, 31), date(2025, 2, 28)])
+
+        # Act
+        day = get_report_day(date(2025, 1, 1), calendar)
+
+        # Assert
+        assert day.report_date is None
+        assert day.prev_day_is_holiday
+
+        # Case 3: the year without a calendar only has the weekends
+        # Act
+        day = get_report_day(date(2030, 1, 10), HolidayCalendar())
+
+        # Assert
+        assert day.report_date == date(2030, 1, 10)
+        assert day.selected_columns == ("1/9",)
@@ -0,0 +1,63 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.utils.workers import PeriodicWorker
+
+
+class FakeWorker(PeriodicWorker):
+    def __init__(self, results: list):
+        super().__init__(interval=60)
+        self.results = results
+        self.runs = 0
+        self.ran = asyncio.Event()
+        self.on_stop = AsyncMock()
+
+    async def run_once(self) -> bool:
+        self.runs += 1
+
+        if not self.results:
+            self.ran.set()
+            return False
+
+        result = self.results.pop(0)
+
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+
+class TestPeriodicWorker:
+    @pytest.mark.asyncio
+    async def test_run(self):
+        # Arrange
+        # a failed run does not stop the worker
+        worker = FakeWorker([True, Exception("Test error"), True])
+        worker.interval = 0
+
+        # Act
+        worker.start()
+        await asyncio.wait_for(worker.ran.wait(), timeout=1)
+        await worker.stop()
+
+        # Assert
+        assert worker.runs >= 4
+        assert worker._task is None
+        worker.on_stop.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_wait_first(self):
+        # Arrange
+        worker = FakeWorker([])
+        worker.wait_first = True
+
+        # Act
+        worker.start()
+        await asyncio.sleep(0.01)
+        await worker.stop()
+
+        # Assert
+        assert worker.runs == 0
+        worker.on_stop.assert_called_once()